@@ -0,0 +1,65 @@
+"""
+Compare resolving every value of a large configuration with `safe_select` against \
+using a memoizing `ConfigResolver`.
+
+The configuration contains a globals section and many command sections, where one out
+of two values interpolates a value of the globals section. All the values are looked up
+several times, as happens when a configuration is validated and then prompted.
+
+Usage:
+    python benchmarks/bench_config_resolver.py [--sections N] [--keys N] [--lookups N]
+"""
+import argparse
+import time
+
+from omegaconf import OmegaConf
+
+from mloq.config.configuration import ConfigResolver, safe_select
+
+
+def create_config(n_sections: int, n_keys: int):
+    """Return a DictConfig with n_sections sections of n_keys values."""
+    config = {"globals": {f"value_{i}": f"global_{i}" for i in range(n_keys)}}
+    for section in range(n_sections):
+        config[f"section_{section}"] = {
+            f"key_{i}": f"${{globals.value_{i}}}" if i % 2 else f"plain_{i}" for i in range(n_keys)
+        }
+    return OmegaConf.create(config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=3)
+    args = parser.parse_args()
+    config = create_config(args.sections, args.keys)
+    keys = [f"section_{s}.key_{i}" for s in range(args.sections) for i in range(args.keys)]
+
+    start = time.perf_counter()
+    for _ in range(args.lookups):
+        naive = [safe_select(config, k) for k in keys]
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolver = ConfigResolver(config)
+    for _ in range(args.lookups):
+        memoized = [resolver.select(k) for k in keys]
+    resolver_time = time.perf_counter() - start
+    assert naive == memoized
+
+    config.globals.value_1 = "updated"
+    start = time.perf_counter()
+    resolver.invalidate("globals.value_1")
+    memoized = [resolver.select(k) for k in keys]
+    update_time = time.perf_counter() - start
+    n_dependents = len(resolver.dependents("globals.value_1"))
+
+    print(f"{len(keys)} values looked up {args.lookups} times:")
+    print(f"  safe_select:            {naive_time * 1000:8.2f} ms")
+    print(f"  ConfigResolver:         {resolver_time * 1000:8.2f} ms")
+    print(f"  update one global value: {update_time * 1000:7.2f} ms ({n_dependents} dependents)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Measure the time needed to instantiate a mloq command against its number of parameters.
+
+It defines a custom command with the requested number of parameters, where one out of
+three parameters is an interpolation, and instantiates it with and without passing the
+parameter values as keyword arguments.
+
+Usage:
+    python benchmarks/bench_configuration.py [--params 10 50 100 200] [--repeat N]
+"""
+import argparse
+import time
+
+from omegaconf import OmegaConf
+import param
+
+from mloq.command import Command
+from mloq.record import CMDRecord
+
+
+def create_command(n_params: int) -> type:
+    """Return a Command class with n_params string parameters."""
+    attrs = {"cmd_name": "custom"}
+    for i in range(n_params):
+        default = "${custom.param_0}" if i % 3 == 2 else f"value_{i}"
+        attrs[f"param_{i}"] = param.String(default, doc=f"Parameter {i}")
+    return type(f"CustomCMD{n_params}", (Command,), attrs)
+
+
+def timeit(command_cls: type, kwargs: dict, repeat: int) -> float:
+    """Return the best time in seconds needed to instantiate command_cls."""
+    times = []
+    for _ in range(repeat):
+        record = CMDRecord(config=OmegaConf.create({"custom": {}}))
+        start = time.perf_counter()
+        command_cls(record=record, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--params", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'params':>8}{'defaults (ms)':>16}{'kwargs (ms)':>14}")
+    for n_params in args.params:
+        command_cls = create_command(n_params)
+        kwargs = {f"param_{i}": f"kwarg_{i}" for i in range(n_params)}
+        defaults = timeit(command_cls, {}, args.repeat)
+        with_kwargs = timeit(command_cls, kwargs, args.repeat)
+        print(f"{n_params:>8}{defaults * 1000:>16.2f}{with_kwargs * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Measure the time spent by `mloq.runner.load_config` loading a mloq.yaml file.
+
+It reports the time of the first load in the process, of a cached load, and of a load
+that applies hydra overrides, which goes through hydra's compose API.
+
+Usage:
+    python benchmarks/bench_load_config.py [--repeat N]
+"""
+import argparse
+from pathlib import Path
+import time
+
+from mloq import runner
+
+
+EXAMPLE_CONFIG = Path(__file__).parent.parent / "tests" / "examples" / "mloq.yaml"
+
+
+def timeit(func, repeat: int, clear_cache: bool = False) -> float:
+    """Return the best time in seconds of calling func repeat times."""
+    times = []
+    for _ in range(repeat):
+        if clear_cache:
+            runner._config_cache.clear()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    plain = timeit(lambda: runner.load_config(EXAMPLE_CONFIG, []), args.repeat, True)
+    cached = timeit(lambda: runner.load_config(EXAMPLE_CONFIG, []), args.repeat)
+    overrides = ["globals.owner=benchmark"]
+    compose = timeit(lambda: runner.load_config(EXAMPLE_CONFIG, overrides), args.repeat, True)
+    print(f"load_config, best of {args.repeat} runs:")
+    print(f"  OmegaConf load:          {plain * 1000:8.2f} ms")
+    print(f"  cached:                  {cached * 1000:8.2f} ms")
+    print(f"  hydra compose overrides: {compose * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
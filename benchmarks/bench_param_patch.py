@@ -0,0 +1,43 @@
+"""
+Measure the time needed to define a Configurable class using the patched param module.
+
+Every parameter declared in the class body accesses an attribute of the patched
+`param` module, such as `param.String`.
+
+Usage:
+    python benchmarks/bench_param_patch.py [--params N] [--repeat N]
+"""
+import argparse
+import time
+
+from mloq.config.configuration import Configurable
+from mloq.config.param_patch import param
+
+
+PARAM_NAMES = ["String", "Integer", "Number", "List", "Dict"]
+
+
+def define_class(n_params: int) -> type:
+    """Define a Configurable class with n_params parameters."""
+    attrs = {}
+    for i in range(n_params):
+        attrs[f"param_{i}"] = getattr(param, PARAM_NAMES[i % len(PARAM_NAMES)])()
+    return type("BenchmarkConfigurable", (Configurable,), attrs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--params", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        define_class(args.params)
+        times.append(time.perf_counter() - start)
+    print(f"Class definition with {args.params} parameters, best of {args.repeat} runs:")
+    print(f"  {min(times) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare the cold and warm rendering times of the full `mloq setup` file set.
+
+The cold run compiles every template from source, as it happens the first time
+mloq runs on a machine. The warm run starts from a fresh jinja Environment but loads
+the compiled templates from a populated bytecode cache, as subsequent runs do.
+
+Usage:
+    python benchmarks/bench_templating.py [--repeat N]
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from omegaconf import OmegaConf
+
+from mloq.commands import SetupCMD
+from mloq.record import CMDRecord
+from mloq.templating import create_jinja_env
+
+
+EXAMPLE_CONFIG = Path(__file__).parent.parent / "tests" / "examples" / "mloq.yaml"
+
+
+def setup_record() -> CMDRecord:
+    """Return the CMDRecord generated by SetupCMD for the example mloq.yaml."""
+    record = CMDRecord(OmegaConf.load(EXAMPLE_CONFIG))
+    return SetupCMD(record=record).run()
+
+
+def render_all(record: CMDRecord, cache_dir: str) -> float:
+    """Render all the templates of the record with a new Environment and return the time."""
+    start = time.perf_counter()
+    env = create_jinja_env(cache_dir=cache_dir)
+    for file in record.files.values():
+        if not file.is_static:
+            env.get_template(str(file.name)).render(**record.config)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    record = setup_record()
+    cold, warm = [], []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(render_all(record, cache_dir))
+            warm.append(render_all(record, cache_dir))
+    n_templates = sum(not f.is_static for f in record.files.values())
+    print(f"Rendering {n_templates} templates, best of {args.repeat} runs:")
+    print(f"  cold (compile from source): {min(cold) * 1000:8.2f} ms")
+    print(f"  warm (bytecode cache):      {min(warm) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Measure the time spent by every mloq command in each phase of its execution, and \
+compare the results against a JSON baseline.
+
+For every command the suite measures `load_config`, `Command.__init__`, `configure`,
+`record_files` (including `record_directories`), `Writer.run`, `Writer.run` in atomic
+mode (`write_atomic`, which includes flushing every file to disk) and the wall time of
+running the command from the command line in a new process.
+
+The inputs are synthetic configurations built from `tests/examples/mloq.yaml` and scaled
+with three knobs: `--params` extra parameters added to every command (and to its section
+of the configuration), `--chain` values in a chain of interpolations that the project
+values depend on, and `--copies` additional copies of every generated file placed in
+different directories. The command line runs use the real commands, so their
+configuration is only scaled with `--chain`.
+
+The command line runs never use the cache of the user. With `--cli-cache cold` (the
+default) every run gets a new empty cache directory, with `warm` all the runs of a command
+share a cache directory populated by a run that is not measured, and with `disabled` the
+runs set MLOQ_NO_CACHE. The mode is stored in the results, and the command line times are
+only compared against a baseline measured with the same mode.
+
+Usage:
+    python benchmarks/suite.py [--commands ci setup ...] [--save FILE] [--compare FILE]
+
+Examples:
+    python benchmarks/suite.py --save benchmarks/baseline.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from omegaconf import OmegaConf
+import param
+
+from mloq.cache import CACHE_DIR_ENV, DISABLE_CACHE_ENV
+from mloq.commands import command_names, get_command_class
+from mloq.record import CMDRecord
+from mloq.runner import clear_config_cache, load_config
+from mloq.version import __version__
+from mloq.writer import Writer
+
+
+EXAMPLE_CONFIG = Path(__file__).parents[1] / "tests" / "examples" / "mloq.yaml"
+PHASES = ("load_config", "init", "configure", "record_files", "write", "write_atomic", "cli")
+CLI_CACHE_MODES = ("cold", "warm", "disabled")
+# Differences smaller than this number of seconds are considered noise
+MIN_DIFFERENCE = 0.002
+
+
+def synthetic_config(params: int, chain: int) -> Dict:
+    """
+    Return the example configuration scaled to many parameters and deep interpolations.
+
+    Args:
+        params: Number of extra values added to every section of the configuration.
+            One out of two extra values interpolates a value of the globals section.
+        chain: Length of a chain of interpolations in a section that is not used by
+            any command. The project name is resolved through the whole chain.
+
+    Returns:
+        Dictionary containing the synthetic configuration.
+    """
+    config = OmegaConf.to_container(OmegaConf.load(EXAMPLE_CONFIG), resolve=False)
+    chain_values = {"chain_0": config["globals"]["project_name"]}
+    for i in range(1, chain + 1):
+        chain_values[f"chain_{i}"] = f"${{synthetic.chain_{i - 1}}}"
+    if chain:
+        config["globals"]["project_name"] = f"${{synthetic.chain_{chain}}}"
+    for values in config.values():
+        for i in range(params):
+            values[f"extra_{i}"] = f"${{globals.project_name}}_{i}" if i % 2 else f"value_{i}"
+    config["synthetic"] = chain_values  # Not read by any command
+    return config
+
+
+def scaled_command(command_class: type, params: int) -> type:
+    """
+    Return a subclass of the command that defines params extra parameters.
+
+    The sub commands of composite commands such as setup are scaled too. The extra
+    parameters match the values added to the configuration by `synthetic_config`.
+    """
+    attrs = {}
+    if hasattr(command_class, "SUB_COMMAND_CLASSES"):
+        sub_commands = command_class.SUB_COMMAND_CLASSES
+        attrs["SUB_COMMAND_CLASSES"] = tuple(scaled_command(c, params) for c in sub_commands)
+    else:
+        for i in range(params):
+            attrs[f"extra_{i}"] = param.String(doc=f"Synthetic parameter {i}")
+    return type(f"Scaled{command_class.__name__}", (command_class,), attrs)
+
+
+def copy_files(record: CMDRecord, copies: int) -> None:
+    """Register copies of all the files of the record in different directories."""
+    files = dict(record.files)
+    for i in range(copies):
+        root = Path(f"copy_{i}")
+        for path, file in files.items():
+            record.register_directory(root / Path(path).parent)
+            record.files[root / path] = file
+
+
+def timeit(func: Callable[[], object], repeat: int) -> Tuple[List[float], object]:
+    """Run func repeat times and return the elapsed seconds of every run and the last result."""
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def cli_env(cache_mode: str, cache_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Return the environment of the command line runs for the target cache mode.
+
+    Args:
+        cache_mode: One of CLI_CACHE_MODES.
+        cache_dir: Cache directory used by the run when the cache is not disabled.
+
+    Returns:
+        Copy of the current environment with the mloq cache variables set.
+    """
+    env = dict(os.environ)
+    env.pop(CACHE_DIR_ENV, None)
+    env.pop(DISABLE_CACHE_ENV, None)
+    if cache_mode == "disabled":
+        env[DISABLE_CACHE_ENV] = "1"
+    else:
+        env[CACHE_DIR_ENV] = cache_dir
+    return env
+
+
+def benchmark_cli(name: str, config_file: Path, repeat: int, cache_mode: str) -> List[float]:
+    """Run the command from the command line repeat times and return the elapsed seconds."""
+
+    def run(env):
+        with tempfile.TemporaryDirectory() as target:
+            args = [sys.executable, "-m", "mloq", name, "-f", str(config_file), target]
+            return timeit(
+                lambda: subprocess.run(args, check=True, capture_output=True, env=env), 1
+            )
+
+    times = []
+    with tempfile.TemporaryDirectory() as shared_cache:
+        if cache_mode == "warm":
+            run(cli_env(cache_mode, shared_cache))  # Populate the cache
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as cold_cache:
+                cache_dir = cold_cache if cache_mode == "cold" else shared_cache
+                times += run(cli_env(cache_mode, cache_dir))[0]
+    return times
+
+
+def benchmark_command(
+    name: str,
+    config_file: Path,
+    cli_config_file: Path,
+    params: int,
+    copies: int,
+    repeat: int,
+    cli_repeat: int,
+    cli_cache: str = "cold",
+) -> Dict[str, Dict[str, float]]:
+    """Measure every phase of the target command. Return the statistics of each phase."""
+    command_class = scaled_command(get_command_class(name), params)
+    times: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    for _ in range(repeat):
+        clear_config_cache()
+        elapsed, config = timeit(lambda: load_config(config_file=config_file), 1)
+        times["load_config"] += elapsed
+        elapsed, command = timeit(lambda: command_class(record=CMDRecord(config=config)), 1)
+        times["init"] += elapsed
+        times["configure"] += timeit(command.configure, 1)[0]
+
+        def record_files():
+            command.record_directories()
+            command.record_files()
+            copy_files(command.record, copies)
+
+        times["record_files"] += timeit(record_files, 1)[0]
+        with tempfile.TemporaryDirectory() as target:
+            writer = Writer(path=target, record=command.record)
+            times["write"] += timeit(writer.run, 1)[0]
+        with tempfile.TemporaryDirectory() as target:
+            writer = Writer(path=target, record=command.record, atomic=True)
+            times["write_atomic"] += timeit(writer.run, 1)[0]
+    if cli_repeat:
+        times["cli"] = benchmark_cli(name, cli_config_file, cli_repeat, cli_cache)
+    return {
+        phase: {"min": min(values), "median": statistics.median(values), "runs": len(values)}
+        for phase, values in times.items()
+        if values
+    }
+
+
+def run_suite(
+    commands: List[str],
+    params: int,
+    chain: int,
+    copies: int,
+    repeat: int,
+    cli_repeat: int,
+    cli_cache: str = "cold",
+) -> Dict:
+    """Run the benchmarks of all the target commands and return the results."""
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = Path(temp_dir) / "mloq.yaml"
+        OmegaConf.save(OmegaConf.create(synthetic_config(params, chain)), config_file)
+        cli_config_file = Path(temp_dir) / "cli" / "mloq.yaml"
+        cli_config_file.parent.mkdir()
+        OmegaConf.save(OmegaConf.create(synthetic_config(0, chain)), cli_config_file)
+        for name in commands:
+            try:
+                results[name] = benchmark_command(
+                    name,
+                    config_file=config_file,
+                    cli_config_file=cli_config_file,
+                    params=params,
+                    copies=copies,
+                    repeat=repeat,
+                    cli_repeat=cli_repeat,
+                    cli_cache=cli_cache,
+                )
+            except Exception as e:  # Some commands cannot run on their own
+                results[name] = {"error": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+    return {
+        "meta": {
+            "mloq_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": params,
+            "chain": chain,
+            "copies": copies,
+            "cli_cache": cli_cache,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: Dict,
+    baseline: Dict,
+    threshold: float,
+) -> List[Tuple[str, str, float, float]]:
+    """
+    Return the phases that are slower than the baseline.
+
+    A phase is a regression if its median time is more than threshold times slower
+    than the baseline, and the difference is larger than MIN_DIFFERENCE seconds. The
+    command line times are skipped if the baseline was measured with another cache mode.
+
+    Returns:
+        List of tuples containing the command, the phase, and the baseline and current
+        median times.
+    """
+    regressions = []
+    # Baselines saved before the cache mode was recorded did not isolate the cache
+    same_cache = results["meta"].get("cli_cache") == baseline.get("meta", {}).get("cli_cache")
+    for name, phases in results["results"].items():
+        for phase, stats in phases.items():
+            if phase == "error" or (phase == "cli" and not same_cache):
+                continue
+            reference = baseline.get("results", {}).get(name, {}).get(phase)
+            if reference is None:
+                continue
+            old, new = reference["median"], stats["median"]
+            if new > old * (1 + threshold) and new - old > MIN_DIFFERENCE:
+                regressions.append((name, phase, old, new))
+    return regressions
+
+
+def format_results(results: Dict, baseline: Optional[Dict] = None) -> str:
+    """Return a table with the median time in milliseconds of every command and phase."""
+    header = f"{'command':<14}" + "".join(f"{phase:>14}" for phase in PHASES)
+    lines = [header]
+    for name, phases in results["results"].items():
+        row = f"{name:<14}"
+        if "error" in phases:
+            lines.append(f"{row}failed: {phases['error']}")
+            continue
+        for phase in PHASES:
+            if phase not in phases:
+                row += f"{'-':>14}"
+                continue
+            value = f"{phases[phase]['median'] * 1000:.1f}"
+            reference = (baseline or {}).get("results", {}).get(name, {}).get(phase)
+            if reference and "median" in reference:
+                change = phases[phase]["median"] / reference["median"] - 1
+                value += f" ({change:+.0%})"
+            row += f"{value:>14}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", nargs="+", default=command_names(), choices=command_names())
+    parser.add_argument("--params", type=int, default=50, help="Extra values per section.")
+    parser.add_argument("--chain", type=int, default=20, help="Length of interpolation chain.")
+    parser.add_argument("--copies", type=int, default=5, help="Copies of every file.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cli-repeat", type=int, default=1, help="0 skips the CLI runs.")
+    parser.add_argument(
+        "--cli-cache",
+        default="cold",
+        choices=CLI_CACHE_MODES,
+        help="State of the mloq cache in the CLI runs.",
+    )
+    parser.add_argument("--save", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=Path, help="JSON baseline to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown that is reported as a regression.",
+    )
+    args = parser.parse_args()
+    results = run_suite(
+        commands=args.commands,
+        params=args.params,
+        chain=args.chain,
+        copies=args.copies,
+        repeat=args.repeat,
+        cli_repeat=args.cli_repeat,
+        cli_cache=args.cli_cache,
+    )
+    baseline = None
+    if args.compare is not None and args.compare.exists():
+        baseline = json.loads(args.compare.read_text())
+    print("Median time in milliseconds" + (" (change vs baseline)" if baseline else ""))
+    print(format_results(results, baseline))
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = args.save.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(results, indent=2) + "\n")
+        shutil.move(str(tmp_path), args.save)
+        print(f"Results saved to {args.save}")
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, phase, old, new in regressions:
+            print(f"REGRESSION {name}.{phase}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions larger than {args.threshold:.0%}.")
+    elif args.compare is not None:
+        print(f"Baseline {args.compare} does not exist. Run with --save to create it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,8 +37,10 @@ setup(
         "hydra-core>=1.1.1",
         "param>=1.11.0",
         "pre-commit>=2.15.0",
+        "PyYAML>=5.1.0",
         "typing-extensions>=4.0.0",
     ],
+    extras_require={"watch": ["watchdog>=2.1.0"], "profile": ["pyinstrument>=3.0"]},
     package_data={
         "": ["README.md"],
         "mloq": ["assets/**/*", "assets/**/.*", "tests/**/*", "tests/**/.*"],
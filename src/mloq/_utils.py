@@ -7,6 +7,7 @@ from typing import List, Union
 from omegaconf import DictConfig, OmegaConf
 
 from mloq.files import mloq_yml
+from mloq.record import Ledger, LEDGER_FILE
 
 
 # TODO: Fix docs
@@ -60,23 +61,27 @@ def files_are_equal(path1: Union[str, Path], path2: Union[str, Path]) -> bool:
     return filecmp.cmp(path1, path2, shallow=False)
 
 
+def _ledger_path(path: Union[str, Path]) -> Path:
+    """Return the path to the ledger json file of the project referenced by path."""
+    path = Path(path)
+    if path.is_dir():
+        return path / LEDGER_FILE
+    return path.with_suffix(".json") if path.suffix == ".md" else path
+
+
 def get_generated_files(path: Union[str, Path]) -> List[Path]:
     """
     List all the files generated in the last mloq run.
 
     Args:
-        path: path to WHAT_MLOQ_GENERATED.md file.
+        path: path to WHAT_MLOQ_GENERATED.md file, to the WHAT_MLOQ_GENERATED.json
+            file written next to it, or to the project directory.
 
     Returns:
-        List of Path containing the names of the files generated by mloq.
+        List of Path containing the paths of the files generated by mloq, relative
+        to the project root.
     """
-    # Read file as string
-    # Split file to end up with the desired file names
-    pass
-
-
-# TODO: Improve the Ledger class so it can also track the different directories
-#  that were created, and add them under a new section in the WHAT_MLOQ_GENERATED.md
+    return Ledger.load(_ledger_path(path)).paths
 
 
 def get_generated_directories(path: Union[str, Path]) -> List[Path]:
@@ -84,12 +89,14 @@ def get_generated_directories(path: Union[str, Path]) -> List[Path]:
     List all the directories generated in the last mloq run.
 
     Args:
-        path: path to WHAT_MLOQ_GENERATED.md file.
+        path: path to WHAT_MLOQ_GENERATED.md file, to the WHAT_MLOQ_GENERATED.json
+            file written next to it, or to the project directory.
 
     Returns:
-        List of Path containing the names of the directories generated by mloq.
+        List of Path containing the directories generated by mloq, relative to the
+        project root.
     """
-    pass
+    return Ledger.load(_ledger_path(path)).directories
 
 
 def check_directories_exist(paths: List[Union[str, Path]]) -> bool:
@@ -0,0 +1,98 @@
+"""This module defines the Python API to generate projects with mloq from other programs.
+
+The API does not modify `sys.argv`, the working directory or the global hydra state,
+so it can be called concurrently from several threads of a long running process.
+"""
+import copy
+from pathlib import Path
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Union
+
+from omegaconf import DictConfig, OmegaConf
+
+from mloq.record import CMDRecord, Ledger
+from mloq.sinks import Sink
+
+
+ConfigSource = Union[DictConfig, Mapping[str, Any], Path, str]
+
+
+class GenerationResult(NamedTuple):
+    """
+    Result of generating a project with :func:`generate`.
+
+    Attributes of this class:
+        record: CMDRecord containing the configuration, files and directories of
+            the project.
+        files: Content of the rendered files indexed by their path relative to the
+            project root.
+        ledger: Ledger containing the files generated by mloq.
+        stats: Number of files rendered, written and skipped.
+    """
+
+    record: CMDRecord
+    files: Dict[Path, str]
+    ledger: Ledger
+    stats: Dict[str, int]
+
+
+def _to_config(config: ConfigSource) -> DictConfig:
+    """Return a copy of the provided configuration that can be modified safely."""
+    if isinstance(config, (str, Path)):
+        from mloq.runner import load_config
+
+        return load_config(config_file=config)
+    elif isinstance(config, DictConfig):
+        return copy.deepcopy(config)
+    return OmegaConf.create(copy.deepcopy(dict(config)))
+
+
+def generate(
+    config: ConfigSource,
+    command: Union[str, type] = "setup",
+    path: Optional[Union[Path, str]] = None,
+    overwrite: bool = False,
+    incremental: bool = False,
+    workers: int = 1,
+    sink: Optional[Sink] = None,
+) -> GenerationResult:
+    """
+    Generate the files of a project using the provided configuration.
+
+    Args:
+        config: Project configuration. It can be a DictConfig, a dictionary or the path
+            to a mloq.yaml file. It is copied, so it is never modified.
+        command: Name of the mloq command to run (e.g. "setup") or Command class.
+        path: Directory where the files will be written. If None, the files are only
+            rendered in memory and the filesystem is not modified.
+        overwrite: If True overwrite existing files. Ignored if path and sink are None.
+        incremental: Only render and write the files whose content changed since the
+            last run. Ignored if path and sink are None.
+        workers: Number of threads used to render and write the templates.
+        sink: Sink where the files will be written instead of path, such as a
+            MemorySink or a ZipSink streaming an archive. The caller is responsible
+            for closing it.
+
+    Returns:
+        GenerationResult containing the record, the rendered files and the ledger.
+    """
+    from mloq.commands import get_command_class
+    from mloq.writer import Writer
+
+    command_class = get_command_class(command) if isinstance(command, str) else command
+    record = command_class(record=CMDRecord(config=_to_config(config))).run()
+    if path is None and sink is None:
+        writer = Writer(path=Path(), record=record, workers=workers)
+        files = writer.render()
+    else:
+        writer = Writer(
+            path=Path() if path is None else path,
+            record=record,
+            overwrite=overwrite,
+            workers=workers,
+            incremental=incremental,
+            sink=sink,
+            copy_static=False,  # Keep the content of every file in the result
+        )
+        writer.run()
+        files = dict(writer.rendered)
+    return GenerationResult(record, files, writer.ledger, dict(writer.stats))
@@ -0,0 +1,201 @@
+"""This module implements `mloq batch`, which generates or updates many projects \
+in a single invocation of mloq."""
+from concurrent.futures import as_completed, ProcessPoolExecutor
+import glob
+import os
+from pathlib import Path
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+import click
+
+from mloq.cli import incremental_opt, overwrite_opt
+from mloq.commands import command_names
+from mloq.files import mloq_yml
+
+
+class ProjectResult(NamedTuple):
+    """
+    Summary of running a mloq command over a single project.
+
+    Attributes of this class:
+        config_file: Path to the mloq.yaml file of the project.
+        status: "ok" if the project was generated successfully, "failed" otherwise.
+        files_written: Number of files written in the project directory.
+        seconds: Time spent processing the project.
+        error: Description of the error that made the project fail.
+    """
+
+    config_file: Path
+    status: str
+    files_written: int
+    seconds: float
+    error: Optional[str] = None
+
+
+def find_config_files(patterns: Iterable[str]) -> List[Path]:
+    """
+    Return the paths to the mloq.yaml files matching the provided patterns.
+
+    Args:
+        patterns: Paths or glob patterns (`**` is supported). They can point either to
+            mloq.yaml files or to directories containing a mloq.yaml file.
+
+    Returns:
+        Sorted list of the mloq.yaml files found, without duplicates.
+    """
+    found = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            path = Path(match)
+            path = path / mloq_yml.dst if path.is_dir() else path
+            if path.is_file():
+                found.add(path.resolve())
+    return sorted(found)
+
+
+def _warm_up(command_name: str) -> None:
+    """Import the command and the template environment once per worker process."""
+    from mloq.commands import get_command_class
+    import mloq.templating  # noqa: F401
+
+    get_command_class(command_name)
+
+
+def run_project(
+    config_file: Path,
+    command_name: str = "setup",
+    overwrite: bool = False,
+    incremental: bool = False,
+) -> ProjectResult:
+    """
+    Run a mloq command over the project defined in the provided mloq.yaml.
+
+    The files are generated in the directory that contains the configuration file.
+    Errors are captured and reported in the returned ProjectResult.
+
+    Args:
+        config_file: Path to the mloq.yaml file of the project.
+        command_name: Name of the mloq command that will be run.
+        overwrite: If True overwrite existing files.
+        incremental: Only render and write the files whose content changed.
+
+    Returns:
+        ProjectResult summarizing the command execution.
+    """
+    from mloq.runner import build_record, write_record
+
+    start = time.perf_counter()
+    try:
+        record = build_record(command_name, config_file=config_file)
+        writer = write_record(
+            record=record,
+            path=Path(config_file).parent,
+            overwrite=overwrite,
+            incremental=incremental,
+        )
+        elapsed = time.perf_counter() - start
+        return ProjectResult(config_file, "ok", writer.stats["written"], elapsed)
+    except (Exception, SystemExit) as e:  # hydra exits when it fails to load a config
+        elapsed = time.perf_counter() - start
+        return ProjectResult(config_file, "failed", 0, elapsed, f"{type(e).__name__}: {e}")
+
+
+def run_batch(
+    config_files: Iterable[Path],
+    command_name: str = "setup",
+    jobs: int = 1,
+    overwrite: bool = False,
+    incremental: bool = False,
+) -> List[ProjectResult]:
+    """
+    Run a mloq command over all the provided projects.
+
+    Args:
+        config_files: Paths to the mloq.yaml files of the target projects.
+        command_name: Name of the mloq command that will be run.
+        jobs: Number of processes used to generate the projects. If it is one, all
+            the projects are generated in the current process.
+        overwrite: If True overwrite existing files.
+        incremental: Only render and write the files whose content changed.
+
+    Returns:
+        List containing the ProjectResult of each project, in the same order
+        as config_files.
+    """
+    config_files = list(config_files)
+    kwargs = dict(command_name=command_name, overwrite=overwrite, incremental=incremental)
+    if jobs <= 1:
+        return [run_project(path, **kwargs) for path in config_files]
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_warm_up,
+        initargs=(command_name,),
+    ) as pool:
+        futures = {pool.submit(run_project, path, **kwargs): path for path in config_files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as e:  # The worker process crashed
+                results[path] = ProjectResult(path, "failed", 0, 0.0, f"{type(e).__name__}: {e}")
+    return [results[path] for path in config_files]
+
+
+def format_summary(results: List[ProjectResult]) -> str:
+    """Return a table summarizing the results of a batch run."""
+    lines = [f"{'status':<8}{'files':>7}{'time (s)':>10}  project"]
+    for result in results:
+        lines.append(
+            f"{result.status:<8}{result.files_written:>7}{result.seconds:>10.2f}  "
+            f"{os.path.relpath(result.config_file.parent)}",
+        )
+        if result.error:
+            lines.append(f"{'':<27}{result.error}")
+    n_failed = sum(r.status != "ok" for r in results)
+    lines.append(f"{len(results) - n_failed} projects succeeded, {n_failed} failed.")
+    return "\n".join(lines)
+
+
+@click.command()
+@click.argument("projects", nargs=-1, required=True)
+@click.option(
+    "--command",
+    "command_name",
+    default="setup",
+    show_default=True,
+    type=click.Choice(command_names()),
+    help="mloq command to run on every project.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of processes used to generate the projects.",
+)
+@overwrite_opt
+@incremental_opt
+def batch(projects, command_name: str, jobs: int, overwrite: bool, incremental: bool):
+    """
+    Generate or update many projects in a single mloq run.
+
+    PROJECTS are paths or glob patterns pointing to mloq.yaml files or to directories
+    containing them. Each project is generated in the directory of its mloq.yaml.
+    """
+    config_files = find_config_files(projects)
+    if not config_files:
+        raise click.UsageError("No mloq.yaml files found.")
+    results = run_batch(
+        config_files,
+        command_name=command_name,
+        jobs=jobs,
+        overwrite=overwrite,
+        incremental=incremental,
+    )
+    click.echo(format_summary(results))
+    if any(result.status != "ok" for result in results):
+        raise SystemExit(1)
@@ -0,0 +1,86 @@
+"""This module defines where mloq stores the data it caches on disk between runs."""
+import os
+from pathlib import Path
+import tempfile
+from typing import Callable, IO, Optional, Union
+
+from mloq.version import __version__
+
+
+CACHE_DIR_ENV = "MLOQ_CACHE_DIR"
+DISABLE_CACHE_ENV = "MLOQ_NO_CACHE"
+
+
+def user_cache_root() -> Path:
+    """
+    Return the root folder where mloq stores its caches.
+
+    It can be configured setting the MLOQ_CACHE_DIR environment variable. Otherwise it
+    follows the platform conventions: %LOCALAPPDATA% on Windows, and $XDG_CACHE_HOME
+    (defaults to ~/.cache) on other systems.
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        return Path(os.environ["LOCALAPPDATA"]) / "mloq" / "Cache"
+    xdg_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache) / "mloq"
+
+
+def get_cache_dir(*parts: Union[str, Path]) -> Optional[Path]:
+    """
+    Return the cache directory of the running mloq version, creating it if needed.
+
+    The cache is namespaced by mloq version, so different mloq installations never
+    read each other's cached data.
+
+    Args:
+        *parts: Name of the subdirectory inside the version cache folder.
+
+    Returns:
+        Path to the target cache directory, or None if caching is disabled (setting
+        the MLOQ_NO_CACHE environment variable) or the directory cannot be created.
+    """
+    if os.environ.get(DISABLE_CACHE_ENV):
+        return None
+    path = user_cache_root() / __version__ / Path(*parts)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def write_atomic(
+    path: Union[str, Path],
+    write: Callable[[IO], None],
+    binary: bool = True,
+) -> bool:
+    """
+    Write a cache file atomically, so it can be shared by concurrent processes.
+
+    The data is written to a temporary file in the same directory, and then renamed
+    to the target path. The temporary file is removed if anything fails.
+
+    Args:
+        path: Path of the target cache file.
+        write: Function that writes the data to the provided file object.
+        binary: Open the temporary file in binary mode if True, otherwise in text mode.
+
+    Returns:
+        True if the file was written, False if it could not be written because of an OSError,
+        for example if the cache directory is missing or it is not writable.
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException as e:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if isinstance(e, OSError):
+            return False
+        raise
+    return True
@@ -0,0 +1,282 @@
+"""This module implements `mloq check`, which verifies that the files of a project are \
+up to date with its mloq.yaml."""
+from concurrent.futures import ThreadPoolExecutor
+import difflib
+import fnmatch
+import locale
+import os
+from pathlib import Path
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import click
+
+from mloq.cli import config_file_opt, hydra_args, output_directory_arg
+from mloq.commands import command_names
+from mloq.profiling import span
+
+
+class Drift(NamedTuple):
+    """
+    Difference between a file generated by mloq and the file present in the project.
+
+    Attributes of this class:
+        path: Path of the file relative to the project root.
+        status: "missing" if the file does not exist, or "modified" if its content is
+            different from the content mloq would generate.
+        detail: Short description of the difference, such as the lines added and removed.
+        expected: Content that mloq would generate.
+    """
+
+    path: Path
+    status: str
+    detail: str
+    expected: str
+
+
+def encode_rendered(content: str) -> bytes:
+    """Return the bytes written to disk for the provided rendered template."""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode(locale.getpreferredencoding(False))
+
+
+def _is_unchanged(path: Path, expected: str, manifest, stat: os.stat_result) -> bool:
+    """
+    Return True if the manifest proves that the file was written with the expected content.
+
+    The file is not read when it was not touched since mloq generated it. In that case
+    its size and modification time match the manifest, and the hash in the manifest is
+    the hash of the content that would be generated now.
+    """
+    from mloq.manifest import hash_bytes
+
+    entry = manifest.get(path) if manifest is not None else None
+    return (
+        entry is not None
+        and entry.size == stat.st_size
+        and entry.mtime_ns == stat.st_mtime_ns
+        and entry.content_hash == hash_bytes(expected.encode("utf-8"))
+    )
+
+
+def compare_file(
+    root: Path,
+    path: Path,
+    expected: str,
+    manifest=None,
+) -> Optional[Drift]:
+    """
+    Compare the file present in the project with the content that mloq would generate.
+
+    The comparison short-circuits on the file size, and on the hashes stored in the
+    project manifest, before reading the file.
+
+    Args:
+        root: Root directory of the project.
+        path: Path of the file relative to the project root.
+        expected: Content that mloq would generate.
+        manifest: Manifest of the project, if it was generated with `--incremental`.
+
+    Returns:
+        Drift describing the difference, or None if the file is up to date.
+    """
+    target = root / path
+    try:
+        stat = target.stat()
+    except OSError:
+        return Drift(path, "missing", "does not exist", expected)
+    if _is_unchanged(path, expected, manifest, stat):
+        return None
+    expected_bytes = encode_rendered(expected)
+    if stat.st_size != len(expected_bytes):
+        return Drift(path, "modified", _line_changes(target, expected), expected)
+    with open(target, "rb") as f:
+        if f.read() == expected_bytes:
+            return None
+    return Drift(path, "modified", _line_changes(target, expected), expected)
+
+
+def _read_text(path: Path) -> str:
+    with open(path, "r", errors="replace") as f:
+        return f.read()
+
+
+def _line_changes(target: Path, expected: str) -> str:
+    """Return the number of lines that differ between the file and its expected content."""
+    current = _read_text(target).splitlines()
+    added = removed = 0
+    matcher = difflib.SequenceMatcher(None, expected.splitlines(), current, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            removed += i2 - i1
+            added += j2 - j1
+    if not added and not removed:
+        return "whitespace or line endings"
+    return f"+{added} -{removed} lines"
+
+
+def unified_diff(root: Path, drift: Drift) -> str:
+    """Return the unified diff between the expected content of the file and the project file."""
+    current = "" if drift.status == "missing" else _read_text(root / drift.path)
+    name = drift.path.as_posix()
+    return "".join(
+        difflib.unified_diff(
+            drift.expected.splitlines(keepends=True),
+            current.splitlines(keepends=True),
+            fromfile=f"mloq/{name}",
+            tofile=name,
+        ),
+    )
+
+
+def render_project(
+    config_file: Union[Path, str],
+    command_name: str = "setup",
+    hydra_args: Iterable[str] = (),
+    workers: int = 1,
+) -> Dict[Path, str]:
+    """
+    Render in memory all the files that mloq generates for the provided configuration.
+
+    Args:
+        config_file: Path to the mloq.yaml file of the project.
+        command_name: Name of the mloq command that generates the files.
+        hydra_args: Hydra overrides applied to the project configuration.
+        workers: Number of threads used to render the templates.
+
+    Returns:
+        Dictionary containing the rendered files indexed by their path relative to
+        the project root.
+    """
+    from mloq.runner import build_record
+    from mloq.writer import Writer
+
+    # Only plan the record, without running the side effects of the command
+    record = build_record(command_name, config_file, hydra_args, side_effects=False)
+    with span("Writer.render"):
+        return Writer(path=Path(), record=record, workers=workers).render()
+
+
+def check_project(
+    config_file: Union[Path, str],
+    directory: Union[Path, str],
+    command_name: str = "setup",
+    hydra_args: Iterable[str] = (),
+    workers: int = 8,
+    exclude: Iterable[str] = (),
+) -> List[Drift]:
+    """
+    Compare the files of a project with the files that mloq would generate for it.
+
+    Args:
+        config_file: Path to the mloq.yaml file of the project.
+        directory: Root directory of the project.
+        command_name: Name of the mloq command that generates the files.
+        hydra_args: Hydra overrides applied to the project configuration.
+        workers: Number of threads used to render and compare the files.
+        exclude: Glob patterns matching the paths of the files that are not checked.
+
+    Returns:
+        List of Drift describing the files that are missing or modified, in the order
+        mloq generates them.
+    """
+    from mloq.manifest import Manifest, MANIFEST_FILE
+
+    directory = Path(directory)
+    expected = render_project(config_file, command_name, hydra_args, workers=workers)
+    patterns = tuple(exclude)
+    files: List[Tuple[Path, str]] = [
+        (path, content)
+        for path, content in expected.items()
+        if not any(fnmatch.fnmatch(path.as_posix(), pattern) for pattern in patterns)
+    ]
+    manifest = Manifest.load(directory / MANIFEST_FILE)
+    with span("compare_files", files=len(files)):
+        if workers > 1 and len(files) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(
+                    pool.map(lambda item: compare_file(directory, *item, manifest), files),
+                )
+        else:
+            results = [compare_file(directory, p, content, manifest) for p, content in files]
+    return [drift for drift in results if drift is not None]
+
+
+def format_drift(drifts: List[Drift]) -> str:
+    """Return a compact summary of the files that are not up to date."""
+    lines = [f"{d.status:<10}{d.path.as_posix()}  ({d.detail})" for d in drifts]
+    lines.append(f"{len(drifts)} file{'s are' if len(drifts) != 1 else ' is'} out of date.")
+    return "\n".join(lines)
+
+
+@click.command(context_settings=dict(ignore_unknown_options=True))
+@click.option(
+    "--command",
+    "command_name",
+    default="setup",
+    show_default=True,
+    type=click.Choice(command_names()),
+    help="mloq command that generates the files of the project.",
+)
+@config_file_opt
+@output_directory_arg
+@click.option(
+    "--exclude",
+    "-e",
+    multiple=True,
+    help="Glob pattern of the files that are not checked. It can be used multiple times.",
+)
+@click.option(
+    "--diff/--no-diff",
+    default=False,
+    show_default=True,
+    help="Print the unified diff of the files that are out of date.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    default=8,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of threads used to render and compare the files.",
+)
+@hydra_args
+def check(
+    command_name: str,
+    config_file: Optional[str],
+    output_directory: str,
+    exclude: Tuple[str, ...],
+    diff: bool,
+    workers: int,
+    hydra_args: Tuple[str, ...],
+):
+    """
+    Check that the files of the project are up to date with its mloq.yaml.
+
+    The files are rendered in memory and compared with the files present in
+    OUTPUT_DIRECTORY. The command exits with code 1 if any file is missing or modified.
+    """
+    from mloq.runner import find_config_file
+
+    config_path = find_config_file(config_file)
+    if not config_path.is_file():
+        raise click.UsageError(f"Configuration file {config_path} does not exist.")
+    start = time.perf_counter()
+    drifts = check_project(
+        config_file=config_path,
+        directory=Path(output_directory),
+        command_name=command_name,
+        hydra_args=hydra_args,
+        workers=workers,
+        exclude=exclude,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if not drifts:
+        click.echo(f"All files are up to date ({elapsed:.0f} ms).")
+        return
+    if diff:
+        for drift in drifts:
+            click.echo(unified_diff(Path(output_directory), drift), nl=False)
+    click.echo(format_drift(drifts))
+    raise SystemExit(1)
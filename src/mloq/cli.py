@@ -1,14 +1,24 @@
 """Command line interface for mloq."""
-import os
-from pathlib import Path
+from importlib import import_module
 from typing import Callable, Optional
 
 import click
 
+from mloq.commands import command_names, COMMANDS
+from mloq.profiling import parse_profile_spec, PROFILE_ENV
 from mloq.runner import run_command
 from mloq.version import __version__
 
 
+def _validate_profile(ctx, param, value: Optional[str]) -> Optional[str]:
+    """Check that the value of the --profile option only contains valid formats."""
+    try:
+        parse_profile_spec(value or "")
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    return value
+
+
 overwrite_opt = click.option(
     "--overwrite/--no-overwrite",
     "-o/ ",
@@ -16,6 +26,26 @@ overwrite_opt = click.option(
     show_default=True,
     help="Value indicating whether to overwrite existing files.",
 )
+incremental_opt = click.option(
+    "--incremental/--no-incremental",
+    default=False,
+    show_default=True,
+    help="Only render and write the files whose content changed since the last run.",
+)
+prune_opt = click.option(
+    "--prune/--no-prune",
+    default=False,
+    show_default=True,
+    help="Remove the files generated by previous runs that are not generated anymore, "
+    "unless they were modified.",
+)
+atomic_opt = click.option(
+    "--atomic/--no-atomic",
+    default=False,
+    show_default=True,
+    help="Stage the generated files and move them into place at once, so an interrupted "
+    "run leaves the project unchanged.",
+)
 config_file_opt = click.option(
     "--filename",
     "-f",
@@ -45,6 +75,47 @@ interactive_opt = click.option(
     help="If True the configuration values will be defined interactively on the command line.",
 )
 
+workers_opt = click.option(
+    "--workers",
+    "-w",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of threads used to render and write the generated files.",
+)
+
+link_mode_opt = click.option(
+    "--link-mode",
+    default="copy",
+    show_default=True,
+    type=click.Choice(["copy", "hardlink", "symlink"]),
+    help="How static files (licenses, requirements...) are placed in the project.",
+)
+
+plan_opt = click.option(
+    "--plan/--no-plan",
+    default=False,
+    show_default=True,
+    help="Print the files that would be created, overwritten or skipped without writing them.",
+)
+plan_format_opt = click.option(
+    "--plan-format",
+    default="text",
+    show_default=True,
+    type=click.Choice(["text", "json"]),
+    help="Output format of --plan.",
+)
+
+profile_opt = click.option(
+    "--profile",
+    default=None,
+    envvar=PROFILE_ENV,
+    show_envvar=True,
+    callback=_validate_profile,
+    help="Print the time spent in every phase. Comma separated list of formats: table, "
+    "trace[:FILE] (Chrome trace JSON), cprofile[:FILE] and pyinstrument[:FILE].",
+)
+
 hydra_args = click.argument("hydra_args", nargs=-1, type=click.UNPROCESSED)
 
 
@@ -53,6 +124,14 @@ def mloq_click_command(func):
     func = hydra_args(func)
     func = only_config_opt(func)
     func = interactive_opt(func)
+    func = profile_opt(func)
+    func = workers_opt(func)
+    func = link_mode_opt(func)
+    func = plan_format_opt(func)
+    func = plan_opt(func)
+    func = atomic_opt(func)
+    func = prune_opt(func)
+    func = incremental_opt(func)
     func = overwrite_opt(func)
     func = output_directory_arg(func)
     func = config_file_opt(func)
@@ -60,30 +139,37 @@ def mloq_click_command(func):
     return func
 
 
+# Commands that do not generate files from a Command class: name -> (module, click command)
+CLI_COMMANDS = {
+    "batch": ("mloq.batch", "batch"),
+    "check": ("mloq.check", "check"),
+    "deps": ("mloq.deps", "deps"),
+    "watch": ("mloq.watch", "watch"),
+}
+
+
 class MloqCLI(click.MultiCommand):
-    """Load the commands available at runtime from the files present in the command module."""
+    """
+    Load the commands registered in :mod:`mloq.commands`.
 
-    command_folder = Path(__file__).parent / "commands"
+    The commands are resolved lazily: the module defining a Command class is only
+    imported when the command is invoked, so listing the commands or displaying their
+    help does not pay for importing the command modules, hydra or jinja.
+    """
 
     def list_commands(self, ctx):
         """List the names of the mloq commands available."""
-        rv = []
-        for filename in os.listdir(self.command_folder):
-            if filename.endswith(".py") and filename != "__init__.py":
-                rv.append(filename[:-3])
-        rv.sort()
-        return rv
-
-    def get_command(self, ctx, name) -> Callable:
+        return sorted(command_names() + list(CLI_COMMANDS))
+
+    def get_command(self, ctx, name) -> Optional[Callable]:
         """Create the command callable corresponding to the provided command name."""
-        ns = {}
-        fn = os.path.join(self.command_folder, name + ".py")
-        with open(fn) as f:
-            code = compile(f.read(), fn, "exec")
-            eval(code, ns, ns)
-        command_class = ns[f"{name.capitalize()}CMD"]
+        if name in CLI_COMMANDS:
+            module_name, command_name = CLI_COMMANDS[name]
+            return getattr(import_module(module_name), command_name)
+        elif name not in COMMANDS:
+            return None
         # TODO: handle exit codes if needed
-        return run_command(command_class)
+        return run_command(name)
 
 
 @click.command(cls=MloqCLI)
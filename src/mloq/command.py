@@ -6,6 +6,7 @@ from omegaconf import DictConfig
 
 from mloq.config.configuration import as_resolved_dict
 from mloq.config.prompt import Promptable
+from mloq.profiling import span
 from mloq.writer import CMDRecord
 
 
@@ -14,6 +15,10 @@ class CommandMixin:
 
     files: tuple = tuple()
     cmd_name = "command"
+    # If False, the record of the command is not cached between runs. Commands whose side
+    # effects must run every time, or whose files depend on anything other than the
+    # configuration and the mloq assets, must set it to False.
+    cacheable = True
 
     def __init__(self, record: CMDRecord, interactive: bool = False, *args, **kwargs):
         """
@@ -114,10 +119,30 @@ class CommandMixin:
                 the files and directories that will be generated by mloq
                 are recorded within the 'record' instance.
         """
-        self.configure()
-        self.record_directories()
-        self.record_files()
-        self.run_side_effects()
+        self.plan()
+        with span("run_side_effects", command=self.cmd_name):
+            self.run_side_effects()
+        return self.record
+
+    def plan(self) -> CMDRecord:
+        """
+        Record the files and directories generated by mloq without running side effects.
+
+        It updates the configuration and registers the files and directories in the
+        'record' instance, the same way as `run` does, but skips `run_side_effects`.
+
+        Returns:
+            The CMDRecord instance containing the files and directories that will be
+                generated by mloq.
+        """
+        with span("configure", command=self.cmd_name):
+            self.configure()
+        with span("record_directories", command=self.cmd_name):
+            with self.record.owned_by(self.cmd_name):
+                self.record_directories()
+        with span("record_files", command=self.cmd_name):
+            with self.record.owned_by(self.cmd_name):
+                self.record_files()
         return self.record
 
 
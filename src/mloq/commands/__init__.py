@@ -1,11 +1,54 @@
-"""Contains all the defined mloq Commands."""
-from mloq.commands.ci import CiCMD
-from mloq.commands.docker import DockerCMD
-from mloq.commands.docs import DocsCMD
-from mloq.commands.globals import GlobalsCMD
-from mloq.commands.license import LicenseCMD
-from mloq.commands.lint import LintCMD
-from mloq.commands.package import PackageCMD
-from mloq.commands.project import ProjectCMD
-from mloq.commands.requirements import RequirementsCMD
-from mloq.commands.setup import SetupCMD
+"""
+Contains all the defined mloq Commands.
+
+The commands are resolved lazily: importing :mod:`mloq.commands` does not import
+any of the command modules. Each command class is imported the first time it is
+accessed, either as an attribute of this module or using :func:`get_command_class`.
+"""
+from importlib import import_module
+from typing import Dict, List, Tuple
+
+
+# Static index of the available commands: command name -> (module, class name).
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "ci": ("mloq.commands.ci", "CiCMD"),
+    "docker": ("mloq.commands.docker", "DockerCMD"),
+    "docs": ("mloq.commands.docs", "DocsCMD"),
+    "globals": ("mloq.commands.globals", "GlobalsCMD"),
+    "license": ("mloq.commands.license", "LicenseCMD"),
+    "lint": ("mloq.commands.lint", "LintCMD"),
+    "package": ("mloq.commands.package", "PackageCMD"),
+    "project": ("mloq.commands.project", "ProjectCMD"),
+    "requirements": ("mloq.commands.requirements", "RequirementsCMD"),
+    "setup": ("mloq.commands.setup", "SetupCMD"),
+}
+
+_CLASS_TO_MODULE = {cls_name: module for module, cls_name in COMMANDS.values()}
+
+__all__ = sorted(_CLASS_TO_MODULE)
+
+
+def command_names() -> List[str]:
+    """Return the sorted names of the available mloq commands."""
+    return sorted(COMMANDS)
+
+
+def get_command_class(name: str) -> type:
+    """
+    Import and return the Command class registered under the provided name.
+
+    Args:
+        name: Name of the command, as typed in the command line (e.g. "lint").
+
+    Returns:
+        The Command class that implements the target command.
+    """
+    module_name, cls_name = COMMANDS[name]
+    return getattr(import_module(module_name), cls_name)
+
+
+def __getattr__(name: str):
+    """Import the command classes on first access."""
+    if name in _CLASS_TO_MODULE:
+        return getattr(import_module(_CLASS_TO_MODULE[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -79,7 +79,7 @@ class DockerCMD(Command):
         try:
             _ = self.config.requirements
         except Exception:
-            self.config.requirements = []
+            self.conf["requirements"] = []
         return self.require_cuda_from_requirements(self.config)
 
     def get_base_image(self):
@@ -1,6 +1,5 @@
 """Mloq requirements command implementation."""
 from pathlib import Path
-import tempfile
 from typing import Iterable, List, Union
 
 import click
@@ -10,6 +9,7 @@ from mloq.command import Command
 from mloq.config.param_patch import param
 from mloq.files import ASSETS_PATH, File, file
 from mloq.record import CMDRecord
+from mloq.requirements import merge_requirements, requirements_index
 
 
 # Requirements files
@@ -107,23 +107,10 @@ class RequirementsCMD(Command):
             interactive: If True, parse the command configuration in interactive mode.
         """
         super(RequirementsCMD, self).__init__(record=record, interactive=interactive)
-        self._temp_dir = tempfile.TemporaryDirectory()
-        # File objects work referencing files present in the system. We create a requirements.txt
-        # temporary file to be consistent with that behavior.
-        reqs_src = Path(self._temp_dir.name) / "requirements.txt"
-        self._reqs_file = File(
-            name=requirements.name,
-            src=reqs_src,
-            dst=requirements.dst,
-            is_static=requirements.is_static,
-            description=requirements.description,
-        )
+        # The composed requirements.txt is generated in memory when recording the files
+        self._reqs_file = requirements
         self.files = tuple(list(self.files) + [self._reqs_file])
 
-    def __del__(self) -> None:
-        """Remove the temporary directory when the instance is deleted."""
-        self._temp_dir.cleanup()
-
     @classmethod
     def get_aliased_requirements_file(cls, option: str) -> File:
         """Get requirement file from aliased name."""
@@ -149,7 +136,7 @@ class RequirementsCMD(Command):
         Return the content requirements.txt file with pinned dependencies.
 
         The returned string contains the combined dependencies\
-         for the different options sorted alphabetically.
+         for the different options sorted alphabetically, without duplicates.
 
         Args:
             options: Iterable containing the aliased names of the target \
@@ -157,14 +144,17 @@ class RequirementsCMD(Command):
 
         Returns:
             str containing the pinned versions of all the selected requirements.
+
+        Raises:
+            RequirementConflict: If the selected options pin the same package to
+                different versions.
         """
-        requirements_text = ""
-        for i, opt in enumerate(options):
-            pref = "\n" if i > 0 else ""  # Ensure one requirement per line
-            requirements_text += pref + cls.read_requirements_file(opt)
-        # Sort requirements alphabetically
-        requirements_text = "\n".join(sorted(requirements_text.split("\n"))).lstrip("\n")
-        return requirements_text
+        index = requirements_index()
+        groups = []
+        for opt in options:
+            req_file = cls.get_aliased_requirements_file(opt)
+            groups.append((req_file.name, index[req_file.name]))
+        return "\n".join(req.line for req in merge_requirements(groups))
 
     '''def ___parse_config(self) -> DictConfig:
         """Update the configuration DictConfig with the Command parameters."""
@@ -206,7 +196,5 @@ class RequirementsCMD(Command):
         if self.requirements_is_empty(reqs_value):
             return
         reqs_content = self.compose_requirements(reqs_value)
-        with open(self._reqs_file.src, "w") as f:
-            f.write(reqs_content)
-
-        self.record.register_file(file=self._reqs_file, path=Path())
+        reqs_file = self._reqs_file._replace(content=reqs_content)
+        self.record.register_file(file=reqs_file, path=Path())
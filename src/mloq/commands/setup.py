@@ -44,6 +44,7 @@ class SetupCMD(CommandMixin):
     cmd_name = "setup"
     files = tuple([file for cmd in SUB_COMMANDS for file in cmd.files])
     SUB_COMMAND_CLASSES = SUB_COMMANDS
+    cacheable = all(cmd.cacheable for cmd in SUB_COMMANDS)
 
     def __init__(self, record: CMDRecord, interactive: bool = False):
         """
@@ -92,7 +93,14 @@ class SetupCMD(CommandMixin):
         for cmd in self.sub_commands:
             cmd.run_side_effects()
 
+    def record_directories(self) -> None:
+        """Register the directories of every sub command as outputs of the sub command."""
+        for cmd in self.sub_commands:
+            with self.record.owned_by(cmd.cmd_name):
+                cmd.record_directories()
+
     def record_files(self) -> None:
-        """Register the files that will be generated by mloq."""
+        """Register the files of every sub command as outputs of the sub command."""
         for cmd in self.sub_commands:
-            cmd.record_files()
+            with self.record.owned_by(cmd.cmd_name):
+                cmd.record_files()
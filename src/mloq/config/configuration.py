@@ -4,11 +4,12 @@ This module defines the Configurable class and associated logic.
 The Configurable class extends the param.Parameterizable class to keep track of
 the class parameters using an omegaconf.DictConfig.
 """
-import copy
 import dataclasses
 from dataclasses import field, make_dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Union
+import re
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple, Union
+import weakref
 
 import omegaconf
 from omegaconf import Container, MISSING, OmegaConf
@@ -113,6 +114,27 @@ PARAM_TO_TYPE = {
 }
 
 
+def lookup_param_type(table: Mapping[type, Any], param_type: type) -> Any:
+    """
+    Return the value of table corresponding to the closest ancestor of param_type.
+
+    The classes in the MRO of param_type are checked in order, so subclasses (such as
+    the patched parameters) get the value of their most specific registered base class.
+
+    Args:
+        table: Mapping that has parameter classes as keys.
+        param_type: Class of the target param.Parameter.
+
+    Returns:
+        Value of table for the closest registered class, or None if none is registered.
+    """
+    for base in param_type.__mro__:
+        value = table.get(base)
+        if value is not None:
+            return value
+    return None
+
+
 def param_to_dataclass_dict(
     obj: Union[param.Parameterized, Any],
 ) -> Dict[str, Tuple[type, DClassField]]:
@@ -130,11 +152,10 @@ def param_to_dataclass_dict(
     for k, v in obj.params().items():
         if k in ["name", "config"]:
             continue
-        for param_type, _type in PARAM_TO_TYPE.items():
-            if isinstance(v, param_type):
-                value = getattr(obj, k) if isinstance(obj, param.Parameterized) else v.default
-                data[k] = (_type, field(default=value))
-                break
+        _type = lookup_param_type(PARAM_TO_TYPE, v.__class__)
+        if _type is not None:
+            value = getattr(obj, k) if isinstance(obj, param.Parameterized) else v.default
+            data[k] = (_type, field(default=value))
     return data
 
 
@@ -161,28 +182,46 @@ def is_interpolation(s: str) -> bool:
     return "${" in s and "}" in s  # TODO: use regex
 
 
-def to_param_type(obj: param.Parameterized, config: DictConfig, key: str) -> Any:
-    """Transform the provided attribute of the target param.Parameterized object \
-    into the appropriate type so it can be stored in a configuration file."""
-    # Yaml cannot handle tuples, so we convert the value
-    config = copy.deepcopy(config)
-    OmegaConf.resolve(config)
-    param_obj = obj.param.params().get(key)
-    value = config[key] if not OmegaConf.is_missing(config, key) else param_obj.default
+def _to_param_type(param_obj: param.Parameter, value: Any) -> Any:
+    """Cast the resolved value of a configuration key to the type of the target parameter."""
+    if isinstance(value, str) and value == MISSING:
+        value = param_obj.default
     if isinstance(value, omegaconf.ListConfig):
         value = [x for x in value]
     elif isinstance(value, omegaconf.DictConfig):
         value = {**value}
-    type_ = PARAM_TO_TYPE.get(param_obj.__class__)
+    type_ = lookup_param_type(PARAM_TO_TYPE, param_obj.__class__)
     if type_ and not isinstance(value, type_):
         if value is None:
             value = value if param_obj.allow_None else type_()
-        else:
-            value = type_(value)  # if value is not None else type_()
-
+        elif _is_castable(value, type_):
+            value = type_(value)
     return value
 
 
+def _is_castable(value: Any, type_: type) -> bool:
+    """
+    Return True if value can be cast to type_ without losing its structure.
+
+    Containers are only cast to container types, so a mapping or a sequence assigned to a
+    scalar parameter is passed through and rejected by the parameter validation, instead
+    of being stored as its string representation.
+    """
+    if isinstance(value, (dict, omegaconf.DictConfig)):
+        return issubclass(type_, dict)
+    if isinstance(value, (list, tuple, omegaconf.ListConfig)):
+        return issubclass(type_, (list, tuple))
+    return True
+
+
+def to_param_type(obj: param.Parameterized, config: DictConfig, key: str) -> Any:
+    """Transform the provided attribute of the target param.Parameterized object \
+    into the appropriate type so it can be stored in a configuration file."""
+    # Only the target key is resolved, instead of resolving a copy of the whole config
+    value = safe_select(config, key, default=MISSING)
+    return _to_param_type(obj.param.params().get(key), value)
+
+
 def to_config(
     config: Union[
         omegaconf.DictConfig,
@@ -212,8 +251,13 @@ def resolve_as_dict(
 ) -> ConfigurationDict:
     """Transform the provided object into a dictionary resolving all its interpolations."""
     config: Union[Container, omegaconf.DictConfig] = to_config(config, **kwargs)
+    # Resolve all the interpolations once instead of resolving a copy for every key
     OmegaConf.resolve(config)
-    param_data: Dict[str, Any] = {k: to_param_type(obj, config, k) for k in config}
+    params = obj.param.params()
+    param_data: Dict[str, Any] = {}
+    for k in config:
+        value = MISSING if OmegaConf.is_missing(config, k) else config[k]
+        param_data[k] = _to_param_type(params.get(k), value)
     return param_data
 
 
@@ -237,8 +281,335 @@ def safe_select(cfg: DictConfig, key: str, default: Any = None) -> Any:
 
 def as_resolved_dict(cfg: DictConfig) -> ConfigurationDict:
     """Return a dictionary containing the resolved values for the provided DictConfig."""
-    resolved_dict = {k: safe_select(cfg, k) for k in cfg.keys()}
-    return resolved_dict
+    return dict(ConfigResolver(cfg).as_dict())
+
+
+INTERPOLATION_REGEX = re.compile(r"\$\{([^${}]+)\}")
+PLAIN_INTERPOLATION_REGEX = re.compile(r"\$\{([\w-]+(?:\.[\w-]+)*)\}")
+_NOT_FOUND = object()
+
+
+def interpolation_references(value: Any, key: str = "") -> Set[str]:
+    """
+    Return the keys referenced by the interpolations contained in the provided value.
+
+    Relative interpolations (such as `${.sibling}`) are transformed to full keys using the
+    key of the node that contains the value. Custom resolvers (such as `${oc.env:HOME}`)
+    do not reference other keys, but the interpolations nested in their arguments do.
+
+    Args:
+        value: Raw (unresolved) configuration value.
+        key: Full key of the value inside its configuration.
+
+    Returns:
+        Set containing the full keys of the referenced values.
+    """
+    if isinstance(value, dict):
+        return set().union(*(interpolation_references(v, key) for v in value.values()))
+    elif isinstance(value, (list, tuple)):
+        return set().union(*(interpolation_references(v, key) for v in value))
+    elif not isinstance(value, str) or "${" not in value:
+        return set()
+    references = set()
+    for ref in INTERPOLATION_REGEX.findall(value):
+        ref = ref.strip()
+        if ":" in ref or not ref:
+            continue
+        if ref.startswith("."):
+            n_dots = len(ref) - len(ref.lstrip("."))
+            parent = key.split(".")[:-n_dots] if n_dots <= key.count(".") + 1 else []
+            ref = ".".join(parent + [ref[n_dots:]])
+        references.add(ref)
+    return references
+
+
+def _parent_keys(key: str) -> List[str]:
+    """Return the keys of all the parent nodes of the target key, e.g. `a.b.c -> [a, a.b]`."""
+    parts = key.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts))]
+
+
+class _KeyIndex:
+    """
+    Set of dotted configuration keys indexed by their parent keys.
+
+    It finds the keys that are related to a target key (the key itself, its parents and
+    its children) without scanning all the keys in the set.
+    """
+
+    def __init__(self):
+        """Initialize an empty _KeyIndex."""
+        self._keys: Set[str] = set()
+        self._descendants: Dict[str, Set[str]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the target key is indexed."""
+        return key in self._keys
+
+    def add(self, key: str) -> None:
+        """Add the target key to the index."""
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        for parent in _parent_keys(key):
+            self._descendants.setdefault(parent, set()).add(key)
+
+    def discard(self, key: str) -> None:
+        """Remove the target key from the index if it is present."""
+        if key not in self._keys:
+            return
+        self._keys.discard(key)
+        for parent in _parent_keys(key):
+            descendants = self._descendants[parent]
+            descendants.discard(key)
+            if not descendants:
+                del self._descendants[parent]
+
+    def clear(self) -> None:
+        """Remove all the keys from the index."""
+        self._keys.clear()
+        self._descendants.clear()
+
+    def descendants(self, key: str) -> Set[str]:
+        """Return the indexed keys of the children of the target key at any depth."""
+        return set(self._descendants.get(key, ()))
+
+    def related(self, key: str) -> Set[str]:
+        """Return the indexed keys that are equal to, parents of or children of key."""
+        related = self.descendants(key)
+        related.update(k for k in [*_parent_keys(key), key] if k in self._keys)
+        return related
+
+
+class ConfigResolver:
+    """
+    Resolve the values of a DictConfig memoizing the results.
+
+    The raw values of the configuration are indexed once to build the graph of
+    interpolation dependencies (e.g. `docker.docker_org -> globals.owner`). Every key is
+    resolved at most once, including the keys that resolve to MISSING, and it remains
+    cached until `invalidate` is called for the key or for any of the keys it depends on.
+
+    The keys of the dependency graph are relative to the provided configuration.
+    """
+
+    def __init__(self, config: DictConfig):
+        """
+        Initialize a ConfigResolver.
+
+        Args:
+            config: Configuration that will be resolved. The resolver does not detect
+                modifications made to it, so `invalidate` needs to be called after
+                updating a value.
+        """
+        self._config = config
+        self._values: Dict[str, Any] = {}
+        self._as_dict: Optional[ConfigurationDict] = None
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        # Prefix indexes of the keys that have dependencies, the keys referenced by them,
+        # and the keys with a memoized value, so invalidating a key only visits the nodes
+        # related to it
+        self._indexed = _KeyIndex()
+        self._references = _KeyIndex()
+        self._cached = _KeyIndex()
+        self._resolving: Set[str] = set()
+        # Number of times the resolver has been invalidated
+        self.version = 0
+        self._index()
+
+    @property
+    def config(self) -> DictConfig:
+        """Return the configuration being resolved."""
+        return self._config
+
+    def _get_node(self, key: str) -> Optional[omegaconf.Node]:
+        """Return the node of the target key without resolving it, or None if it does not exist."""
+        node = self.config
+        for part in key.split("."):
+            if not isinstance(node, omegaconf.DictConfig):
+                return None
+            node = node._get_node(part, validate_access=False)
+            if node is None:
+                return None
+        return node
+
+    def _raw_value(self, key: str) -> Any:
+        """Return the unresolved value of the target key, or _NOT_FOUND if it does not exist."""
+        node = self._get_node(key)
+        if node is None:
+            return _NOT_FOUND
+        if OmegaConf.is_config(node):
+            return OmegaConf.to_container(node, resolve=False)
+        return node._value()
+
+    def _reference(self, key: str) -> Optional[str]:
+        """
+        Return the key referenced by the target value if it is a plain interpolation.
+
+        Plain interpolations (such as `${globals.owner}`) of untyped values resolve to the
+        referenced value, so they can be resolved using the memoized value of the reference.
+        """
+        if self.config._get_parent() is not None:  # Absolute keys refer to the parent config
+            return None
+        node = self._get_node(key)
+        if not isinstance(node, omegaconf.AnyNode) or not isinstance(node._value(), str):
+            return None
+        match = PLAIN_INTERPOLATION_REGEX.fullmatch(node._value())
+        return None if match is None else match.group(1)
+
+    def _index(self, key: Optional[str] = None) -> None:
+        """Record the interpolation dependencies of the values under the target key."""
+        if key is None:
+            pending = list(OmegaConf.to_container(self.config, resolve=False).items())
+        else:
+            for indexed in self._indexed.descendants(key):
+                self._set_dependencies(indexed, set())
+            value = self._raw_value(key)
+            pending = [] if value is _NOT_FOUND else [(key, value)]
+        while pending:
+            k, value = pending.pop()
+            if isinstance(value, dict):
+                pending.extend((f"{k}.{child}", v) for child, v in value.items())
+            else:
+                self._set_dependencies(k, interpolation_references(value, k))
+
+    def _set_dependencies(self, key: str, references: Set[str]) -> None:
+        """Replace the dependencies of key with the provided references."""
+        for ref in self._dependencies.pop(key, set()):
+            dependents = self._dependents[ref]
+            dependents.discard(key)
+            if not dependents:
+                del self._dependents[ref]
+                self._references.discard(ref)
+        self._indexed.discard(key)
+        if references:
+            self._dependencies[key] = references
+            self._indexed.add(key)
+            for ref in references:
+                self._dependents.setdefault(ref, set()).add(key)
+                self._references.add(ref)
+
+    def dependencies(self, key: str) -> Set[str]:
+        """Return the keys directly referenced by the interpolations of the target key."""
+        return set(self._dependencies.get(key, set()))
+
+    def dependents(self, key: str) -> Set[str]:
+        """
+        Return all the keys whose resolved value depends on the target key.
+
+        It includes the keys that depend on it transitively, and the keys that reference
+        any of its parent or child nodes.
+        """
+        found: Set[str] = set()
+        pending = [key]
+        while pending:
+            current = pending.pop()
+            for ref in self._references.related(current):
+                new = self._dependents[ref] - found
+                found |= new
+                pending.extend(new)
+        found.discard(key)
+        return found
+
+    def select(self, key: str, default: Any = None) -> Any:
+        """
+        Return the resolved value of the target key.
+
+        Return MISSING if the value is missing or it is an interpolation that
+        resolves to a missing value, and default if the key does not exist.
+        """
+        value = self._values.get(key, _NOT_FOUND)
+        if value is _NOT_FOUND and key not in self._values:
+            value = self._resolve(key)
+            self._values[key] = value
+            self._cached.add(key)
+        return default if value is _NOT_FOUND else value
+
+    def _resolve(self, key: str) -> Any:
+        """Resolve the target key reusing the memoized value of its plain interpolations."""
+        reference = self._reference(key)
+        if reference is not None and reference not in self._resolving:
+            self._resolving.add(reference)
+            try:
+                value = self.select(reference, default=_NOT_FOUND)
+            finally:
+                self._resolving.discard(reference)
+            if value is not _NOT_FOUND:
+                return value
+        return safe_select(self.config, key, default=_NOT_FOUND)
+
+    def as_dict(self) -> ConfigurationDict:
+        """Return a dictionary containing the resolved values of the top level keys."""
+        if self._as_dict is None:
+            self._as_dict = {k: self.select(k) for k in self.config.keys()}
+        return self._as_dict
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Discard the resolved values affected by a change of the target key.
+
+        Args:
+            key: Key that was modified. If None, discard all the cached values and
+                index the configuration again.
+        """
+        self._as_dict = None
+        self.version += 1
+        if key is None:
+            self._values.clear()
+            self._dependencies.clear()
+            self._dependents.clear()
+            for index in (self._indexed, self._references, self._cached):
+                index.clear()
+            self._index()
+            return
+        self._index(key)
+        for changed in self.dependents(key) | {key}:
+            for cached in self._cached.related(changed):
+                del self._values[cached]
+                self._cached.discard(cached)
+
+
+# Resolvers shared by all the nodes of a root configuration, indexed by the root's id
+_SHARED_RESOLVERS: "weakref.WeakValueDictionary[int, ConfigResolver]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def node_key(config: omegaconf.DictConfig) -> Optional[str]:
+    """
+    Return the full key of the provided node inside its root configuration.
+
+    Returns:
+        Dotted key of the node, an empty string if config is the root, or None if the
+        node cannot be addressed with a dotted key, e.g. if it is inside a list.
+    """
+    parts = []
+    node = config
+    while node._get_parent() is not None:
+        key = node._key()
+        if not isinstance(node._get_parent(), omegaconf.DictConfig) or not isinstance(key, str):
+            return None
+        elif "." in key:
+            return None
+        parts.append(key)
+        node = node._get_parent()
+    return ".".join(reversed(parts))
+
+
+def shared_resolver(config: omegaconf.DictConfig) -> ConfigResolver:
+    """
+    Return the ConfigResolver of the root configuration, shared by all its nodes.
+
+    Sharing one resolver per root keeps track of the interpolations between different
+    nodes, so a change to `globals.owner` invalidates `docker.docker_org` even if they
+    are managed by different Configurable instances.
+    """
+    resolver = _SHARED_RESOLVERS.get(id(config))
+    if resolver is None or resolver.config is not config:
+        resolver = ConfigResolver(config)
+        _SHARED_RESOLVERS[id(config)] = resolver
+    return resolver
 
 
 class OmegaConfInterface:
@@ -254,12 +625,74 @@ class OmegaConfInterface:
         """
         self._target = target
         self.allow_missing = allow_missing
+        self._resolver: Optional[ConfigResolver] = None
+        # Node used to build the resolver, its root, and its key inside the root
+        self._resolver_node: Optional[omegaconf.DictConfig] = None
+        self._resolver_root: Optional[omegaconf.DictConfig] = None
+        self._prefix = ""
+        self._resolved: Optional[ConfigurationDict] = None
+        self._resolved_version: Optional[Tuple[ConfigResolver, int]] = None
 
     @property
     def config(self) -> omegaconf.DictConfig:
         """Return a DictConfig containing the target configuration."""
         return self._target.config
 
+    @property
+    def resolver(self) -> ConfigResolver:
+        """
+        Return the ConfigResolver that memoizes the resolved values of the target config.
+
+        The resolver is shared with all the Configurable instances whose config is a node
+        of the same root configuration. Its keys are relative to the root.
+        """
+        config = self.config
+        root = config._get_root()
+        if self._resolver_node is not config or self._resolver_root is not root:
+            prefix = node_key(config)
+            if prefix is None:  # Not reachable from the root with a dotted key
+                self._resolver, self._prefix = ConfigResolver(config), ""
+            else:
+                self._resolver, self._prefix = shared_resolver(root), prefix
+            self._resolver_node, self._resolver_root = config, root
+        return self._resolver
+
+    def _full_key(self, key: str) -> str:
+        """Return the key of the resolver that corresponds to the target config key."""
+        return f"{self._prefix}.{key}" if self._prefix else key
+
+    @property
+    def resolved(self) -> ConfigurationDict:
+        """
+        Return a dictionary containing the resolved values of the target configuration.
+
+        The snapshot is reused until any value of the root configuration is modified
+        using the setters of a Configurable, and every value is resolved again only if it
+        depends on the modified key. Call `invalidate` after modifying a config without
+        using the setters.
+        """
+        resolver = self.resolver
+        version = resolver, resolver.version
+        if self._resolved is None or self._resolved_version != version:
+            self._resolved = {k: self.select(k) for k in self.config.keys()}
+            self._resolved_version = version
+        return self._resolved
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Discard the resolved values of the configuration after it has been modified.
+
+        Args:
+            key: Key that was modified. Only the values that depend on it are discarded,
+                including the values of other nodes of the root configuration. If None,
+                discard all the resolved values of the target config and its dependents.
+        """
+        resolver = self.resolver
+        if key is not None:
+            resolver.invalidate(self._full_key(key))
+        else:
+            resolver.invalidate(self._prefix or None)
+
     @property
     def interpolations(self) -> ConfigurationDict:
         """Return a dictionary containing the interpolations of the target configuration."""
@@ -269,14 +702,16 @@ class OmegaConfInterface:
     @property
     def missing(self) -> List[Union[str, int, Enum, float, bool]]:
         """Return a list containing the names of the configuration that are MISSING."""
-        return [k for k, v in as_resolved_dict(self.config).items() if v == MISSING]
+        return [k for k, v in self.resolved.items() if v == MISSING]
 
     def _resolve_inplace(self, key: Optional[str] = None) -> None:
         """Resolve and update the target attribute if it's an interpolation string."""
         if key is None:
             OmegaConf.resolve(self._target.config)
+            self.invalidate()
             return
         self.config[key] = self.select(key=key)
+        self.invalidate(key)
 
     def resolve(
         self,
@@ -296,12 +731,12 @@ class OmegaConfInterface:
         """
         if inplace:
             return self._resolve_inplace(key)
-        value = as_resolved_dict(self.config) if key is None else self.select(key=key)
+        value = dict(self.resolved) if key is None else self.select(key=key)
         return value
 
     def is_missing(self, key: str) -> bool:
         """Return True if the key target's attribute is Missing, otherwise return False."""
-        return safe_select(self.config, key) == MISSING
+        return self.select(key) == MISSING
 
     def is_interpolation(self, key: str) -> bool:
         """Check if the key target's attribute is an interpolation string."""
@@ -314,7 +749,8 @@ class OmegaConfInterface:
         Return MISSING if key corresponds to a missing value, or an
         interpolation that resolves to a missing value.
         """
-        return safe_select(self.config, key=key, default=default)
+        resolver = self.resolver
+        return resolver.select(self._full_key(key), default=default)
 
 
 class BaseConfig(OmegaConfInterface):
@@ -339,13 +775,14 @@ class BaseConfig(OmegaConfInterface):
     def __setitem__(self, key: str, value) -> Any:
         """Set the target config value."""
         self.config[key] = value
+        self.invalidate(key)
 
     def to_container(self, resolve: bool = False, **kwargs) -> Container:
         """Return a container containing the target's configuration."""
         try:
             return OmegaConf.to_container(self.config, resolve=resolve, **kwargs)
         except (MissingMandatoryValue, InterpolationToMissingValueError):
-            d = omegaconf.DictConfig(as_resolved_dict(self.config))
+            d = omegaconf.DictConfig(self.resolved)
             return OmegaConf.to_container(d, resolve=resolve, **kwargs)
 
     @staticmethod
@@ -384,6 +821,7 @@ class BaseConfig(OmegaConfInterface):
         conf = self._resolve_node(kwargs=kwargs, cfg_node=cfg_node, config=config)
         OmegaConf.set_struct(conf, True)
         self._target.config = conf  # TODO: make param.config constant
+        self.invalidate()
 
 
 class Config(BaseConfig):
@@ -414,24 +852,10 @@ class Config(BaseConfig):
 
     def to_param_type(self, key) -> Any:
         """Transform the value of the key target's parameter to a DictConfig compatible type."""
-        value = self.select(key)
-        param_obj = self.params.get(key)
-        if value == MISSING:
-            return param_obj.default
         # Yaml cannot handle python data types such as tuples, so we cast value
         # to the appropriate type after reading data from the the DictConfig
         # and before setting the corresponding param.key
-        if isinstance(value, omegaconf.ListConfig):
-            value = [x for x in value]
-        type_ = PARAM_TO_TYPE.get(param_obj.__class__)
-        if isinstance(param_obj, param.Tuple):
-            raise ValueError("TUPLE")
-        if type_ and not isinstance(value, type_):
-            if value is None:
-                value = value if param_obj.allow_None else type_()
-            else:
-                value = type_(value)
-        return value
+        return _to_param_type(self.params.get(key), self.select(key))
 
     def dataclass_dict(
         self,
@@ -444,11 +868,10 @@ class Config(BaseConfig):
         for k, v in self.params.items():
             if k in ignored:
                 continue
-            for param_type, _type in PARAM_TO_TYPE.items():
-                if isinstance(v, param_type):
-                    value = v.default if self._target is None else getattr(self._target, k)
-                    data[k] = (_type, field(default=value))
-                    break
+            _type = lookup_param_type(PARAM_TO_TYPE, v.__class__)
+            if _type is not None:
+                value = v.default if self._target is None else getattr(self._target, k)
+                data[k] = (_type, field(default=value))
         return data
 
     def to_dataclass(self) -> type:  # DataClass class, not an instance
@@ -464,6 +887,7 @@ class Config(BaseConfig):
 
     def sync(self):
         """Ensure the parameter values of the target class have the right type."""
+        self.invalidate()
         for k in self.config.keys():
             super(Configurable, self._target).__setattr__(k, self.to_param_type(k))
 
@@ -527,12 +951,15 @@ class Configurable(param.Parameterized):
         is_interp = is_interpolation(value)
         if value == MISSING or is_interp:
             self.config[key] = value
+            if hasattr(self, "conf"):
+                self.conf.invalidate(key)
             value = (
                 self.conf.to_param_type(key=key) if is_interp else self.param.params()[key].default
             )
         # Update the config dict as well as the parameters. Ignored during __init__ of parent class
         elif key in self.param.params() and hasattr(self, "conf"):
             self.config[key] = value
+            self.conf.invalidate(key)
             value = self.conf.to_param_type(key=key)
 
         super(Configurable, self).__setattr__(key, value)
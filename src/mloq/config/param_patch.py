@@ -1,4 +1,6 @@
 """Patch param to allow omegaconf Missing values and interpolation strings."""
+from typing import Dict
+
 from omegaconf import MISSING
 import param as param_
 
@@ -38,6 +40,16 @@ def _create_param__(item):
 
 
 PATCHED_PARAMETERS = {"String", "Integer", "Number", "Tuple", "Dict", "List", "ListSelector"}
+# Patched classes are created only once, so isinstance checks and lookups by type work
+_PATCHED_CLASSES: Dict[str, type] = {}
+
+
+def get_patched_param(item: str) -> type:
+    """Return the patched version of the target param.Parameter, creating it the first time."""
+    patched_class = _PATCHED_CLASSES.get(item)
+    if patched_class is None:
+        patched_class = _PATCHED_CLASSES.setdefault(item, _create_param__(item))
+    return patched_class
 
 
 class __ParamPatcher:
@@ -48,7 +60,7 @@ class __ParamPatcher:
     def __getattr__(self, item):
         """Patch the parameters included in PATCHED_PARAMETERS."""
         if item in PATCHED_PARAMETERS:
-            return _create_param__(item)
+            return get_patched_param(item)
         return getattr(param_, item)
 
     def __setattr__(self, key, value):
@@ -3,10 +3,10 @@ set up a project with mloq."""
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import click
-from omegaconf import DictConfig, MISSING, OmegaConf
+from omegaconf import MISSING, OmegaConf
 import param
 
-from mloq.config.configuration import as_resolved_dict, Configurable
+from mloq.config.configuration import Configurable, lookup_param_type
 from mloq.config.custom_click import confirm, prompt
 from mloq.failure import MissingConfigValue
 
@@ -274,18 +274,20 @@ class Prompt:
     def _init_prompts(self) -> None:
         """Initialize the prompts corresponding to the target Promptable parameters."""
         self._prompts = {}
-        conf: DictConfig = self._target.config
-        param_ = self._target.param
-        for name, value in as_resolved_dict(conf).items():
-            param_inst = getattr(param_, name)
-            type_ = type(param_inst)
-            prompt_cls = PARAM_TO_PROMPT.get(type_)
+        params = self._target.param.params()
+        for name, value in self._target.conf.resolved.items():
+            param_inst = params[name]
+            prompt_cls = lookup_param_type(PARAM_TO_PROMPT, type(param_inst))
             if prompt_cls is not None:
                 default = value if value is not MISSING else param_inst.default
                 self._prompts[name] = prompt_cls(name, self._target, default=default)
 
     def prompt(self, key: str, inplace: bool = False, **kwargs) -> Any:
         """Display the a prompt to interactively define the parameter values of target."""
+        if kwargs.get("default") is None and self._target.conf.is_interpolation(key):
+            # The parameter value is synced when the target is created, but the
+            # interpolation may point to nodes of the root config changed since then
+            kwargs["default"] = self._target.conf.to_param_type(key)
         val = self._prompts[key](**kwargs)
         if inplace:
             setattr(self._target, key, val)
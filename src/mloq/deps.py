@@ -0,0 +1,104 @@
+"""This module implements `mloq deps`, which shows the configuration values that \
+every template reads."""
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import click
+
+from mloq.commands import command_names
+
+
+def command_dependencies(command_name: str = "setup") -> Dict[str, Tuple[str, ...]]:
+    """
+    Return the configuration values read by every template that a command can generate.
+
+    Args:
+        command_name: Name of the mloq command.
+
+    Returns:
+        Dictionary mapping the destination of every file to the dotted paths of the
+        configuration values that its template reads. Static files have no dependencies,
+        and files that can be generated from several templates (such as LICENSE) list
+        the dependencies of all of them.
+    """
+    from mloq.commands import get_command_class
+    from mloq.files import what_mloq_generated
+    from mloq.manifest import file_dependencies
+
+    files = [*get_command_class(command_name).files, what_mloq_generated]
+    dependencies = {}
+    for file in files:
+        key = Path(file.dst).as_posix()
+        dependencies[key] = tuple(sorted({*dependencies.get(key, ()), *file_dependencies(file)}))
+    return dependencies
+
+
+def manifest_dependencies(directory: Path) -> Dict[str, Tuple[str, ...]]:
+    """
+    Return the dependencies stored in the manifest of a project generated by mloq.
+
+    Args:
+        directory: Root directory of a project generated with `--incremental`.
+
+    Returns:
+        Dictionary mapping the path of every generated file to the dotted paths of the
+        configuration values that its template read when it was generated.
+
+    Raises:
+        click.UsageError: If the project does not contain a manifest.
+    """
+    from mloq.manifest import Manifest, MANIFEST_FILE
+
+    manifest_path = Path(directory) / MANIFEST_FILE
+    if not manifest_path.is_file():
+        raise click.UsageError(f"{manifest_path} does not exist. Run mloq with --incremental.")
+    manifest = Manifest.load(manifest_path)
+    return {path: entry.dependencies for path, entry in manifest.entries.items()}
+
+
+def format_dependencies(dependencies: Dict[str, Tuple[str, ...]], fmt: str = "text") -> str:
+    """Return a string describing the provided dependency map in text or json format."""
+    if fmt == "json":
+        return json.dumps({k: list(v) for k, v in dependencies.items()}, indent=2)
+    lines = []
+    for path, deps in dependencies.items():
+        lines.append(path)
+        lines.extend(f"    {dep}" for dep in deps or ["(no configuration values)"])
+    return "\n".join(lines)
+
+
+@click.command()
+@click.argument(
+    "command_name",
+    default="setup",
+    type=click.Choice(command_names()),
+)
+@click.option(
+    "--manifest",
+    "-m",
+    "project_dir",
+    default=None,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    help="Show the dependencies stored in the manifest of this project instead.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    default="text",
+    show_default=True,
+    type=click.Choice(["text", "json"]),
+    help="Output format.",
+)
+def deps(command_name: str, project_dir: Optional[str], fmt: str):
+    """
+    Show the configuration values that the templates of a command read.
+
+    A file is only rendered again by `--incremental` runs when one of its dependencies
+    changes. COMMAND_NAME defaults to setup.
+    """
+    if project_dir is not None:
+        dependencies = manifest_dependencies(Path(project_dir))
+    else:
+        dependencies = command_dependencies(command_name)
+    click.echo(format_dependencies(dependencies, fmt))
@@ -15,3 +15,9 @@ class MissingConfigValue(Failure):
     """Raised when a parameter is not defined in the mloq DictConfig."""
 
     pass
+
+
+class RequirementConflict(Failure):
+    """Raised when the same package is required with incompatible version specifiers."""
+
+    pass
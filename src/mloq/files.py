@@ -19,6 +19,11 @@ class File(NamedTuple):
         description: Short description of the current file.
         is_static: Boolean value. If True, the templating file does not
             admit render parameters.
+        content: Content of the templating file when it is generated in memory
+            instead of being read from src. In that case src is only used to
+            identify the file, and it does not need to exist.
+        stream: If True, the file is rendered and written in chunks instead of
+            building its whole content in memory. Large templates are always streamed.
     """
 
     name: str
@@ -26,6 +31,8 @@ class File(NamedTuple):
     dst: Path
     description: str
     is_static: bool
+    content: Optional[str] = None
+    stream: bool = False
 
 
 def file(
@@ -34,6 +41,8 @@ def file(
     description: Optional[str] = None,
     dst: Optional[Union[Path, str]] = None,
     is_static: bool = False,
+    content: Optional[str] = None,
+    stream: bool = False,
 ) -> File:
     """Define a new asset as a File namedtuple."""
     if description is None:
@@ -46,6 +55,8 @@ def file(
         dst=dst,
         description=description,
         is_static=is_static,
+        content=content,
+        stream=stream,
     )
 
 
@@ -91,5 +102,7 @@ pyproject_toml = file(
 
 def read_file(file: File) -> str:
     """Return and string with the content of the provided file."""
+    if file.content is not None:
+        return file.content
     with open(file.src, "r") as f:
         return f.read()
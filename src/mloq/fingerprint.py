@@ -0,0 +1,202 @@
+"""This module computes the fingerprint of the inputs of a mloq command, and caches on \
+disk the CMDRecord computed from them, so the command does not run again until they change."""
+from functools import lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+import pickle
+import re
+from typing import Iterable, Optional, Tuple, Union
+
+import yaml
+
+from mloq import _logger
+from mloq.cache import get_cache_dir, write_atomic
+from mloq.files import ASSETS_PATH
+from mloq.record import CMDRecord
+from mloq.version import __version__
+
+
+# Increase it when the format of the cached records changes
+RECORD_CACHE_VERSION = 2
+# Maximum number of records kept in the cache. The least recently used ones are removed.
+MAX_CACHED_RECORDS = 128
+# Interpolations that call a resolver, such as ${oc.env:HOME}, can change between runs
+_RESOLVER_PATTERN = re.compile(r"\$\{[^}]*:")
+# The C loader is much faster, and it is available in most PyYAML installations
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def assets_hash(path: Union[Path, str] = ASSETS_PATH) -> str:
+    """
+    Return the sha256 hash of the names and contents of all the files inside path.
+
+    The contents are only read again when the modification time or the size of any
+    file changes, so the hash stays up to date in long-lived processes such as
+    `mloq watch` without reading the whole tree on every call.
+    """
+    snapshot = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            file = os.path.join(root, name)
+            try:
+                stat = os.stat(file)
+            except OSError:  # The file was removed while scanning
+                continue
+            snapshot.append((file, (stat.st_mtime_ns, stat.st_size)))
+    return _hash_files(str(path), tuple(sorted(snapshot)))
+
+
+@lru_cache(maxsize=4)
+def _hash_files(path: str, snapshot: Tuple[Tuple[str, Tuple[int, int]], ...]) -> str:
+    """Return the sha256 hash of the names and contents of the files in the snapshot."""
+    hasher = hashlib.sha256()
+    for name, _ in snapshot:
+        hasher.update(Path(name).relative_to(path).as_posix().encode("utf-8") + b"\0")
+        try:
+            hasher.update(Path(name).read_bytes())
+        except OSError:  # The file was removed after scanning
+            continue
+    return hasher.hexdigest()
+
+
+def source_hash() -> str:
+    """
+    Return a hash of the paths, sizes and modification times of the mloq source files.
+
+    It changes when the code of the commands is modified, even if the mloq version
+    is the same, such as in development installs.
+    """
+    package = Path(__file__).parent
+    hasher = hashlib.sha256()
+    for file in sorted(package.rglob("*.py")):
+        stat = file.stat()
+        name = file.relative_to(package).as_posix()
+        hasher.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}\0".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def canonical_config(config_file: Union[Path, str]) -> Optional[str]:
+    """
+    Return the canonical representation of the values defined in a mloq.yaml file.
+
+    Comments, formatting and quoting do not change the result, but the order of the keys
+    does, because it is preserved in the generated files.
+
+    Returns:
+        Json string containing the values of the file, or None if they cannot be
+        fingerprinted: when the file uses a hydra defaults list, which composes other
+        files, or interpolations that call a resolver, such as `${oc.env:HOME}`.
+    """
+    with open(config_file, "r") as f:
+        values = yaml.load(f, Loader=_YAML_LOADER)
+    canonical = json.dumps(values, separators=(",", ":"), default=str)
+    if isinstance(values, dict) and "defaults" in values:
+        return None
+    elif _RESOLVER_PATTERN.search(canonical):
+        return None
+    return canonical
+
+
+def config_fingerprint(
+    config_file: Union[Path, str],
+    command_name: str,
+    hydra_args: Iterable[str] = (),
+    side_effects: bool = True,
+) -> Optional[str]:
+    """
+    Return the fingerprint of all the inputs that determine the record of a command.
+
+    The fingerprint combines the canonical configuration, the hydra overrides, the
+    command and whether it runs its side effects, the mloq version, and the hashes of the mloq assets and source files.
+
+    Args:
+        config_file: Path to the mloq.yaml file of the project.
+        command_name: Name of the command, or qualified name of the Command class.
+        hydra_args: Hydra overrides applied to the project configuration.
+        side_effects: Whether the record is built running the command side effects, or
+            only planning the files it generates.
+
+    Returns:
+        Hexadecimal sha256 fingerprint, or None if the configuration cannot be
+        fingerprinted (see `canonical_config`) or the file cannot be read.
+    """
+    try:
+        config = canonical_config(config_file)
+    except (OSError, yaml.YAMLError) as e:
+        _logger.debug(f"Cannot fingerprint {config_file}: {e}")
+        return None
+    if config is None:
+        return None
+    inputs = [
+        str(RECORD_CACHE_VERSION),
+        __version__,
+        str(ASSETS_PATH),
+        assets_hash(),
+        source_hash(),
+        command_name,
+        json.dumps(list(hydra_args)),
+        str(bool(side_effects)),
+        config,
+    ]
+    return hashlib.sha256("\0".join(inputs).encode("utf-8")).hexdigest()
+
+
+def _record_path(fingerprint: str) -> Optional[Path]:
+    cache_dir = get_cache_dir("records")
+    return None if cache_dir is None else cache_dir / f"{fingerprint}.pkl"
+
+
+def load_cached_record(fingerprint: str) -> Optional[CMDRecord]:
+    """
+    Return the CMDRecord cached with the provided fingerprint.
+
+    Returns:
+        The cached CMDRecord, or None if it is not cached, caching is disabled, or the
+        cache entry cannot be read.
+    """
+    path = _record_path(fingerprint)
+    if path is None or not path.is_file():
+        return None
+    try:
+        with open(path, "rb") as f:
+            record = pickle.load(f)
+        os.utime(path)  # Keep track of the least recently used entries
+    except Exception as e:  # Corrupted entries are overwritten by the next run
+        _logger.debug(f"Ignoring invalid cached record {path}: {e}")
+        return None
+    _logger.debug(f"Using cached record {fingerprint}")
+    return record
+
+
+def save_cached_record(fingerprint: str, record: CMDRecord) -> None:
+    """Store the CMDRecord in the cache directory, indexed by its fingerprint."""
+    path = _record_path(fingerprint)
+    if path is None:
+        return
+    try:
+        written = write_atomic(
+            path,
+            lambda f: pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+    except Exception as e:  # The record is not cached, e.g. if it cannot be pickled
+        _logger.debug(f"Cannot cache record {fingerprint}: {e}")
+        return
+    if not written:
+        _logger.debug(f"Cannot write the cached record {fingerprint} to {path.parent}")
+        return
+    _evict(path.parent)
+
+
+def _evict(cache_dir: Path, max_records: int = MAX_CACHED_RECORDS) -> None:
+    """Remove the least recently used records if there are more than max_records."""
+    entries = list(cache_dir.glob("*.pkl"))
+    if len(entries) <= max_records:
+        return
+    try:
+        entries.sort(key=lambda p: p.stat().st_mtime_ns)
+        for entry in entries[: len(entries) - max_records]:
+            entry.unlink()
+    except OSError:  # Removed by another process
+        pass
@@ -0,0 +1,226 @@
+"""This module defines the Manifest, which keeps track of the content of the files \
+generated by mloq so they only need to be rendered and written when their inputs change."""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, Union
+
+from omegaconf import OmegaConf
+from omegaconf.errors import OmegaConfBaseException
+
+from mloq import _logger
+from mloq.files import File
+from mloq.templating import ALL_DEPENDENCIES, template_dependencies, template_source
+from mloq.version import __version__
+
+
+MANIFEST_FILE = ".mloq-manifest.json"
+
+
+class ManifestEntry(NamedTuple):
+    """
+    Information about a file generated by mloq.
+
+    Attributes of this class:
+        content_hash: Hash of the generated file content.
+        template_hash: Hash of the template used to generate the file.
+        config_hash: Hash of the configuration values used to render the template.
+        size: Size in bytes of the file when it was written.
+        mtime_ns: Modification time of the file when it was written.
+        dependencies: Dotted paths of the configuration values read by the template.
+    """
+
+    content_hash: str
+    template_hash: str
+    config_hash: str
+    size: int
+    mtime_ns: int
+    dependencies: Tuple[str, ...] = ()
+
+
+def new_hasher() -> "hashlib._Hash":
+    """Return a hash object using the algorithm used by mloq to fingerprint data."""
+    return hashlib.sha256()
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest used by mloq to fingerprint the provided data."""
+    hasher = new_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def hash_file(path: Union[Path, str]) -> str:
+    """Return the hash of the content of the target file."""
+    hasher = new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def template_hash(file: File) -> str:
+    """Return the hash of the template source of the provided file."""
+    return hash_bytes(template_source(file).encode("utf-8"))
+
+
+def file_dependencies(file: File) -> Tuple[str, ...]:
+    """Return the sorted dotted paths of the configuration values read by the file template."""
+    if file.is_static:
+        return ()
+    return tuple(sorted(template_dependencies(template_source(file))))
+
+
+def _container(value: Any) -> Any:
+    """Return the resolved value as a python object that can be serialized."""
+    if not OmegaConf.is_config(value):
+        return value
+    try:
+        return OmegaConf.to_container(value, resolve=True)
+    except OmegaConfBaseException:  # Missing values: hash the raw interpolations instead
+        return OmegaConf.to_container(value, resolve=False)
+
+
+def _select(config: Mapping[str, Any], path: str) -> Tuple[str, Any]:
+    """
+    Return the value of the dotted path in config.
+
+    If the path does not exist, for example because the template calls a method of a
+    value, return the deepest value of the path that exists.
+
+    Returns:
+        Tuple containing the path of the returned value and the value.
+    """
+    node, keys = config, []
+    for key in path.split("."):
+        try:
+            if isinstance(node, Mapping) and key in node:
+                child = node[key]
+            elif OmegaConf.is_list(node) and key.isdigit() and int(key) < len(node):
+                child = node[int(key)]
+            else:
+                break
+        except OmegaConfBaseException:  # Missing value: hash its parent
+            break
+        node = child
+        keys.append(key)
+    return ".".join(keys), node
+
+
+def config_hash(
+    file: File,
+    config: Mapping[str, Any],
+    dependencies: Optional[Iterable[str]] = None,
+) -> str:
+    """
+    Return the hash of the configuration values that the file template reads.
+
+    Only the values referenced in the template are taken into account, so changing a
+    value the template does not use keeps the hash unchanged. Static files are not
+    rendered, so their hash does not depend on the configuration.
+
+    Args:
+        file: File object representing the jinja template.
+        config: Configuration used to render the template.
+        dependencies: Dotted paths of the values read by the template. If None, they
+            are extracted from the template source.
+
+    Returns:
+        Hex digest of the configuration values read by the template.
+    """
+    if file.is_static:
+        return ""
+    dependencies = file_dependencies(file) if dependencies is None else dependencies
+    if ALL_DEPENDENCIES in dependencies:
+        dependencies = list(config)
+    values = {}
+    for dependency in dependencies:
+        if dependency.partition(".")[0] in config:
+            path, value = _select(config, dependency)
+            values[path] = _container(value)
+    return hash_bytes(json.dumps(values, sort_keys=True, default=str).encode("utf-8"))
+
+
+class Manifest:
+    """
+    Keep track of the hashes of the files generated by mloq.
+
+    It is stored as a json file next to WHAT_MLOQ_GENERATED.md. Its entries are indexed
+    by the path of the generated file relative to the project root.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, ManifestEntry]] = None):
+        """
+        Initialize a new instance of the Manifest class.
+
+        Args:
+            entries: Dictionary mapping the relative path of the generated files to
+                the corresponding ManifestEntry.
+        """
+        self._entries: Dict[str, ManifestEntry] = {} if entries is None else entries
+
+    def __contains__(self, path: Union[Path, str]) -> bool:
+        """Return True if the manifest contains an entry for the provided path."""
+        return self.key(path) in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the paths of the files registered in the manifest."""
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """Return the number of files registered in the manifest."""
+        return len(self._entries)
+
+    @property
+    def entries(self) -> Dict[str, ManifestEntry]:
+        """Return the dictionary containing the entries of the manifest."""
+        return self._entries
+
+    @staticmethod
+    def key(path: Union[Path, str]) -> str:
+        """Return the key used to index the provided path."""
+        return Path(path).as_posix()
+
+    def get(self, path: Union[Path, str]) -> Optional[ManifestEntry]:
+        """Return the entry corresponding to the provided path if it exists."""
+        return self._entries.get(self.key(path))
+
+    def register(self, path: Union[Path, str], entry: ManifestEntry) -> None:
+        """Add or replace the entry of the provided path."""
+        self._entries[self.key(path)] = entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a dictionary that can be serialized to json."""
+        files = {k: v._asdict() for k, v in sorted(self._entries.items())}
+        return {"mloq_version": __version__, "files": files}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Manifest":
+        """Create a Manifest from the data returned by `to_dict`."""
+        entries = {}
+        for path, entry in data.get("files", {}).items():
+            entry = {**entry, "dependencies": tuple(entry.get("dependencies", ()))}
+            entries[path] = ManifestEntry(**entry)
+        return cls(entries)
+
+    def dumps(self) -> str:
+        """Return the json representation of the manifest."""
+        return json.dumps(self.to_dict(), indent=2) + "\n"
+
+    def save(self, path: Union[Path, str]) -> None:
+        """Write the manifest as a json file to the target path."""
+        with open(path, "w") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "Manifest":
+        """Load the manifest stored in path. Return an empty manifest if it cannot be read."""
+        if not os.path.isfile(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            _logger.warning(f"Ignoring invalid manifest {path}: {e}")
+            return cls()
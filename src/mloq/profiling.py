@@ -0,0 +1,307 @@
+"""This module defines the timing spans used to profile the phases of a mloq command.
+
+Spans are disabled by default, and `span` returns a shared no-op context manager until a
+profiling session is started with `profile_session`. This allows instrumenting the hot
+paths of mloq without slowing down the runs that are not profiled.
+"""
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, NamedTuple, Optional
+
+
+PROFILE_ENV = "MLOQ_PROFILE"
+# Output formats of a profiling session, and the file they are written to by default
+PROFILE_MODES = {
+    "table": None,
+    "trace": "mloq-trace.json",
+    "cprofile": "mloq.prof",
+    "pyinstrument": "mloq-profile.html",
+}
+
+_NULL_SPAN = nullcontext()
+_profiler: Optional["Profiler"] = None
+
+
+class SpanEvent(NamedTuple):
+    """
+    Timing of a span measured by the Profiler.
+
+    Attributes of this class:
+        name: Name of the phase measured by the span.
+        start: Start time in seconds, relative to the start of the profiling session.
+        duration: Elapsed time in seconds.
+        thread_id: Identifier of the thread that ran the span.
+        depth: Number of spans that were open in the same thread when it started.
+        args: Additional information describing the span, such as the file written.
+    """
+
+    name: str
+    start: float
+    duration: float
+    thread_id: int
+    depth: int
+    args: Dict[str, Any]
+
+
+class Profiler:
+    """
+    Record the timing of the spans that run while it is active.
+
+    Attributes of this class:
+        events: List of SpanEvent containing the spans that have finished.
+        start_time: Value of `time.perf_counter` when the profiler was created.
+    """
+
+    def __init__(self):
+        """Initialize a new instance of the Profiler class."""
+        self.events: List[SpanEvent] = []
+        self.start_time = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, args: Dict[str, Any]) -> Iterator[None]:
+        """Measure the time spent inside the context and record it as a SpanEvent."""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._local.depth = depth
+            event = SpanEvent(
+                name=name,
+                start=start - self.start_time,
+                duration=duration,
+                thread_id=threading.get_ident(),
+                depth=depth,
+                args=args,
+            )
+            with self._lock:
+                self.events.append(event)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate the recorded spans by name.
+
+        Returns:
+            List of dictionaries containing the name, depth, number of calls, and the
+            total and maximum time of every phase, sorted by the time it first started.
+        """
+        phases: Dict[str, Dict[str, Any]] = {}
+        for event in sorted(self.events, key=lambda e: e.start):
+            phase = phases.setdefault(
+                event.name,
+                {"name": event.name, "depth": event.depth, "calls": 0, "total": 0.0, "max": 0.0},
+            )
+            phase["calls"] += 1
+            phase["total"] += event.duration
+            phase["max"] = max(phase["max"], event.duration)
+        return list(phases.values())
+
+    def format_table(self) -> str:
+        """Return a table with the time spent in every phase. Nested phases are indented."""
+        wall_time = max((e.start + e.duration for e in self.events), default=0.0)
+        lines = [f"{'phase':<40}{'calls':>7}{'total ms':>12}{'max ms':>12}{'% wall':>9}"]
+        for phase in self.summary():
+            name = "  " * phase["depth"] + phase["name"]
+            percent = 100 * phase["total"] / wall_time if wall_time else 0.0
+            lines.append(
+                f"{name:<40}{phase['calls']:>7}{phase['total'] * 1000:>12.2f}"
+                f"{phase['max'] * 1000:>12.2f}{percent:>9.1f}",
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Return the recorded spans in the Chrome trace event format.
+
+        The result can be loaded in chrome://tracing, Perfetto or speedscope.
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": event.name,
+                "cat": "mloq",
+                "ph": "X",
+                "ts": event.start * 1e6,
+                "dur": event.duration * 1e6,
+                "pid": pid,
+                "tid": event.thread_id,
+                "args": {k: str(v) for k, v in event.args.items()},
+            }
+            for event in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def span(name: str, **args) -> ContextManager:
+    """
+    Return a context manager that measures the time spent running a phase of mloq.
+
+    Args:
+        name: Name of the phase.
+        **args: Additional values describing the span, included in the Chrome trace.
+
+    Returns:
+        Context manager that records the span if profiling is enabled, or a shared
+        no-op context manager otherwise.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, args)
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Return a decorator that runs the decorated function inside a span."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(span_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def is_profiling() -> bool:
+    """Return True if a profiling session is active."""
+    return _profiler is not None
+
+
+def parse_profile_spec(spec: str) -> Dict[str, Optional[Path]]:
+    """
+    Parse the value of the `--profile` option or the MLOQ_PROFILE environment variable.
+
+    Args:
+        spec: Comma separated list of output formats: "table", "trace", "cprofile" and
+            "pyinstrument". Formats that write a file accept the path of the file after
+            a colon, e.g. "table,trace:trace.json".
+
+    Returns:
+        Dictionary mapping every output format to the path of the file it writes.
+
+    Raises:
+        ValueError: If the spec contains an unknown format.
+    """
+    outputs = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        mode, _, path = item.partition(":")
+        mode = mode.lower()
+        if mode not in PROFILE_MODES:
+            raise ValueError(
+                f"Invalid profile format {mode!r}. Valid formats: {', '.join(PROFILE_MODES)}",
+            )
+        default = PROFILE_MODES[mode]
+        outputs[mode] = Path(path or default) if (path or default) else None
+    return outputs
+
+
+@contextmanager
+def profile_session(
+    spec: Optional[str],
+    name: str = "mloq",
+    echo: Optional[Callable[[str], None]] = None,
+) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the code that runs inside the context, and write the results when it exits.
+
+    Args:
+        spec: Output formats, as described in `parse_profile_spec`. If it is None or
+            empty, profiling is disabled and the context yields None.
+        name: Name of the span that measures the whole session.
+        echo: Function used to print the phase table and the paths of the files
+            written. Defaults to printing to stderr.
+
+    Yields:
+        Active Profiler instance, or None if profiling is disabled.
+
+    Raises:
+        ValueError: If the spec contains an unknown format.
+        ImportError: If pyinstrument is requested and it is not installed.
+    """
+    global _profiler
+    outputs = parse_profile_spec(spec or "")
+    if not outputs:
+        yield None
+        return
+    if echo is None:
+        import sys
+
+        def echo(message: str) -> None:
+            print(message, file=sys.stderr)
+
+    profiler = Profiler()
+    stack = _start_samplers(outputs)
+    previous, _profiler = _profiler, profiler
+    try:
+        with profiler.span(name, {}):
+            yield profiler
+    finally:
+        _profiler = previous
+        for stop in reversed(stack):
+            stop()
+        _write_outputs(profiler, outputs, echo)
+
+
+def _start_samplers(outputs: Dict[str, Optional[Path]]) -> List[Callable[[], None]]:
+    """Start cProfile and pyinstrument if requested. Return the functions that stop them."""
+    stops = []
+    if "pyinstrument" in outputs:
+        try:
+            from pyinstrument import Profiler as Sampler
+        except ImportError as e:
+            raise ImportError(
+                "pyinstrument is not installed. Install it with 'pip install pyinstrument'",
+            ) from e
+        sampler = Sampler()
+        sampler.start()
+        path = outputs["pyinstrument"]
+
+        def stop_pyinstrument():
+            sampler.stop()
+            Path(path).write_text(sampler.output_html())
+
+        stops.append(stop_pyinstrument)
+    if "cprofile" in outputs:
+        import cProfile
+
+        c_profiler = cProfile.Profile()
+        c_profiler.enable()
+
+        def stop_cprofile():
+            c_profiler.disable()
+            c_profiler.dump_stats(str(outputs["cprofile"]))
+
+        stops.append(stop_cprofile)
+    return stops
+
+
+def _write_outputs(
+    profiler: Profiler,
+    outputs: Dict[str, Optional[Path]],
+    echo: Callable[[str], None],
+) -> None:
+    """Print the phase table and write the Chrome trace if they were requested."""
+    if "table" in outputs:
+        echo(profiler.format_table())
+    if "trace" in outputs:
+        with open(outputs["trace"], "w") as f:
+            json.dump(profiler.chrome_trace(), f)
+    for mode in ("trace", "cprofile", "pyinstrument"):
+        if mode in outputs:
+            echo(f"Profile {mode} written to {outputs[mode]}")
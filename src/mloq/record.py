@@ -1,33 +1,188 @@
 """This module contains the classes that keep track of the internal state of the\
  application when running a Command."""
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
 from omegaconf import DictConfig, OmegaConf
 
-from mloq.files import File
+from mloq import _logger
+from mloq.files import File, what_mloq_generated
+
+
+# Machine readable version of WHAT_MLOQ_GENERATED.md, written next to it
+LEDGER_FILE = str(Path(what_mloq_generated.dst).with_suffix(".json"))
 
 
 class Ledger:
-    """Keep track of the generated files."""
+    """
+    Keep track of the generated files and directories.
+
+    Files are indexed by the path where they are generated, so registering the same
+    path twice does not duplicate it. The ledger can be saved as a json file that
+    stores the description, the content hash and the command that generated every
+    file, and the directories.
+    """
 
     def __init__(self):
         """Initialize a new instance of the Ledger class."""
-        self._files = []
+        # Path of the file -> (name of the file, description)
+        self._files: "OrderedDict[Path, Tuple[str, str]]" = OrderedDict()
+        self._hashes: Dict[Path, str] = {}
+        # Path of the file or directory -> name of the command that generated it
+        self._commands: Dict[Path, str] = {}
+        self._directories: "OrderedDict[Path, None]" = OrderedDict()
+        self._sorted_files: Optional[List[Tuple[str, str]]] = None
 
     @property
     def files(self) -> List[Tuple[str, str]]:
-        """Return the list of generated file names."""
-        return [(str(f), d) for f, d in sorted(self._files)]
+        """Return the list of generated file names and descriptions sorted by name."""
+        if self._sorted_files is None:
+            entries = sorted((Path(name), d) for name, d in self._files.values())
+            self._sorted_files = [(str(name), d) for name, d in entries]
+        return list(self._sorted_files)
+
+    @property
+    def paths(self) -> List[Path]:
+        """Return the paths of the generated files in the order they were registered."""
+        return list(self._files)
+
+    @property
+    def directories(self) -> List[Path]:
+        """Return the generated directories in the order they were registered."""
+        return list(self._directories)
+
+    def register(
+        self,
+        file: Union[File, str, Path],
+        description: Optional[str] = None,
+        path: Optional[Union[str, Path]] = None,
+        command: Optional[str] = None,
+    ) -> None:
+        """
+        Add another generated file to the book.
 
-    def register(self, file: Union[File, str, Path], description: Optional[str] = None) -> None:
-        """Append another generated file to the book."""
+        Args:
+            file: File generated, or its name.
+            description: Description of the file. Defaults to the description of the File.
+            path: Path where the file is generated, relative to the project root.
+                Defaults to the name of the file.
+            command: Name of the command that generated the file, if it is known.
+
+        Raises:
+            ValueError: If file is not a File and description is None.
+        """
         if isinstance(file, File):
             description = file.description if description is None else description
             file = file.dst
         elif description is None:
             raise ValueError("description is None. Please provide a file description")
-        self._files.append((Path(file), description))
+        path = Path(file if path is None else path)
+        self._files[path] = (str(file), description)
+        self._set_command(path, command)
+        self._sorted_files = None
+
+    def register_directory(self, path: Union[str, Path], command: Optional[str] = None) -> None:
+        """Add another generated directory to the book, and the command that generated it."""
+        self._directories[Path(path)] = None
+        self._set_command(Path(path), command)
+
+    def command(self, path: Union[str, Path]) -> Optional[str]:
+        """Return the name of the command that generated the file or directory, if known."""
+        return self._commands.get(Path(path))
+
+    def _set_command(self, path: Path, command: Optional[str]) -> None:
+        if command is None:
+            self._commands.pop(path, None)
+        else:
+            self._commands[path] = command
+
+    def set_content_hash(self, path: Union[str, Path], content_hash: str) -> None:
+        """Store the hash of the content of a registered file."""
+        self._hashes[Path(path)] = content_hash
+
+    def content_hash(self, path: Union[str, Path]) -> Optional[str]:
+        """Return the hash of the content of the file, or None if it is not known."""
+        return self._hashes.get(Path(path))
+
+    def update(self, other: "Ledger", paths: Optional[Iterable[Union[str, Path]]] = None) -> None:
+        """
+        Add the files registered in another ledger that are not registered in this one.
+
+        Args:
+            other: Ledger containing the files to be added.
+            paths: If provided, only add the files of other whose path is included.
+        """
+        selected = None if paths is None else {Path(p) for p in paths}
+        for path, (name, description) in other._files.items():
+            if path in self._files or (selected is not None and path not in selected):
+                continue
+            self.register(name, description=description, path=path, command=other.command(path))
+            if path in other._hashes:
+                self.set_content_hash(path, other._hashes[path])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a dictionary containing the files and directories that can be saved as json."""
+        files = [
+            {
+                "path": path.as_posix(),
+                "name": name,
+                "description": description,
+                "content_hash": self._hashes.get(path),
+                "command": self._commands.get(path),
+            }
+            for path, (name, description) in self._files.items()
+        ]
+        directories = [
+            {"path": path.as_posix(), "command": self._commands.get(path)}
+            for path in self._directories
+        ]
+        return {"files": files, "directories": directories}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Ledger":
+        """Create a Ledger from the dictionary returned by `to_dict`."""
+        ledger = cls()
+        for entry in data.get("files", []):
+            ledger.register(
+                entry["name"],
+                description=entry["description"],
+                path=entry["path"],
+                command=entry.get("command"),
+            )
+            if entry.get("content_hash"):
+                ledger.set_content_hash(entry["path"], entry["content_hash"])
+        for entry in data.get("directories", []):
+            # Ledgers written by older versions store the directories as plain paths
+            if isinstance(entry, str):
+                ledger.register_directory(entry)
+            else:
+                ledger.register_directory(entry["path"], command=entry.get("command"))
+        return ledger
+
+    def dumps(self) -> str:
+        """Return the json representation of the ledger."""
+        return json.dumps(self.to_dict(), indent=2) + "\n"
+
+    def save(self, path: Union[Path, str]) -> None:
+        """Write the ledger as a json file to the target path."""
+        with open(path, "w") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "Ledger":
+        """Load the ledger stored in path. Return an empty ledger if it cannot be read."""
+        if not os.path.isfile(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            _logger.warning(f"Ignoring invalid ledger {path}: {e}")
+            return cls()
 
 
 class CMDRecord:
@@ -53,6 +208,9 @@ class CMDRecord:
         List of :class:`Path` instances pointing to the different directories
         that `mloq` will create.
 
+    It also keeps track of the command that registered each file and directory, and
+    of the names of all the commands whose outputs are part of the record.
+
     This class is initialized from a configuration dictionary. The dictionary
     can be either an :class:`omegaconf.DictConfig` or an empty dictionary.
     """
@@ -78,6 +236,9 @@ class CMDRecord:
         self._files = {} if files is None else files
         self._directories: List[Path] = [] if directories is None else directories
         self._config: DictConfig = DictConfig({}) if config is None else config
+        self._commands: List[str] = []
+        self._owners: Dict[Path, str] = {}
+        self._command: Optional[str] = None
 
     @property
     def config(self) -> DictConfig:
@@ -114,6 +275,35 @@ class CMDRecord:
         """Contain the folders that will be created by mloq for storing the project's files."""
         return self._directories
 
+    @property
+    def commands(self) -> List[str]:
+        """
+        Return the names of the commands that registered their outputs in the record.
+
+        It is empty if the files of the record were not registered by any command.
+        """
+        return list(self._commands)
+
+    def owner(self, path: Union[Path, str]) -> Optional[str]:
+        """Return the name of the command that registered the target file or directory."""
+        return self._owners.get(Path(path))
+
+    @contextmanager
+    def owned_by(self, command: str) -> Iterator[None]:
+        """
+        Register the files and directories added inside the context as outputs of command.
+
+        Args:
+            command: Name of the command that registers the files and directories.
+        """
+        if command not in self._commands:
+            self._commands.append(command)
+        previous, self._command = self._command, command
+        try:
+            yield
+        finally:
+            self._command = previous
+
     def update_config(self, config: DictConfig) -> None:
         """Update the configuration attribute according to the values entered by the user."""
         self._config = OmegaConf.merge(self._config, config)
@@ -134,15 +324,13 @@ class CMDRecord:
         if description is None and not file.description:
             raise ValueError("File description cannot be None. Please provide a description.")
         elif description is not None:
-            file = File(
-                name=file.name,
-                src=file.src,
-                dst=file.dst,
-                description=description,
-                is_static=file.is_static,
-            )
+            file = file._replace(description=description)
         self.files[Path(path) / file.dst] = file
+        if self._command is not None:
+            self._owners[Path(path) / file.dst] = self._command
 
     def register_directory(self, path: Union[Path, str]) -> None:
         """Append a new directory path to the 'directories' container."""
         self.directories.append(Path(path))
+        if self._command is not None:
+            self._owners[Path(path)] = self._command
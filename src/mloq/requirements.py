@@ -0,0 +1,201 @@
+"""This module parses the requirement files shipped with mloq and merges them into a \
+single list of pinned requirements."""
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from mloq import _logger
+from mloq.cache import get_cache_dir, write_atomic
+from mloq.failure import RequirementConflict
+from mloq.files import ASSETS_PATH
+
+
+REQUIREMENTS_PATH = ASSETS_PATH / "requirements"
+INDEX_FILE = "requirements-index.json"
+REQUIREMENT_REGEX = re.compile(
+    r"^(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*"
+    r"(?P<extras>\[[^\]]*\])?\s*"
+    r"(?P<specifier>[^;]*?)\s*"
+    r"(?:;\s*(?P<markers>.*?))?\s*$",
+)
+
+
+class Requirement(NamedTuple):
+    """
+    Parsed line of a requirements file.
+
+    Attributes of this class:
+        name: Normalized name of the package, as defined in PEP 503.
+        extras: Extras of the requirement, such as `[all]`.
+        specifier: Version specifier, such as `==1.0.1`.
+        markers: Environment markers, such as `python_version < "3.8"`.
+        line: Requirement as written in the file, without comments.
+    """
+
+    name: str
+    extras: str
+    specifier: str
+    markers: str
+    line: str
+
+
+def normalize_name(name: str) -> str:
+    """Return the normalized name of a python package, as defined in PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirement(line: str) -> Requirement:
+    """
+    Parse a line of a requirements file.
+
+    Args:
+        line: Requirement specification without comments.
+
+    Returns:
+        Requirement containing the parsed line.
+
+    Raises:
+        ValueError: If the line is not a valid requirement specification.
+    """
+    line = line.strip()
+    match = REQUIREMENT_REGEX.match(line)
+    if match is None:
+        raise ValueError(f"Invalid requirement: {line!r}")
+    return Requirement(
+        name=normalize_name(match.group("name")),
+        extras=match.group("extras") or "",
+        specifier=re.sub(r"\s+", "", match.group("specifier")),
+        markers=(match.group("markers") or "").strip(),
+        line=line,
+    )
+
+
+def parse_requirements(text: str) -> List[Requirement]:
+    """Parse the content of a requirements file, ignoring comments and blank lines."""
+    requirements = []
+    for line in text.splitlines():
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        if line:
+            requirements.append(parse_requirement(line))
+    return requirements
+
+
+def hash_requirement_files(path: Union[Path, str] = REQUIREMENTS_PATH) -> Dict[str, str]:
+    """Return a dictionary containing the hash of every requirements file in path."""
+    return {
+        file.name: hashlib.sha256(file.read_bytes()).hexdigest()
+        for file in sorted(Path(path).glob("*.txt"))
+    }
+
+
+def _load_index(cache_file: Path, hashes: Dict[str, str]) -> Optional[Dict[str, Tuple]]:
+    """Load the index stored in cache_file if it was built from files with the same hashes."""
+    try:
+        with open(cache_file, "r") as f:
+            data = json.load(f)
+        if data.get("hashes") != hashes:
+            return None
+        return {
+            name: tuple(Requirement(*req) for req in reqs) for name, reqs in data["files"].items()
+        }
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+def _save_index(cache_file: Path, hashes: Dict[str, str], index: Dict[str, Tuple]) -> None:
+    """Write the index to the cache file atomically."""
+    data = {"hashes": hashes, "files": {k: [list(r) for r in v] for k, v in index.items()}}
+    if not write_atomic(cache_file, lambda f: json.dump(data, f), binary=False):
+        _logger.debug(f"Cannot cache the requirements index in {cache_file}")
+
+
+@lru_cache(maxsize=8)
+def _build_index(path: Path, hashes: Tuple[Tuple[str, str], ...]) -> Dict[str, Tuple]:
+    """Return the index of the requirement files with the provided hashes."""
+    hashes = dict(hashes)
+    cache_dir = get_cache_dir("requirements")
+    cache_file = None
+    if cache_dir is not None:
+        key = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+        cache_file = cache_dir / f"{key}-{INDEX_FILE}"
+        index = _load_index(cache_file, hashes)
+        if index is not None:
+            return index
+    _logger.debug(f"Indexing requirement files in {path}")
+    index = {name: tuple(parse_requirements((path / name).read_text())) for name in hashes}
+    if cache_file is not None:
+        _save_index(cache_file, hashes, index)
+    return index
+
+
+def requirements_index(path: Union[Path, str] = REQUIREMENTS_PATH) -> Dict[str, Tuple]:
+    """
+    Return the parsed requirements of every requirements file present in path.
+
+    The index is built only once for every version of the files: it is stored in the
+    mloq cache directory keyed by the hashes of the files, and kept in memory.
+
+    Args:
+        path: Directory containing the requirement files.
+
+    Returns:
+        Dictionary mapping the file names to a tuple containing their requirements.
+    """
+    path = Path(path)
+    hashes = hash_requirement_files(path)
+    return _build_index(path, tuple(sorted(hashes.items())))
+
+
+def merge_requirements(groups: Iterable[Tuple[str, Iterable[Requirement]]]) -> List[Requirement]:
+    """
+    Merge several lists of requirements removing the duplicated ones.
+
+    A requirement without specifier is merged with the pinned requirement of the same
+    package. The merged requirements are sorted by package name.
+
+    Args:
+        groups: Iterable of tuples containing the name of the source of the requirements
+            (used in error messages) and the requirements it defines.
+
+    Returns:
+        List of merged requirements.
+
+    Raises:
+        RequirementConflict: If the same package is required with different specifiers
+            for the same environment markers.
+    """
+    merged: Dict[Tuple[str, str], Tuple[Requirement, str]] = {}
+    for source, requirements in groups:
+        for req in requirements:
+            key = (req.name, req.markers)
+            if key not in merged:
+                merged[key] = (req, source)
+                continue
+            previous, previous_source = merged[key]
+            if not previous.specifier:
+                # Keep the pinned requirement
+                previous, req = req, previous
+                previous_source, source = source, previous_source
+            elif req.specifier and req.specifier != previous.specifier:
+                raise RequirementConflict(
+                    f"Conflicting requirements for {req.name}: {previous.line!r} in "
+                    f"{previous_source} and {req.line!r} in {source}",
+                )
+            if req.extras and req.extras != previous.extras:
+                previous = _merge_extras(previous, req)
+            merged[key] = (previous, previous_source)
+    return [req for _, (req, _) in sorted(merged.items())]
+
+
+def _merge_extras(req: Requirement, other: Requirement) -> Requirement:
+    """Return req requiring the extras of both requirements."""
+    extras = {
+        e.strip() for r in (req, other) for e in r.extras.strip("[]").split(",") if e.strip()
+    }
+    extras = f"[{','.join(sorted(extras))}]"
+    name = REQUIREMENT_REGEX.match(req.line).group("name")
+    line = f"{name}{extras}{req.specifier}" + (f"; {req.markers}" if req.markers else "")
+    return req._replace(extras=extras, line=line)
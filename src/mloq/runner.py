@@ -1,56 +1,170 @@
 """This module defines the pipeline for running a mloq command, such as config loading, \
 template writing and interfacing with click."""
+from collections import Counter
+import copy
+import json
 from pathlib import Path
-import sys
-from typing import Callable, Union
-from unittest.mock import patch
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING, Union
 
-import hydra
 from omegaconf import DictConfig, OmegaConf
 
 from mloq import _logger
-from mloq.command import Command
 from mloq.files import mloq_yml
+from mloq.profiling import profile_session, span, timed
 from mloq.record import CMDRecord
-from mloq.writer import Writer
 
 
-def load_config(config_file: Union[Path, str], hydra_args: str) -> DictConfig:
+if TYPE_CHECKING:
+    from mloq.command import Command
+    from mloq.writer import PlanEntry, Writer
+
+
+_config_cache: Dict[Tuple[str, int, Tuple[str, ...]], DictConfig] = {}
+_config_lock = threading.RLock()
+
+
+def find_config_file(config_file: Optional[Union[Path, str]] = None) -> Path:
+    """
+    Return the path to the mloq.yaml file referenced by config_file.
+
+    Args:
+        config_file: Path to a mloq.yaml file, or to the directory containing it.
+            Defaults to the mloq.yaml present in the current working directory.
+
+    Returns:
+        Path to the target mloq.yaml file. It may not exist.
+    """
+    config_file = Path(config_file) if config_file else Path() / mloq_yml.dst
+    return (
+        config_file
+        if (config_file.exists() and config_file.is_file())
+        else config_file / mloq_yml.dst
+    )
+
+
+@timed("compose_config")
+def _compose_config(config_file: Path, overrides: Tuple[str, ...]) -> DictConfig:
+    """
+    Load the target config file applying the provided hydra overrides.
+
+    Plain OmegaConf is used when there are no overrides and the file does not
+    define a hydra defaults list. Otherwise the config is composed using hydra's
+    compose API, which does not modify sys.argv, the logging configuration or the
+    working directory.
+    """
+    config = OmegaConf.load(config_file)
+    if overrides or "defaults" in config:
+        from inspect import signature
+
+        from hydra import compose, initialize_config_dir
+
+        init_kwargs = {}
+        if "version_base" in signature(initialize_config_dir).parameters:
+            init_kwargs["version_base"] = None
+        # Hydra keeps its initialization state in a global singleton
+        with initialize_config_dir(config_dir=str(config_file.parent), **init_kwargs):
+            config = compose(config_name=config_file.name, overrides=list(overrides))
+    # Keep the same behaviour as hydra: adding new keys to the loaded config is an error
+    OmegaConf.set_struct(config, True)
+    return config
+
+
+def clear_config_cache() -> None:
+    """Remove all the configurations cached by `load_config`."""
+    with _config_lock:
+        _config_cache.clear()
+
+
+@timed("load_config")
+def load_config(
+    config_file: Optional[Union[Path, str]],
+    hydra_args: Iterable[str] = (),
+) -> DictConfig:
     """
     Load the necessary configuration for running mloq from a mloq.yaml file.
 
     If no path to mloq.yaml is provided, it returns a template to be filled in
     using the interactive mode.
 
+    Loaded configurations are cached in memory using the path and modification time
+    of the file and the overrides as key, and every call returns a new copy of the
+    cached configuration. This function is thread safe.
+
     Args:
         config_file: Path to the target mloq.yaml file.
-        hydra_args: Arguments passed to hydra for composing the project configuration.
+        hydra_args: Hydra overrides applied when composing the project
+            configuration (e.g. "globals.owner=FragileTech").
 
     Returns:
         DictConfig containing the project configuration.
     """
-    config_file = Path(config_file) if config_file else Path() / mloq_yml.dst
-    config_file = (
-        config_file
-        if (config_file.exists() and config_file.is_file())
-        else config_file / mloq_yml.dst
-    )
+    config_file = find_config_file(config_file)
     if config_file.exists() and config_file.is_file():
+        config_file = config_file.resolve()
         _logger.info(f"Loading config file from {config_file}")
-        hydra_args = ["--config-dir", str(config_file.parent)] + list(hydra_args)
-        config = DictConfig({})
+        overrides = tuple(hydra_args)
+        key = (str(config_file), config_file.stat().st_mtime_ns, overrides)
+        with _config_lock:
+            if key not in _config_cache:
+                _config_cache[key] = _compose_config(config_file, overrides)
+            return copy.deepcopy(_config_cache[key])
+    _logger.info("No mloq.yaml file provided. Creating a new configuration")
+    return OmegaConf.load(mloq_yml.src)
+
+
+def build_record(
+    cmd_cls: Union[type, str],
+    config_file: Optional[Union[Path, str]],
+    hydra_args: Iterable[str] = (),
+    interactive: bool = False,
+    side_effects: bool = True,
+    use_cache: bool = True,
+) -> CMDRecord:
+    """
+    Load the project configuration and record the files and directories of a command.
 
-        @hydra.main(config_path=".", config_name=config_file.name)
-        def load_config(loaded_config: DictConfig):
-            nonlocal config
-            config = loaded_config
+    Records are cached on disk indexed by the fingerprint of their inputs: the
+    canonical configuration, the hydra overrides, the command and its side effects
+    flag, the mloq version and the mloq assets. If the inputs did not change since a previous run, the cached
+    record is returned without composing the configuration or running the command.
+
+    Args:
+        cmd_cls: Command class, or name of a command registered in :mod:`mloq.commands`.
+        config_file: Path to the target mloq.yaml file.
+        hydra_args: Hydra overrides applied to the project configuration.
+        interactive: If True, the configuration values are defined interactively.
+            Interactive runs are never cached.
+        side_effects: If True, run the side effects of the command. Otherwise, only
+            plan the record as `Command.plan` does.
+        use_cache: If False, always run the command without reading the cache.
+
+    Returns:
+        CMDRecord containing the configuration, files and directories of the command.
+    """
+    from mloq.commands import get_command_class
+    from mloq.fingerprint import config_fingerprint, load_cached_record, save_cached_record
 
-        with patch("sys.argv", [sys.argv[0]] + list(hydra_args)):
-            load_config()
+    if isinstance(cmd_cls, str):
+        cmd_name = cmd_cls
     else:
-        _logger.info("No mloq.yaml file provided. Creating a new configuration")
-        config = OmegaConf.load(mloq_yml.src)
-    return config
+        cmd_name = f"{cmd_cls.__module__}.{cmd_cls.__qualname__}"
+    fingerprint = None
+    config_path = find_config_file(config_file)
+    if use_cache and not interactive and config_path.is_file():
+        with span("fingerprint"):
+            fingerprint = config_fingerprint(config_path, cmd_name, hydra_args, side_effects)
+        record = load_cached_record(fingerprint) if fingerprint is not None else None
+        if record is not None:
+            return record
+    config: DictConfig = load_config(config_file=config_file, hydra_args=hydra_args)
+    with span("Command.__init__"):
+        command_class = get_command_class(cmd_cls) if isinstance(cmd_cls, str) else cmd_cls
+        cmd: "Command" = command_class(record=CMDRecord(config=config), interactive=interactive)
+    record = cmd.run() if side_effects else cmd.plan()
+    if fingerprint is not None and cmd.cacheable:
+        save_cached_record(fingerprint, record)
+    return record
 
 
 def write_record(
@@ -58,7 +172,12 @@ def write_record(
     path: Union[Path, str],
     overwrite: bool = False,
     only_config: bool = False,
-) -> None:
+    workers: int = 1,
+    incremental: bool = False,
+    link_mode: str = "copy",
+    prune: bool = False,
+    atomic: bool = False,
+) -> Optional["Writer"]:
     """
     Write the contents of the provided record to the target path.
 
@@ -70,24 +189,126 @@ def write_record(
         path: Target directory to write the data.
         overwrite: If True overwrite existing files.
         only_config: Do not write any file except mloq.yaml
+        workers: Number of threads used to render and write the templates.
+        incremental: Only render and write the files whose content changed.
+        link_mode: How static files are placed in the project. One of "copy",
+            "hardlink" or "symlink".
+        prune: Remove the unmodified files generated by previous runs that are not
+            generated anymore.
+        atomic: Stage the files and move them into place once all of them are written,
+            leaving the project unchanged if the generation fails.
 
     Returns:
-        None.
+        The Writer instance that generated the files, or None if only_config is True.
     """
     if only_config:
         with open(Path(path) / mloq_yml.dst, "w") as f:
             OmegaConf.save(config=record.config, f=f)
+        return None
     else:
-        writer = Writer(record=record, overwrite=overwrite, path=path)
+        from mloq.writer import Writer
+
+        writer = Writer(
+            record=record,
+            overwrite=overwrite,
+            path=path,
+            workers=workers,
+            incremental=incremental,
+            link_mode=link_mode,
+            prune=prune,
+            atomic=atomic,
+        )
         writer.run()
+        return writer
 
 
-def run_command(cmd_cls, use_click: bool = True) -> Callable:
+def plan_record(
+    record: CMDRecord,
+    path: Union[Path, str],
+    overwrite: bool = False,
+    only_config: bool = False,
+    incremental: bool = False,
+    prune: bool = False,
+) -> List["PlanEntry"]:
+    """
+    Return what would happen when writing the provided record, without writing anything.
+
+    Args:
+        record: CMDRecord containing all the data to be written.
+        path: Target directory to write the data.
+        overwrite: If True overwrite existing files.
+        only_config: Do not write any file except mloq.yaml
+        incremental: Only render and write the files whose content changed.
+        prune: Include the stale files generated by previous runs that would be removed.
+
+    Returns:
+        List of PlanEntry describing the action taken for every directory and file.
+    """
+    from mloq.writer import PlanEntry, Writer
+
+    if only_config:
+        exists = (Path(path) / mloq_yml.dst).exists()
+        reason = "already exists" if exists else "does not exist"
+        return [PlanEntry(Path(mloq_yml.dst), "overwrite" if exists else "create", reason)]
+    writer = Writer(
+        record=record,
+        overwrite=overwrite,
+        path=path,
+        incremental=incremental,
+        prune=prune,
+    )
+    return writer.plan()
+
+
+def format_plan(plan: List["PlanEntry"], plan_format: str = "text") -> str:
+    """
+    Return a string describing the provided plan.
+
+    Args:
+        plan: List of PlanEntry returned by `plan_record`.
+        plan_format: "text" for a human readable table, or "json".
+
+    Returns:
+        String representation of the plan.
+    """
+    summary = dict(Counter(entry.action for entry in plan if not entry.is_dir))
+    if plan_format == "json":
+        data = {
+            "directories": [
+                {"path": e.path.as_posix(), "action": e.action, "reason": e.reason}
+                for e in plan
+                if e.is_dir
+            ],
+            "files": [
+                {"path": e.path.as_posix(), "action": e.action, "reason": e.reason}
+                for e in plan
+                if not e.is_dir
+            ],
+            "summary": summary,
+        }
+        return json.dumps(data, indent=2)
+    lines = [
+        f"{entry.action:<10}{entry.path.as_posix()}{'/' if entry.is_dir else ''}  ({entry.reason})"
+        for entry in plan
+    ]
+    lines.append(", ".join(f"{action}: {n}" for action, n in sorted(summary.items())))
+    return "\n".join(lines)
+
+
+def _echo_stderr(message: str) -> None:
+    import click
+
+    click.echo(message, err=True)
+
+
+def run_command(cmd_cls: Union[type, str], use_click: bool = True) -> Callable:
     """
     Run the given Command class.
 
     Args:
-        cmd_cls: Command to be executed.
+        cmd_cls: Command to be executed. It can also be the name of a command
+            registered in :mod:`mloq.commands`. In that case the Command class
+            will only be imported when the returned function is called.
         use_click: If True run the function as a "cli" command.
 
     Returns:
@@ -95,6 +316,8 @@ def run_command(cmd_cls, use_click: bool = True) -> Callable:
     """
     from mloq.cli import mloq_click_command
 
+    cmd_name = cmd_cls if isinstance(cmd_cls, str) else cmd_cls.cmd_name
+
     def _run_command(
         config_file: str,
         output_directory: str,
@@ -102,19 +325,49 @@ def run_command(cmd_cls, use_click: bool = True) -> Callable:
         only_config: bool,
         interactive: bool,
         hydra_args: str,
+        workers: int = 1,
+        incremental: bool = False,
+        plan: bool = False,
+        plan_format: str = "text",
+        link_mode: str = "copy",
+        profile: Optional[str] = None,
+        prune: bool = False,
+        atomic: bool = False,
     ) -> None:
-        config: DictConfig = load_config(config_file=config_file, hydra_args=hydra_args)
-        record = CMDRecord(config=config)
-        cmd: Command = cmd_cls(record=record, interactive=interactive)
-        record = cmd.run()
-        write_record(
-            record=record,
-            path=output_directory,
-            overwrite=overwrite,
-            only_config=only_config,
-        )
+        with profile_session(profile, name=f"mloq {cmd_name}", echo=_echo_stderr):
+            record = build_record(
+                cmd_cls,
+                config_file=config_file,
+                hydra_args=hydra_args,
+                interactive=interactive,
+                side_effects=not plan,
+            )
+            if plan:
+                import click
+
+                entries = plan_record(
+                    record=record,
+                    path=output_directory,
+                    overwrite=overwrite,
+                    only_config=only_config,
+                    incremental=incremental,
+                    prune=prune,
+                )
+                click.echo(format_plan(entries, plan_format=plan_format))
+                return
+            write_record(
+                record=record,
+                path=output_directory,
+                overwrite=overwrite,
+                only_config=only_config,
+                workers=workers,
+                incremental=incremental,
+                link_mode=link_mode,
+                prune=prune,
+                atomic=atomic,
+            )
 
     if use_click:
         _run_command = mloq_click_command(_run_command)
-    _run_command.__name__ = cmd_cls.cmd_name
+    _run_command.__name__ = cmd_name
     return _run_command
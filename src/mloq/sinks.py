@@ -0,0 +1,682 @@
+"""This module defines the sinks where the Writer outputs the generated files: a local \
+directory, an in-memory dictionary, or a zip or tar archive streamed to a file object."""
+import filecmp
+import io
+import os
+from pathlib import Path, PurePosixPath
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+import zipfile
+
+
+Chunk = Union[str, bytes]
+# Content of a file, either as a single chunk or as an iterable of chunks
+Content = Union[Chunk, Iterable[Chunk]]
+Target = Union[Path, str, BinaryIO]
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz", "tar.bz2", "tar.xz")
+# How static files are placed in a DirectorySink
+LINK_MODES = ("copy", "hardlink", "symlink")
+# Size of the chunks used to read static files
+READ_SIZE = 1 << 16
+# Streamed files larger than this number of bytes are spooled to disk by the TarSink
+SPOOL_SIZE = 1 << 23
+
+
+def to_bytes(content: Chunk) -> bytes:
+    """Return the content encoded as utf-8 if it is a string."""
+    return content.encode("utf-8") if isinstance(content, str) else content
+
+
+def is_chunked(content: Content) -> bool:
+    """Return True if the content is an iterable of chunks instead of a single chunk."""
+    return not isinstance(content, (str, bytes))
+
+
+def iter_bytes(content: Content) -> Iterator[bytes]:
+    """Iterate over the chunks of the content encoded as utf-8."""
+    chunks = content if is_chunked(content) else (content,)
+    return (to_bytes(chunk) for chunk in chunks)
+
+
+class Sink:
+    """
+    Destination of the files and directories generated by mloq.
+
+    Paths are always relative to the root of the generated project. Sinks can be used
+    as context managers to make sure they are closed once all the files are written.
+
+    Attributes of this class:
+        thread_safe: True if files can be written concurrently from several threads.
+            Otherwise, the Writer writes all the files from the main thread following
+            the record order.
+    """
+
+    thread_safe = False
+
+    def exists(self, path: Union[Path, str]) -> bool:
+        """Return True if a file or directory was already written to the target path."""
+        raise NotImplementedError
+
+    def makedirs(self, path: Union[Path, str]) -> None:
+        """Create the target directory and all its parents if they do not exist."""
+        raise NotImplementedError
+
+    def write(self, path: Union[Path, str], content: Content) -> None:
+        """
+        Write the content to the target path.
+
+        Args:
+            path: Path of the file relative to the project root.
+            content: Content of the file. It can be a string, which is encoded as utf-8,
+                bytes, or an iterable of chunks that is consumed while it is written.
+        """
+        raise NotImplementedError
+
+    def copy(self, path: Union[Path, str], src: Union[Path, str]) -> bool:
+        """
+        Write the content of the src file to the target path without decoding it.
+
+        Args:
+            path: Path of the file relative to the project root.
+            src: Path of the file in the local filesystem that will be copied.
+
+        Returns:
+            True if the file was written, False if the target already had the same content.
+        """
+        with open(src, "rb") as f:
+            self.write(path, iter(lambda: f.read(READ_SIZE), b""))
+        return True
+
+    def close(self) -> None:
+        """Flush the written data and release the resources of the sink."""
+
+    def __enter__(self) -> "Sink":
+        """Return the sink, so it can be used as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the sink when leaving the context."""
+        self.close()
+
+
+class DirectorySink(Sink):
+    """
+    Write the files to a directory of the local filesystem.
+
+    Attributes of this class:
+        path: Path to the root directory of the generated project.
+        link_mode: How static files are placed in the project. One of "copy",
+            "hardlink" or "symlink".
+    """
+
+    thread_safe = True
+
+    def __init__(self, path: Union[Path, str], link_mode: str = "copy"):
+        """
+        Initialize a new instance of the DirectorySink class.
+
+        Args:
+            path: Path to the root directory of the generated project.
+            link_mode: How static files are placed in the project. "copy" copies them
+                using `shutil.copyfile`, which uses the zero-copy system calls of the
+                platform. "hardlink" creates a hard link to the mloq asset, and falls
+                back to copying it if the link cannot be created (e.g. if the project
+                is in a different filesystem). "symlink" creates a symbolic link to
+                the mloq asset, which is useful to share the files of a monorepo.
+
+        Raises:
+            ValueError: If link_mode is not valid.
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Invalid link mode {link_mode!r}. Valid modes: {LINK_MODES}")
+        self.path = Path(path)
+        self.link_mode = link_mode
+
+    def exists(self, path: Union[Path, str]) -> bool:
+        """Return True if the target path exists inside the root directory."""
+        return (self.path / path).exists()
+
+    def makedirs(self, path: Union[Path, str]) -> None:
+        """Create the target directory inside the root directory."""
+        os.makedirs(self.path / path, exist_ok=True)
+
+    def local_path(self, path: Union[Path, str]) -> Path:
+        """Return the path in the local filesystem where the target file was written."""
+        return self.path / path
+
+    def write(self, path: Union[Path, str], content: Content) -> None:
+        """Write the content to the target path inside the root directory."""
+        chunks = iter(content) if is_chunked(content) else iter((content,))
+        first = next(chunks, "")
+        target = self._destination(path)
+        if _is_link(target):  # Do not write through links to the mloq assets
+            target.unlink()
+        with open(target, "w" if isinstance(first, str) else "wb") as f:
+            f.write(first)
+            f.writelines(chunks)
+
+    def remove(self, path: Union[Path, str]) -> None:
+        """Remove the target file from the root directory."""
+        os.unlink(self.path / path)
+
+    def remove_directory(self, path: Union[Path, str]) -> None:
+        """Remove the target directory if it is empty. Non empty directories are kept."""
+        try:
+            os.rmdir(self.path / path)
+        except OSError:
+            pass
+
+    def _destination(self, path: Union[Path, str]) -> Path:
+        """Return the path where the content of the target file is written."""
+        return self.path / path
+
+    def copy(self, path: Union[Path, str], src: Union[Path, str]) -> bool:
+        """
+        Place the src file at the target path according to the link mode of the sink.
+
+        The file is not written if the target already has the same content: their sizes
+        are compared first, and then their contents.
+
+        Args:
+            path: Path of the file relative to the project root.
+            src: Path of the file in the local filesystem that will be copied.
+
+        Returns:
+            True if the file was written, False if the target already had the same content.
+        """
+        src, target = Path(src).resolve(), self.path / path
+        if self.link_mode == "symlink":
+            if target.is_symlink() and Path(os.readlink(target)) == src:
+                return False
+        elif not target.is_symlink() and _same_content(src, target):
+            return False
+        target = self._destination(path)
+        if target.is_symlink() or (self.link_mode != "copy" and target.exists()):
+            target.unlink()
+        if self.link_mode == "symlink":
+            os.symlink(src, target)
+            return True
+        elif self.link_mode == "hardlink":
+            try:
+                os.link(src, target)
+                return True
+            except OSError:  # Different filesystems, or links are not supported
+                pass
+        shutil.copyfile(src, target)
+        return True
+
+
+class TransactionalSink(DirectorySink):
+    """
+    Write the files to a directory of the local filesystem in a single transaction.
+
+    The files are staged in a temporary directory inside the project root, so they are
+    in the same filesystem, and nothing is written to the project until `commit` is
+    called. Every staged file is flushed to disk as soon as it is written, so the flushes
+    run in the threads that write the files. Committing moves every file into
+    place with `os.replace`, so each target file is either the old or the new version,
+    and never a partially written file. The directories containing the moved files are
+    flushed afterwards, so the renames survive a crash. If committing fails, the files
+    that were already replaced are restored and the new ones are removed.
+
+    The project files are not modified when the transaction is rolled back, or when the
+    process is killed before committing. In the latter case a `.mloq-staging-*`
+    directory may be left in the project root.
+
+    Attributes of this class:
+        path: Path to the root directory of the generated project.
+        link_mode: How static files are placed in the project. One of "copy",
+            "hardlink" or "symlink".
+    """
+
+    def __init__(self, path: Union[Path, str], link_mode: str = "copy"):
+        """
+        Initialize a new instance of the TransactionalSink class.
+
+        Args:
+            path: Path to the root directory of the generated project.
+            link_mode: How static files are placed in the project. See `DirectorySink`.
+
+        Raises:
+            ValueError: If link_mode is not valid.
+        """
+        super(TransactionalSink, self).__init__(path=path, link_mode=link_mode)
+        self._staging: Optional[Path] = None
+        self._staged: Dict[Path, Path] = {}
+        self._directories: Dict[Path, None] = {}
+        self._removed: Dict[Path, None] = {}
+        self._removed_directories: Dict[Path, None] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        """Return True if there are changes that have not been committed."""
+        return any((self._staged, self._directories, self._removed, self._removed_directories))
+
+    def exists(self, path: Union[Path, str]) -> bool:
+        """Return True if the target path was staged or exists inside the root directory."""
+        path = Path(path)
+        if path in self._staged or path in self._directories:
+            return True
+        return path not in self._removed and (self.path / path).exists()
+
+    def makedirs(self, path: Union[Path, str]) -> None:
+        """Create the target directory when the transaction is committed."""
+        self._directories[Path(path)] = None
+
+    def local_path(self, path: Union[Path, str]) -> Path:
+        """Return the staged file, or the file inside the root directory if it was not staged."""
+        return self._staged.get(Path(path), self.path / path)
+
+    def write(self, path: Union[Path, str], content: Content) -> None:
+        """Write the content to the staged file and flush it to disk."""
+        super(TransactionalSink, self).write(path, content)
+        _fsync_file(self.local_path(path))
+
+    def copy(self, path: Union[Path, str], src: Union[Path, str]) -> bool:
+        """Stage the src file according to the link mode of the sink and flush it to disk."""
+        written = super(TransactionalSink, self).copy(path, src)
+        if written:
+            _fsync_file(self.local_path(path))
+        return written
+
+    def remove(self, path: Union[Path, str]) -> None:
+        """Remove the target file when the transaction is committed."""
+        self._removed[Path(path)] = None
+
+    def remove_directory(self, path: Union[Path, str]) -> None:
+        """Remove the target directory when the transaction is committed, if it is empty."""
+        self._removed_directories[Path(path)] = None
+
+    def commit(self) -> None:
+        """
+        Move all the staged files into place, and apply the removals.
+
+        The staged files were already flushed to disk when they were written, so only
+        the directories containing the replaced and removed files are flushed, once all
+        the renames are finished.
+
+        Raises:
+            OSError: If a file cannot be moved into place. All the changes applied by
+                the transaction are reverted before raising.
+        """
+        if not self.pending:
+            self.rollback()
+            return
+        undo: List[Callable[[], None]] = []
+        try:
+            for directory in self._directories:
+                self._create_directory(self.path / directory, undo)
+            for path, staged in self._staged.items():
+                self._replace(staged, self.path / path, undo)
+            for path in self._removed:
+                self._replace(None, self.path / path, undo)
+            for directory in self._removed_directories:
+                target = self.path / directory
+                try:
+                    os.rmdir(target)
+                except OSError:
+                    continue
+                undo.append(lambda target=target: os.makedirs(target, exist_ok=True))
+            changed = [*self._staged, *self._removed, *self._directories]
+            changed.extend(self._removed_directories)
+            _fsync_directories({(self.path / path).parent for path in changed})
+        except BaseException:
+            for action in reversed(undo):
+                try:
+                    action()
+                except OSError:
+                    pass
+            raise
+        finally:
+            self.rollback()
+
+    def rollback(self) -> None:
+        """Discard all the changes that have not been committed."""
+        with self._lock:
+            staging, self._staging = self._staging, None
+            self._staged.clear()
+            self._directories.clear()
+            self._removed.clear()
+            self._removed_directories.clear()
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def close(self) -> None:
+        """Discard the changes that have not been committed."""
+        self.rollback()
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        """Commit the transaction, or roll it back if an exception was raised."""
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def _destination(self, path: Union[Path, str]) -> Path:
+        """Return the path of the staged file, creating the staging directory if needed."""
+        path = Path(path)
+        with self._lock:
+            if self._staging is None:
+                os.makedirs(self.path, exist_ok=True)
+                self._staging = Path(tempfile.mkdtemp(prefix=".mloq-staging-", dir=self.path))
+            staged = self._staging / "files" / path
+            self._staged[path] = staged
+            self._removed.pop(path, None)
+        staged.parent.mkdir(parents=True, exist_ok=True)
+        return staged
+
+    def _create_directory(self, target: Path, undo: List[Callable[[], None]]) -> None:
+        """Create the target directory and its parents, and register how to remove them."""
+        missing = []
+        while not os.path.isdir(target):
+            missing.append(target)
+            target = target.parent
+        for directory in reversed(missing):
+            os.mkdir(directory)
+            undo.append(lambda directory=directory: os.rmdir(directory))
+
+    def _replace(self, staged: Optional[Path], target: Path, undo: List[Callable[[], None]]):
+        """
+        Replace the target with the staged file, or remove it if staged is None.
+
+        A hard link to the current target is kept in the staging directory, so the
+        target can be restored if the transaction fails.
+        """
+        backup = None
+        if os.path.lexists(target):
+            backup = self._staging / "backup" / target.relative_to(self.path)
+            backup.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(target, backup, follow_symlinks=False)
+            except OSError:  # Hard links are not supported. Move the target instead.
+                os.replace(target, backup)
+        if staged is None:
+            if os.path.lexists(target):
+                os.unlink(target)
+        else:
+            if not os.path.isdir(target.parent):
+                self._create_directory(target.parent, undo)
+            os.replace(staged, target)
+        if backup is not None:
+            undo.append(lambda: os.replace(backup, target))
+        elif staged is not None:
+            undo.append(lambda: os.unlink(target))
+
+
+def _fsync_file(path: Path) -> None:
+    """Flush the content of the provided file to disk. Symbolic links are skipped."""
+    if path.is_symlink():
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directories(paths: Iterable[Path]) -> None:
+    """
+    Flush the entries of the provided directories to disk, so the renames are durable.
+
+    Directories that cannot be opened or flushed are skipped, because some platforms,
+    such as Windows, do not support it.
+    """
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _is_link(path: Path) -> bool:
+    """Return True if path is a symbolic link, or a file with several hard links."""
+    try:
+        return path.is_symlink() or path.stat().st_nlink > 1
+    except OSError:
+        return False
+
+
+def _same_content(src: Path, target: Path) -> bool:
+    """Return True if target is a file with the same content as src."""
+    try:
+        if target.stat().st_size != src.stat().st_size:
+            return False
+    except OSError:
+        return False
+    return filecmp.cmp(src, target, shallow=False)
+
+
+class MemorySink(Sink):
+    """
+    Keep the generated files in memory.
+
+    Attributes of this class:
+        files: Dictionary mapping the path of the written files to their content.
+        directories: Set containing the paths of the created directories.
+    """
+
+    thread_safe = True
+
+    def __init__(self):
+        """Initialize a new instance of the MemorySink class."""
+        self.files: Dict[Path, bytes] = {}
+        self.directories: Set[Path] = set()
+
+    def exists(self, path: Union[Path, str]) -> bool:
+        """Return True if the target file or directory was written to the sink."""
+        path = Path(path)
+        return path in self.files or path in self.directories
+
+    def makedirs(self, path: Union[Path, str]) -> None:
+        """Register the target directory and its parents."""
+        path = Path(path)
+        self.directories.update(p for p in (path, *path.parents) if p != Path())
+
+    def write(self, path: Union[Path, str], content: Content) -> None:
+        """Store the content of the target file."""
+        self.files[Path(path)] = b"".join(iter_bytes(content))
+
+
+class ArchiveSink(Sink):
+    """
+    Base class of the sinks that stream the generated files into a single archive.
+
+    The archive is written sequentially, so the target can be any writable file object,
+    including sockets and pipes that cannot seek. The archive is only complete once the
+    sink is closed.
+    """
+
+    def __init__(self, target: Target, prefix: Union[Path, str] = ""):
+        """
+        Initialize a new instance of the ArchiveSink class.
+
+        Args:
+            target: Path of the archive file, or binary file object where the archive
+                will be written. File objects are not closed when closing the sink.
+            prefix: Directory inside the archive where the files will be placed.
+        """
+        self.target = target
+        self.prefix = PurePosixPath(Path(prefix).as_posix()) if prefix else PurePosixPath()
+        self._names: Set[str] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def name(self, path: Union[Path, str]) -> str:
+        """Return the name of the archive member corresponding to the target path."""
+        return str(self.prefix / Path(path).as_posix())
+
+    def exists(self, path: Union[Path, str]) -> bool:
+        """Return True if the target file or directory was added to the archive."""
+        return self.name(path) in self._names
+
+    def makedirs(self, path: Union[Path, str]) -> None:
+        """Add the target directory and its parents to the archive."""
+        path = PurePosixPath(Path(path).as_posix())
+        with self._lock:
+            for directory in (*reversed(path.parents), path):
+                name = self.name(directory)
+                if directory != PurePosixPath() and name not in self._names:
+                    self._add_directory(name)
+                    self._names.add(name)
+
+    def write(self, path: Union[Path, str], content: Content) -> None:
+        """Add the target file to the archive."""
+        name = self.name(path)
+        with self._lock:
+            self._add_file(name, content)
+            self._names.add(name)
+
+    def close(self) -> None:
+        """Write the end of the archive."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._close()
+
+    def _add_directory(self, name: str) -> None:
+        raise NotImplementedError
+
+    def _add_file(self, name: str, content: Content) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+class ZipSink(ArchiveSink):
+    """Stream the generated files into a zip archive."""
+
+    def __init__(
+        self,
+        target: Target,
+        prefix: Union[Path, str] = "",
+        compression: int = zipfile.ZIP_DEFLATED,
+    ):
+        """
+        Initialize a new instance of the ZipSink class.
+
+        Args:
+            target: Path of the zip file, or binary file object where the archive
+                will be written. File objects are not closed when closing the sink.
+            prefix: Directory inside the archive where the files will be placed.
+            compression: Compression method used to store the files, as defined in
+                the zipfile module.
+        """
+        super(ZipSink, self).__init__(target=target, prefix=prefix)
+        self._zip = zipfile.ZipFile(target, mode="w", compression=compression)
+
+    def _add_directory(self, name: str) -> None:
+        info = zipfile.ZipInfo(f"{name}/", date_time=time.localtime()[:6])
+        info.external_attr = (0o40755 << 16) | 0x10  # Unix permissions and MS-DOS flag
+        self._zip.writestr(info, b"")
+
+    def _add_file(self, name: str, content: Content) -> None:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        info.external_attr = 0o100644 << 16
+        if not is_chunked(content):
+            self._zip.writestr(info, to_bytes(content))
+            return
+        with self._zip.open(info, mode="w") as f:
+            for chunk in iter_bytes(content):
+                f.write(chunk)
+
+    def _close(self) -> None:
+        self._zip.close()
+
+
+class TarSink(ArchiveSink):
+    """Stream the generated files into a tar archive."""
+
+    def __init__(
+        self,
+        target: Target,
+        prefix: Union[Path, str] = "",
+        compression: str = "",
+    ):
+        """
+        Initialize a new instance of the TarSink class.
+
+        Args:
+            target: Path of the tar file, or binary file object where the archive
+                will be written. File objects are not closed when closing the sink.
+            prefix: Directory inside the archive where the files will be placed.
+            compression: One of "" (uncompressed), "gz", "bz2" or "xz".
+        """
+        super(TarSink, self).__init__(target=target, prefix=prefix)
+        mode = f"w|{compression}"
+        if isinstance(target, (Path, str)):
+            self._tar = tarfile.open(name=str(target), mode=mode)
+        else:
+            self._tar = tarfile.open(fileobj=target, mode=mode)
+
+    def _tarinfo(self, name: str, mode: int) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(name)
+        info.mtime = int(time.time())
+        info.mode = mode
+        return info
+
+    def _add_directory(self, name: str) -> None:
+        info = self._tarinfo(name, 0o755)
+        info.type = tarfile.DIRTYPE
+        self._tar.addfile(info)
+
+    def _add_file(self, name: str, content: Content) -> None:
+        info = self._tarinfo(name, 0o644)
+        if not is_chunked(content):
+            data = to_bytes(content)
+            info.size = len(data)
+            self._tar.addfile(info, io.BytesIO(data))
+            return
+        # The tar header contains the file size, so the chunks are spooled before writing
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            for chunk in iter_bytes(content):
+                spool.write(chunk)
+            info.size = spool.tell()
+            spool.seek(0)
+            self._tar.addfile(info, spool)
+
+    def _close(self) -> None:
+        self._tar.close()
+
+
+def archive_sink(target: Target, fmt: Optional[str] = None, **kwargs) -> ArchiveSink:
+    """
+    Return the archive sink corresponding to the provided format.
+
+    Args:
+        target: Path of the archive file, or binary file object where the archive
+            will be written.
+        fmt: One of "zip", "tar", "tar.gz", "tar.bz2" or "tar.xz". If None, it is
+            inferred from the extension of target.
+        kwargs: Passed to the sink constructor.
+
+    Returns:
+        ZipSink or TarSink writing to target.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if fmt is None:
+        name = str(target).lower() if isinstance(target, (Path, str)) else ""
+        name = name[:-4] + ".tar.gz" if name.endswith(".tgz") else name
+        # Check the longest extensions first, so "tar.gz" is not detected as "tar"
+        formats = sorted(ARCHIVE_FORMATS, key=len, reverse=True)
+        fmt = next((f for f in formats if name.endswith(f".{f}")), None)
+    if fmt == "zip":
+        return ZipSink(target, **kwargs)
+    elif fmt in ARCHIVE_FORMATS:
+        compression = fmt.partition(".")[2]
+        return TarSink(target, compression=compression, **kwargs)
+    raise ValueError(f"Unsupported archive format {fmt!r}. Valid formats: {ARCHIVE_FORMATS}")
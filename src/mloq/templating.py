@@ -1,23 +1,205 @@
 """This module defines common functionality for rendering and writing File templates."""
 from datetime import datetime
+from functools import lru_cache
 import os
 from pathlib import Path
-from typing import Any, Mapping, Union
+from typing import Any, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    meta,
+    nodes,
+    select_autoescape,
+)
+from jinja2.bccache import Bucket
+from jinja2.exceptions import TemplateSyntaxError
 from omegaconf import DictConfig
 
 from mloq import _logger
+from mloq.cache import get_cache_dir, write_atomic
 from mloq.files import ASSETS_PATH, File, read_file
+from mloq.profiling import span
 from mloq.record import Ledger
+from mloq.sinks import Sink
 
 
-jinja_env = Environment(
-    loader=FileSystemLoader([str(ASSETS_PATH / x) for x in os.listdir(ASSETS_PATH)]),
-    # loader=PackageLoader("mloq", "assets"),
-    autoescape=select_autoescape(["html", "xml"]),
-    keep_trailing_newline=True,
-)
+# Templates whose source is larger than this number of bytes are rendered in chunks
+STREAM_THRESHOLD = 1 << 20
+# Size in characters of the chunks yielded when rendering a template in streaming mode
+CHUNK_SIZE = 1 << 16
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    Store the compiled jinja templates on disk, so they are only compiled once.
+
+    Each cache entry is keyed by the template name and the hash of its source, and the
+    cache directory is namespaced by mloq version. Entries are written to a temporary
+    file and atomically renamed, so the cache can be shared by concurrent processes.
+    """
+
+    def _get_cache_filename(self, bucket: Bucket) -> str:
+        return os.path.join(self.directory, self.pattern % f"{bucket.key}-{bucket.checksum}")
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        """Load the compiled template, ignoring corrupted or unreadable cache entries."""
+        try:
+            super(TemplateBytecodeCache, self).load_bytecode(bucket)
+        except Exception:  # The template will be compiled and the entry overwritten
+            bucket.reset()
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        """Write the compiled template to the cache directory atomically."""
+        # The template is still rendered if the cache directory is missing or not writable
+        write_atomic(self._get_cache_filename(bucket), bucket.write_bytecode)
+
+
+def create_jinja_env(cache_dir: Optional[Union[Path, str]] = None) -> Environment:
+    """
+    Return the jinja Environment used to render the mloq assets.
+
+    Args:
+        cache_dir: Directory where the compiled templates are stored. Defaults to
+            the mloq user cache directory. If caching is disabled, the templates are
+            compiled every time the process starts.
+
+    Returns:
+        Environment that loads the templates from the mloq assets folders.
+    """
+    cache_dir = get_cache_dir("templates") if cache_dir is None else cache_dir
+    env = Environment(
+        loader=FileSystemLoader([str(ASSETS_PATH / x) for x in os.listdir(ASSETS_PATH)]),
+        # loader=PackageLoader("mloq", "assets"),
+        autoescape=select_autoescape(["html", "xml"]),
+        keep_trailing_newline=True,
+        bytecode_cache=TemplateBytecodeCache(str(cache_dir)) if cache_dir else None,
+    )
+    env.globals["now"] = datetime.now
+    return env
+
+
+jinja_env = create_jinja_env()
+
+
+def precompile_templates(env: Optional[Environment] = None) -> int:
+    """
+    Compile all the mloq assets and store them in the template bytecode cache.
+
+    It can be run at install or build time (`make precompile-templates`) so that
+    rendering templates does not need to run the jinja compiler.
+
+    Args:
+        env: jinja Environment to be populated. Defaults to the mloq environment.
+
+    Returns:
+        Number of templates compiled.
+    """
+    env = jinja_env if env is None else env
+    compiled = 0
+    for name in env.list_templates():
+        try:
+            env.get_template(name)
+            compiled += 1
+        except (TemplateSyntaxError, UnicodeDecodeError):  # Static assets are not templates
+            _logger.debug(f"{name} is not a valid template. Skipping")
+    return compiled
+
+
+def template_source(file: File) -> str:
+    """Return the source that is used to render the provided file."""
+    if file.is_static:
+        return read_file(file)
+    source, _, _ = jinja_env.loader.get_source(jinja_env, str(file.name))
+    return source
+
+
+@lru_cache(maxsize=256)
+def template_variables(source: str) -> FrozenSet[str]:
+    """Return the names of the variables that the template source reads from its context."""
+    return frozenset(meta.find_undeclared_variables(jinja_env.parse(source)))
+
+
+# Dependency meaning that the template can read any value of the configuration
+ALL_DEPENDENCIES = "*"
+# Nodes that render other templates, which can read any value of the context
+_TEMPLATE_REFERENCES = (nodes.Extends, nodes.FromImport, nodes.Import, nodes.Include)
+
+
+@lru_cache(maxsize=256)
+def template_dependencies(source: str) -> FrozenSet[str]:
+    """
+    Return the configuration values that the template source reads from its context.
+
+    The dependencies are found analysing the template AST. Attribute chains with
+    constant keys, such as `project.name` or `docker["cuda"]`, are returned as dotted
+    paths. Variables that are used as a whole, for example in a for loop or as the
+    argument of a filter, are returned as top level names. Templates that include
+    other templates depend on the whole configuration, represented as "*".
+
+    Method calls depend on the object the method is called on, so `name.replace("-", "_")`
+    depends on `name`.
+
+    Args:
+        source: Source of a jinja template.
+
+    Returns:
+        Set containing the dotted paths of the values read by the template.
+    """
+    ast = jinja_env.parse(source)
+    if any(True for _ in ast.find_all(_TEMPLATE_REFERENCES)):
+        return frozenset([ALL_DEPENDENCIES])
+    undeclared = meta.find_undeclared_variables(ast)
+    dependencies: Set[str] = set()
+    _collect_dependencies(ast, undeclared, dependencies)
+    # Remove the paths contained in other dependencies: "lint" includes "lint.black"
+    return frozenset(
+        dep
+        for dep in dependencies
+        if not any(dep.startswith(f"{other}.") for other in dependencies)
+    )
+
+
+def _attribute_chain(node: nodes.Node) -> Optional[Tuple[str, List[str]]]:
+    """Return the variable name and the constant keys of an attribute chain."""
+    keys = []
+    while isinstance(node, (nodes.Getattr, nodes.Getitem)):
+        if isinstance(node, nodes.Getattr):
+            keys.append(node.attr)
+        elif isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, (str, int)):
+            keys.append(str(node.arg.value))
+        else:  # Dynamic key: the whole container is a dependency
+            return None
+        node = node.node
+    if not isinstance(node, nodes.Name):
+        return None
+    return node.name, keys[::-1]
+
+
+def _collect_dependencies(node: nodes.Node, undeclared: Set[str], dependencies: Set[str]):
+    """Add the dotted paths of the context values read by node to dependencies."""
+    if isinstance(node, (nodes.Getattr, nodes.Getitem)):
+        chain = _attribute_chain(node)
+        if chain is not None:
+            name, keys = chain
+            if name in undeclared:
+                dependencies.add(".".join([name, *keys]))
+            return
+    elif isinstance(node, nodes.Name):
+        if node.ctx == "load" and node.name in undeclared:
+            dependencies.add(node.name)
+        return
+    elif isinstance(node, nodes.Call) and isinstance(node.node, nodes.Getattr):
+        # Method call: visit the object instead of the method attribute
+        receiver = node.node.node
+        arguments = [*node.args, *node.kwargs, node.dyn_args, node.dyn_kwargs]
+        for child in [receiver, *arguments]:
+            if child is not None:
+                _collect_dependencies(child, undeclared, dependencies)
+        return
+    for child in node.iter_child_nodes():
+        _collect_dependencies(child, undeclared, dependencies)
 
 
 def render_template(file: File, kwargs: Mapping[str, Any]) -> str:
@@ -35,16 +217,105 @@ def render_template(file: File, kwargs: Mapping[str, Any]) -> str:
     if file.is_static:
         return read_file(file)
     jinja_template = jinja_env.get_template(str(file.name))
-    jinja_template.globals["now"] = datetime.now
     return jinja_template.render(**kwargs)
 
 
+def template_size(file: File) -> int:
+    """Return the size in bytes of the source of the provided file without reading it."""
+    if file.content is not None:
+        return len(file.content)
+    try:
+        return os.stat(file.src).st_size
+    except OSError:
+        return 0
+
+
+def is_verbatim(file: File) -> bool:
+    """
+    Return True if the file can be copied as bytes instead of being rendered.
+
+    Static files are read and written in text mode, which translates the line endings.
+    They can only be copied verbatim if that translation does not modify them.
+    """
+    if not file.is_static or file.content is not None or os.linesep != "\n":
+        return False
+    try:
+        stat = os.stat(file.src)
+    except OSError:
+        return False
+    return _has_no_carriage_returns(str(file.src), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _has_no_carriage_returns(path: str, mtime_ns: int, size: int) -> bool:
+    """Return True if the target file does not contain any carriage return."""
+    with open(path, "rb") as f:
+        return all(b"\r" not in chunk for chunk in iter(lambda: f.read(1 << 16), b""))
+
+
+def should_stream(file: File, threshold: Optional[int] = STREAM_THRESHOLD) -> bool:
+    """
+    Return True if the file should be rendered in chunks instead of as a single string.
+
+    Args:
+        file: File object representing the jinja template that will be rendered.
+        threshold: Stream all the templates whose source is at least this number of
+            bytes. If None, only the files with the stream flag set are streamed.
+
+    Returns:
+        True if the file has the stream flag set or its source is larger than threshold.
+    """
+    return file.stream or (threshold is not None and template_size(file) >= threshold)
+
+
+def render_template_stream(
+    file: File,
+    kwargs: Mapping[str, Any],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Render a jinja template with the provided parameter dict in chunks.
+
+    The template is rendered using `Template.generate`, so the whole rendered content
+    is never held in memory. Joining the chunks returns the same string as
+    `render_template`.
+
+    Args:
+        file: File object representing the jinja template that will be rendered.
+        kwargs: Dictionary containing the parameters key and corresponding values
+                that will be used to render the template.
+        chunk_size: Approximate number of characters of every chunk.
+
+    Returns:
+        Iterator yielding the rendered template in chunks.
+    """
+    if file.is_static and file.content is not None:
+        for i in range(0, len(file.content), chunk_size):
+            yield file.content[i : i + chunk_size]
+        return
+    elif file.is_static:
+        with open(file.src, "r") as f:
+            yield from iter(lambda: f.read(chunk_size), "")
+        return
+    jinja_template = jinja_env.get_template(str(file.name))
+    buffer, size = [], 0
+    for piece in jinja_template.generate(**kwargs):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
 def write_template(
     file: File,
     config: DictConfig,
     path: Union[Path, str],
     ledger: Ledger,
     overwrite: bool = False,
+    sink: Optional[Sink] = None,
 ):
     """
     Create new file containing the rendered template found in source_path.
@@ -57,15 +328,33 @@ def write_template(
         ledger: Book keeper to keep track of the generated files.
         overwrite: If False, copy the file if it does not already exists in the
                    target path. If True, overwrite the target file if it is already present.
+        sink: Sink where the file will be written. If provided, path is relative to
+              the root of the sink. If None, write the file to the local filesystem.
 
     Returns:
         None.
     """
-    if not overwrite and path.exists():
+    exists = sink.exists(path) if sink is not None else Path(path).exists()
+    if not overwrite and exists:
         _logger.debug(f"file {file.dst} already exists. Skipping")
         return
 
     ledger.register(file, description=file.description)
-    rendered = render_template(file, config)
+    with span("write_template", file=file.dst):
+        if should_stream(file):
+            rendered = render_template_stream(file, config)
+        else:
+            rendered = render_template(file, config)
+        if sink is not None:
+            sink.write(path, rendered)
+        else:
+            write_file(path, rendered)
+
+
+def write_file(path: Union[Path, str], content: Union[str, Iterable[str]]) -> None:
+    """Write the provided rendered template, or the chunks of the template, to the target path."""
     with open(path, "w") as f:
-        f.write(rendered)
+        if isinstance(content, str):
+            f.write(content)
+        else:
+            f.writelines(content)
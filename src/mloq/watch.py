@@ -0,0 +1,395 @@
+"""This module implements `mloq watch`, which regenerates a project every time its \
+configuration or the mloq templates change."""
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import click
+
+from mloq import _logger
+from mloq.cli import config_file_opt, output_directory_arg, workers_opt
+from mloq.commands import command_names
+
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def scan(paths: Iterable[Path]) -> Snapshot:
+    """
+    Return the modification time and size of the files present in the provided paths.
+
+    Args:
+        paths: Files and directories to be scanned. Directories are scanned recursively.
+
+    Returns:
+        Dictionary mapping the path of every file to its modification time and size.
+    """
+    snapshot = {}
+    for path in paths:
+        names = (
+            (os.path.join(root, name) for root, _, files in os.walk(path) for name in files)
+            if os.path.isdir(path)
+            else [str(path)]
+        )
+        for name in names:
+            try:
+                stat = os.stat(name)
+            except OSError:  # The file was removed while scanning
+                continue
+            snapshot[name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Set[str]:
+    """Return the paths of the files that were created, modified or removed."""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class PollingWatcher:
+    """Detect changes by periodically comparing the modification time and size of the files."""
+
+    def __init__(self, paths: Iterable[Path], interval: float = 0.5):
+        """
+        Initialize a new instance of the PollingWatcher class.
+
+        Args:
+            paths: Files and directories to be watched. Directories are watched recursively.
+            interval: Seconds between two consecutive scans of the watched paths.
+        """
+        self.paths = [Path(p) for p in paths]
+        self.interval = interval
+        self._snapshot = scan(self.paths)
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds for changes. Return the paths that changed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = scan(self.paths)
+            changed = diff_snapshots(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def reset(self) -> None:
+        """Forget the changes that have not been polled yet."""
+        self._snapshot = scan(self.paths)
+
+    def close(self) -> None:
+        """Stop watching the paths."""
+
+
+class WatchdogWatcher:
+    """Receive the filesystem events from the OS (inotify on Linux) using watchdog."""
+
+    def __init__(self, paths: Iterable[Path]):
+        """
+        Initialize a new instance of the WatchdogWatcher class.
+
+        Args:
+            paths: Files and directories to be watched. Directories are watched recursively.
+
+        Raises:
+            ImportError: If watchdog is not installed.
+        """
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        events: "queue.Queue[str]" = queue.Queue()
+
+        class _QueueHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    events.put(os.fsdecode(event.src_path))
+                    if getattr(event, "dest_path", None):
+                        events.put(os.fsdecode(event.dest_path))
+
+        self.paths = [Path(p).resolve() for p in paths]
+        self._events = events
+        self._files = {str(p) for p in self.paths if not p.is_dir()}
+        self._dirs = tuple(str(p) + os.sep for p in self.paths if p.is_dir())
+        self._observer = Observer()
+        handler = _QueueHandler()
+        for directory in {p for p in self.paths if p.is_dir()}:
+            self._observer.schedule(handler, str(directory), recursive=True)
+        # Files are watched through their parent directory
+        for parent in {p.parent for p in self.paths if not p.is_dir()}:
+            self._observer.schedule(handler, str(parent), recursive=False)
+        self._observer.start()
+
+    def _is_watched(self, path: str) -> bool:
+        return path in self._files or path.startswith(self._dirs)
+
+    def _drain(self) -> Set[str]:
+        changed = set()
+        while True:
+            try:
+                changed.add(self._events.get_nowait())
+            except queue.Empty:
+                return changed
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds for changes. Return the paths that changed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                first = self._events.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                return set()
+            changed = {p for p in {first} | self._drain() if self._is_watched(p)}
+            if changed:
+                return changed
+
+    def reset(self) -> None:
+        """Forget the changes that have not been polled yet."""
+        self._drain()
+
+    def close(self) -> None:
+        """Stop watching the paths."""
+        self._observer.stop()
+        self._observer.join()
+
+
+Watcher = Union[PollingWatcher, WatchdogWatcher]
+
+
+def create_watcher(
+    paths: Iterable[Path],
+    polling: bool = False,
+    interval: float = 0.5,
+) -> Watcher:
+    """
+    Return a watcher that detects changes in the provided paths.
+
+    Args:
+        paths: Files and directories to be watched. Directories are watched recursively.
+        polling: If True, always use the PollingWatcher. Otherwise use watchdog if it
+            is installed, and fall back to polling if it is not.
+        interval: Seconds between two consecutive scans when polling.
+
+    Returns:
+        WatchdogWatcher or PollingWatcher instance.
+    """
+    if not polling:
+        try:
+            return WatchdogWatcher(paths)
+        except ImportError:
+            _logger.debug("watchdog is not installed. Falling back to polling")
+    return PollingWatcher(paths, interval=interval)
+
+
+def wait_for_changes(watcher: Watcher, debounce: float, timeout: float) -> Set[str]:
+    """
+    Wait for changes and return them once no new changes happen for debounce seconds.
+
+    Args:
+        watcher: Watcher that detects the changes.
+        debounce: Seconds without changes needed to consider that the changes finished.
+        timeout: Maximum number of seconds to wait for the first change.
+
+    Returns:
+        Set containing the paths that changed. It is empty if there were no changes.
+    """
+    changed = watcher.poll(timeout)
+    while changed:
+        new_changes = watcher.poll(debounce)
+        if not new_changes:
+            break
+        changed |= new_changes
+    return changed
+
+
+def regenerate(
+    config_file: Path,
+    output_directory: Union[Path, str],
+    command_name: str = "setup",
+    workers: int = 1,
+) -> Dict[str, int]:
+    """
+    Regenerate the project incrementally, only writing the files that changed.
+
+    Args:
+        config_file: Path to the mloq.yaml file of the project.
+        output_directory: Directory where the project is generated.
+        command_name: Name of the mloq command that will be run.
+        workers: Number of threads used to render and write the templates.
+
+    Returns:
+        Number of files rendered, written and skipped.
+    """
+    from mloq.runner import build_record, write_record
+
+    record = build_record(command_name, config_file=config_file)
+    writer = write_record(
+        record=record,
+        path=output_directory,
+        workers=workers,
+        incremental=True,
+    )
+    return writer.stats
+
+
+def _timed_regenerate(echo: Callable[[str], None], message: str, **kwargs) -> None:
+    """Regenerate the project and print the elapsed time, or the error if it fails."""
+    start = time.perf_counter()
+    timestamp = time.strftime("%H:%M:%S")
+    try:
+        stats = regenerate(**kwargs)
+    except (Exception, SystemExit) as e:  # hydra exits when it fails to load a config
+        echo(f"[{timestamp}] {message} failed: {type(e).__name__}: {e}")
+        return
+    elapsed = (time.perf_counter() - start) * 1000
+    echo(
+        f"[{timestamp}] {message} in {elapsed:.0f} ms. Rendered: {stats['rendered']}, "
+        f"written: {stats['written']}, skipped: {stats['skipped']}",
+    )
+
+
+def watch_project(
+    config_file: Path,
+    output_directory: Union[Path, str],
+    command_name: str = "setup",
+    paths: Iterable[Path] = (),
+    debounce: float = 0.2,
+    polling: bool = False,
+    interval: float = 0.5,
+    workers: int = 1,
+    echo: Callable[[str], None] = click.echo,
+    stop: Optional[threading.Event] = None,
+    max_rebuilds: Optional[int] = None,
+) -> int:
+    """
+    Regenerate the project every time its configuration or the watched paths change.
+
+    The project is generated once when the function is called. The command classes,
+    compiled templates and parsed configuration stay loaded between rebuilds, and
+    every rebuild is incremental, so only the files affected by a change are rendered.
+
+    Args:
+        config_file: Path to the mloq.yaml file of the project.
+        output_directory: Directory where the project is generated.
+        command_name: Name of the mloq command that will be run.
+        paths: Additional files and directories to be watched, besides the config file
+            and the mloq assets.
+        debounce: Seconds without changes to wait before regenerating the project.
+        polling: If True, detect changes polling the filesystem even if watchdog is
+            installed.
+        interval: Seconds between two consecutive scans when polling.
+        workers: Number of threads used to render and write the templates.
+        echo: Function used to print the result of every rebuild.
+        stop: Event that stops watching when it is set.
+        max_rebuilds: Stop watching after this number of rebuilds. If None, watch
+            until stop is set or the process is interrupted.
+
+    Returns:
+        Number of rebuilds triggered by changes.
+    """
+    from mloq.files import ASSETS_PATH
+    from mloq.runner import clear_config_cache
+
+    config_file = Path(config_file).resolve()
+    kwargs = dict(
+        config_file=config_file,
+        output_directory=output_directory,
+        command_name=command_name,
+        workers=workers,
+    )
+    _timed_regenerate(echo, "Initial build", **kwargs)
+    watched: List[Path] = [config_file, ASSETS_PATH, *(Path(p) for p in paths)]
+    watcher = create_watcher(watched, polling=polling, interval=interval)
+    echo(f"Watching {', '.join(str(p) for p in watched)}. Press Ctrl+C to stop.")
+    rebuilds = 0
+    try:
+        while stop is None or not stop.is_set():
+            changed = wait_for_changes(watcher, debounce=debounce, timeout=0.5)
+            if not changed:
+                continue
+            # Hydra configs can be composed from other files not tracked by the cache key
+            clear_config_cache()
+            message = f"Rebuilt after {len(changed)} change{'s' if len(changed) > 1 else ''}"
+            _timed_regenerate(echo, message, **kwargs)
+            watcher.reset()  # Ignore the files written by the rebuild
+            rebuilds += 1
+            if max_rebuilds is not None and rebuilds >= max_rebuilds:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return rebuilds
+
+
+@click.command()
+@click.option(
+    "--command",
+    "command_name",
+    default="setup",
+    show_default=True,
+    type=click.Choice(command_names()),
+    help="mloq command to run every time a change is detected.",
+)
+@config_file_opt
+@output_directory_arg
+@click.option(
+    "--watch",
+    "paths",
+    multiple=True,
+    type=click.Path(exists=True),
+    help="Additional file or directory to watch. It can be used multiple times.",
+)
+@click.option(
+    "--debounce",
+    default=0.2,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Seconds without changes to wait before regenerating the project.",
+)
+@click.option(
+    "--polling/--no-polling",
+    default=False,
+    show_default=True,
+    help="Poll the filesystem instead of using watchdog (inotify) events.",
+)
+@click.option(
+    "--interval",
+    default=0.5,
+    show_default=True,
+    type=click.FloatRange(min=0.01),
+    help="Seconds between two consecutive scans when polling.",
+)
+@workers_opt
+def watch(
+    command_name: str,
+    config_file: Optional[str],
+    output_directory: str,
+    paths: Tuple[str, ...],
+    debounce: float,
+    polling: bool,
+    interval: float,
+    workers: int,
+):
+    """
+    Regenerate the project every time mloq.yaml or the mloq templates change.
+
+    Every rebuild is incremental: only the templates whose source or configuration
+    values changed are rendered again.
+    """
+    from mloq.runner import find_config_file
+
+    config_path = find_config_file(config_file)
+    if not config_path.is_file():
+        raise click.UsageError(f"Configuration file {config_path} does not exist.")
+    watch_project(
+        config_file=config_path,
+        output_directory=output_directory,
+        command_name=command_name,
+        paths=[Path(p) for p in paths],
+        debounce=debounce,
+        polling=polling,
+        interval=interval,
+        workers=workers,
+    )
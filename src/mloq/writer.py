@@ -1,14 +1,70 @@
 """The writer module defines the Writer class, which is in charge of creating the files \
 and directories specified in the CMDRecord."""
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Union
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
 
 from omegaconf import DictConfig
 
+from mloq import _logger
 from mloq.files import File, what_mloq_generated
-from mloq.record import CMDRecord, Ledger
-from mloq.templating import write_template
+from mloq.manifest import (
+    config_hash,
+    file_dependencies,
+    hash_bytes,
+    hash_file,
+    Manifest,
+    MANIFEST_FILE,
+    ManifestEntry,
+    new_hasher,
+    template_hash,
+)
+from mloq.profiling import span, timed
+from mloq.record import CMDRecord, Ledger, LEDGER_FILE
+from mloq.sinks import DirectorySink, Sink, to_bytes, TransactionalSink
+from mloq.templating import (
+    is_verbatim,
+    render_template,
+    render_template_stream,
+    should_stream,
+    STREAM_THRESHOLD,
+)
+
+
+# Rendered template, iterator yielding the chunks of a template that is streamed, or
+# None for static files that are copied without rendering them
+Rendered = Optional[Union[str, Iterator[str]]]
+
+
+class WriteJob(NamedTuple):
+    """File that has been selected to be rendered and written by the Writer."""
+
+    file: File
+    path: Path
+    target: Path
+    template_hash: str = ""
+    config_hash: str = ""
+    dependencies: Tuple[str, ...] = ()
+
+
+class PlanEntry(NamedTuple):
+    """
+    Describe what the Writer would do with a file or directory.
+
+    Attributes of this class:
+        path: Path of the file or directory relative to the project root.
+        action: One of "create", "overwrite", "render" (rendered, but only written if its
+            content changed) and "skip" for files, and "create" or "skip" for directories.
+            Stale files found when pruning are either deleted ("delete") or kept
+            because they were modified ("keep").
+        reason: Human readable explanation of the action.
+        is_dir: True if the entry corresponds to a directory.
+    """
+
+    path: Path
+    action: str
+    reason: str
+    is_dir: bool = False
 
 
 class Writer:
@@ -29,9 +85,32 @@ class Writer:
             user's configuration.
         overwrite: Boolean value. If True, existing files will be rewritten
             by mloq application.
+        workers: Number of threads used to render and write the templates.
+        incremental: Boolean value. If True, only render and write the files
+            whose content changed since the last time mloq generated them.
+        stats: Number of files rendered, written and skipped by the Writer.
+        sink: Sink where the files and directories are written.
+        stream_threshold: Templates whose source is at least this number of bytes are
+            rendered and written in chunks.
+        copy_static: If True, static files are copied to the sink without decoding them.
+        prune: If True, remove the unmodified files that are not generated anymore.
+        atomic: If True, the files are written in a single transaction.
     """
 
-    def __init__(self, path: Union[Path, str], record: CMDRecord, overwrite: bool = False):
+    def __init__(
+        self,
+        path: Union[Path, str],
+        record: CMDRecord,
+        overwrite: bool = False,
+        workers: int = 1,
+        incremental: bool = False,
+        sink: Optional[Sink] = None,
+        stream_threshold: Optional[int] = STREAM_THRESHOLD,
+        copy_static: bool = True,
+        link_mode: str = "copy",
+        prune: bool = False,
+        atomic: bool = False,
+    ):
         """
         Initialize a new instance of the CMDRecord class.
 
@@ -46,11 +125,83 @@ class Writer:
                 provided by the user.
             overwrite: Boolean value. If True, all existing files will be
                 rewritten by the mloq application.
+            workers: Number of threads used to render and write the templates.
+                If it is greater than one, all the templates are rendered concurrently
+                and then written in bulk. The generated files are identical to the
+                ones generated using a single worker.
+            incremental: Boolean value. If True, keep a manifest with the hashes of
+                the generated files. A template is only rendered if its source or the
+                configuration values it uses changed since the last run, and a file
+                is only written if its rendered content is different from the file
+                present on disk. Existing files with outdated content are overwritten.
+            sink: Sink where the files will be written. It can be used to keep the
+                files in memory or to stream them into an archive. If None, write the
+                files to the directory specified in path. If it is a DirectorySink,
+                its path is used as the project root. The Writer does not close
+                the sinks it receives. Incremental mode is only supported when writing
+                to a directory.
+
+            stream_threshold: Templates whose source is at least this number of bytes,
+                and the files with the stream flag set, are rendered with
+                `Template.generate` and written to the sink chunk by chunk, so their
+                content is never held in memory. If None, only the files with the
+                stream flag set are streamed. The content of streamed files is not
+                kept in `rendered`.
+            copy_static: If True, static files are copied to the sink as bytes instead
+                of being read as text and written again, unless reading them in text
+                mode would translate their line endings. Files that are already
+                present with the same content are not rewritten. The content of copied
+                files is not kept in `rendered`.
+            link_mode: How static files are placed in the project directory when sink
+                is None. One of "copy", "hardlink" or "symlink". See `DirectorySink`.
+            prune: If True, remove the files generated by a previous run that are not
+                generated anymore, such as the files of a command that was disabled.
+                Only the files whose content hash matches the one recorded when they
+                were generated are removed. Files modified since then are kept and
+                reported in `kept`.
+            atomic: If True, write the files with a TransactionalSink. All the files are
+                staged in a temporary directory and moved into place when `run` finishes,
+                so an interrupted run does not leave partially written files. If
+                writing any file fails, the project is left as it was.
+
+        Raises:
+            ValueError: If incremental or prune are True and the sink is not a
+                DirectorySink, if atomic is True and a sink is provided, or if
+                link_mode is not valid.
         """
+        if incremental and sink is not None and not isinstance(sink, DirectorySink):
+            raise ValueError("Incremental mode is only supported when writing to a directory.")
+        if prune and sink is not None and not isinstance(sink, DirectorySink):
+            raise ValueError("Pruning files is only supported when writing to a directory.")
+        if atomic and sink is not None:
+            raise ValueError("Atomic mode creates its own sink. Use a TransactionalSink instead.")
         self._record = record
         self._ledger = Ledger()
-        self._path = Path(path)  # Path to the project root directory
+        sink_class = TransactionalSink if atomic else DirectorySink
+        self.sink = sink_class(path, link_mode=link_mode) if sink is None else sink
+        # Path to the project root directory
+        self._path = self.sink.path if isinstance(self.sink, DirectorySink) else Path(path)
         self.overwrite = overwrite
+        self.workers = max(int(workers), 1)
+        self.incremental = incremental
+        self.stream_threshold = stream_threshold
+        self.copy_static = copy_static
+        self.prune = prune
+        self.atomic = atomic
+        self._previous_manifest = (
+            Manifest.load(self.manifest_path) if incremental or prune else None
+        )
+        # The ledger of the previous run is loaded before it is overwritten
+        self._previous_ledger = (
+            Ledger.load(self.path / LEDGER_FILE)
+            if isinstance(self.sink, DirectorySink)
+            else Ledger()
+        )
+        self._manifest = Manifest()
+        self.pruned: List[Path] = []
+        self.kept: List[Path] = []
+        self._rendered: Dict[Path, str] = {}
+        self.stats: Dict[str, int] = {"rendered": 0, "written": 0, "skipped": 0}
 
     @property
     def path(self) -> Path:
@@ -67,16 +218,71 @@ class Writer:
         """Register the files and directories generated by the mloq application."""
         return self._record
 
+    @property
+    def manifest(self) -> Manifest:
+        """Hashes of the files generated in the current run when running in incremental mode."""
+        return self._manifest
+
+    @property
+    def rendered(self) -> Dict[Path, str]:
+        """
+        Content of the files rendered by the Writer, indexed by their relative path.
+
+        Files that were streamed or copied are not included.
+        """
+        return self._rendered
+
+    @property
+    def manifest_path(self) -> Path:
+        """Path to the manifest file of the target project."""
+        return self.path / MANIFEST_FILE
+
+    def _register(self, file: File, path: Union[Path, str]) -> None:
+        """Add the file to the ledger with the command that registered it in the record."""
+        self.ledger.register(file, path=path, command=self.record.owner(path))
+
+    def _owns(self, path: Path) -> bool:
+        """
+        Return True if the file or directory of the previous run belongs to this run.
+
+        Outputs are owned by the commands of the record, so running one command never
+        prunes the files generated by other commands. Records whose files were not
+        registered by any command own all the previous outputs.
+        """
+        if not self.record.commands:
+            return True
+        return self._previous_ledger.command(path) in self.record.commands
+
     def create_directories(self) -> None:
         """Create the folders registered inside the attribute 'record.directories'."""
         for directory in self.record.directories:
-            os.makedirs(self.path / directory, exist_ok=True)
+            self.sink.makedirs(directory)
+            self.ledger.register_directory(directory, command=self.record.owner(directory))
 
     def write_templates(self) -> None:
         """Generate the files recorded in the attribute 'record.files' on the specified path."""
+        if self.workers > 1:
+            self._write_templates_concurrently()
+            return
         for path, file in self.record.files.items():
             self.write_template(file=file, path=path, config=self.record.config)
 
+    def _write_templates_concurrently(self) -> None:
+        """Render all the templates using a thread pool, and then write them in bulk."""
+        config = self.record.config
+        # Select and register in the main thread following the record order to keep
+        # the ledger and the manifest deterministic.
+        jobs = [self._select(file, path, config) for path, file in self.record.files.items()]
+        jobs = [job for job in jobs if job is not None]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            rendered = list(pool.map(lambda job: self._render(job.file, config), jobs))
+            if self.sink.thread_safe:
+                results = list(pool.map(self._commit, jobs, rendered))
+            else:  # Keep the record order when streaming the files
+                results = [self._commit(job, content) for job, content in zip(jobs, rendered)]
+        for job, content, result in zip(jobs, rendered, results):
+            self._update(job, content, *result)
+
     def dump_ledger(self) -> None:
         """
         Write the summary of the generated files.
@@ -91,6 +297,36 @@ class Writer:
             config=config,
         )
 
+    def dump_ledger_file(self) -> None:
+        """
+        Write the paths, descriptions and content hashes of the generated files as json.
+
+        Files that were not written because they already existed keep the entry of the
+        previous run. Stale files stay in the ledger until they are removed with `prune`,
+        so the ones that were modified are kept. The file is only written if its content
+        changed.
+        """
+        ledger = Ledger()
+        ledger.update(self.ledger)
+        paths = None
+        if self.prune:
+            removed = {path for path, _ in self._stale_files()} - set(self.kept)
+            paths = [p for p in self._previous_ledger.paths if p not in removed]
+        ledger.update(self._previous_ledger, paths=paths)
+        previous = [d for d in self._previous_ledger.directories if (self.path / d).is_dir()]
+        for directory in [*self.ledger.directories, *previous]:
+            ledger.register_directory(directory)
+        content = ledger.dumps()
+        target = self.path / LEDGER_FILE
+        if isinstance(self.sink, DirectorySink) and target.is_file():
+            if target.read_text() == content:
+                return
+        self.sink.write(LEDGER_FILE, content)
+
+    def dump_manifest(self) -> None:
+        """Write the hashes of the generated files to the project manifest."""
+        self.sink.write(MANIFEST_FILE, self.manifest.dumps())
+
     def write_template(
         self,
         file: File,
@@ -108,16 +344,340 @@ class Writer:
         Returns:
             None.
         """
-        write_template(
-            file=file,
-            config=config,
-            path=self.path / path,
-            overwrite=self.overwrite,
-            ledger=self.ledger,
+        job = self._select(file=file, path=path, config=config)
+        if job is not None:
+            rendered = self._render(file, config)
+            self._update(job, rendered, *self._commit(job, rendered))
+
+    def _render(self, file: File, config: Mapping) -> Rendered:
+        """
+        Render the file template.
+
+        Large templates are not rendered immediately: an iterator that renders the
+        template chunk by chunk while it is being written is returned instead. Return
+        None for the static files that are copied without rendering them.
+        """
+        if self.copy_static and is_verbatim(file):
+            return None
+        elif should_stream(file, self.stream_threshold):
+            return render_template_stream(file, config)
+        with span("render", file=file.dst):
+            return render_template(file, config)
+
+    def _select(self, file: File, path: Path, config: Mapping) -> Optional[WriteJob]:
+        """
+        Decide if the target file needs to be rendered.
+
+        Return None if the file will not be generated. Otherwise, register the file
+        in the ledger and return the WriteJob that will be rendered.
+        """
+        target = self.path / path
+        if self.incremental:
+            source_hash = template_hash(file)
+            dependencies = self._dependencies(file, path, source_hash)
+            hashes = source_hash, config_hash(file, config, dependencies)
+            job = WriteJob(file, Path(path), target, *hashes, dependencies)
+            previous = self._unchanged_entry(job)
+            self._register(file, path)
+            if previous is None:
+                return job
+            _logger.debug(f"file {file.dst} is up to date. Skipping")
+            self.ledger.set_content_hash(path, previous.content_hash)
+            self.manifest.register(path, previous)
+            self.stats["skipped"] += 1
+            return None
+        elif not self.overwrite and self.sink.exists(path):
+            _logger.debug(f"file {file.dst} already exists. Skipping")
+            self.stats["skipped"] += 1
+            return None
+        self._register(file, path)
+        return WriteJob(file, Path(path), target)
+
+    def plan(self) -> List[PlanEntry]:
+        """
+        Return what the Writer would do with each directory and file of the record.
+
+        Templates are not rendered and the project files are neither read nor written:
+        the decisions are taken using `stat` calls, and the manifest of the previous run
+        when running in incremental mode. When pruning, the stale files are read to
+        check if they were modified.
+
+        Returns:
+            List of PlanEntry containing the directories followed by the files, in the
+            same order as they are registered in the record, and the summary of the
+            generated files. The stale files found when pruning are listed at the end.
+        """
+        plan = []
+        for directory in dict.fromkeys(Path(d) for d in self.record.directories):
+            exists = (self.path / directory).is_dir()
+            action, reason = ("skip", "already exists") if exists else ("create", "does not exist")
+            plan.append(PlanEntry(Path(directory), action, reason, is_dir=True))
+        ledger = Ledger()
+        for path, file in self.record.files.items():
+            action, reason = self._plan_file(file, path, self.record.config)
+            plan.append(PlanEntry(Path(path), action, reason))
+            if self.incremental or action != "skip":
+                ledger.register(file, path=path, command=self.record.owner(path))
+        config = DictConfig({**self.record.config, "generated_files": ledger.files})
+        action, reason = self._plan_file(what_mloq_generated, what_mloq_generated.dst, config)
+        plan.append(PlanEntry(Path(what_mloq_generated.dst), action, reason))
+        if self.prune:
+            for path, content_hash in self._stale_files():
+                plan.append(PlanEntry(path, *self._prune_action(path, content_hash)))
+        return plan
+
+    def _plan_file(self, file: File, path: Path, config: Mapping) -> Tuple[str, str]:
+        """Return the action that the Writer would take for the target file and its reason."""
+        target = self.path / path
+        try:
+            stat = target.stat()
+        except OSError:
+            return "create", "does not exist"
+        if not self.incremental:
+            if self.overwrite:
+                return "overwrite", "already exists and overwrite is enabled"
+            return "skip", "already exists and overwrite is disabled"
+        previous = self._previous_manifest.get(path)
+        if previous is None:
+            return "render", "not present in the manifest"
+        elif previous.template_hash != template_hash(file):
+            return "render", "template changed"
+        elif previous.config_hash != config_hash(file, config, previous.dependencies or None):
+            return "render", "configuration values changed"
+        elif stat.st_size != previous.size:
+            return "render", "file modified since the last run"
+        elif stat.st_mtime_ns != previous.mtime_ns:
+            return "render", "modification time changed since the last run"
+        return "skip", "up to date"
+
+    def _dependencies(self, file: File, path: Path, source_hash: str) -> Tuple[str, ...]:
+        """
+        Return the configuration values read by the file template.
+
+        The dependencies stored in the manifest of the previous run are reused if the
+        template did not change, so the template does not need to be parsed again.
+        """
+        previous = self._previous_manifest.get(path)
+        if previous is not None and previous.template_hash == source_hash:
+            if previous.dependencies or file.is_static:
+                return previous.dependencies
+        return file_dependencies(file)
+
+    def _unchanged_entry(self, job: WriteJob) -> Optional[ManifestEntry]:
+        """Return the previous manifest entry of the file if it does not need to be rendered."""
+        previous = self._previous_manifest.get(job.path)
+        if (
+            previous is None
+            or previous.template_hash != job.template_hash
+            or previous.config_hash != job.config_hash
+            or not job.target.is_file()
+        ):
+            return None
+        stat = job.target.stat()
+        if stat.st_size == previous.size and stat.st_mtime_ns == previous.mtime_ns:
+            return previous
+        # The file was touched after mloq wrote it. Check if its content is still the same.
+        if stat.st_size == previous.size and hash_file(job.target) == previous.content_hash:
+            return previous._replace(mtime_ns=stat.st_mtime_ns)
+        return None
+
+    @timed("write")
+    def _commit(self, job: WriteJob, rendered: Rendered) -> Tuple[bool, str]:
+        """
+        Write the rendered template to its target path.
+
+        In incremental mode the file is not written if the content on disk is the same.
+        Streamed files are always written, and their hash is computed while writing them.
+        Static files are copied if the target does not have the same content.
+
+        Returns:
+            Tuple containing a boolean that is True if the file was written, and the
+            hash of the content of the file.
+        """
+        if rendered is None:
+            written = self.sink.copy(job.path, job.file.src)
+            return written, hash_file(job.file.src)
+        elif not isinstance(rendered, str):
+            hasher = new_hasher()
+            self.sink.write(job.path, self._hash_chunks(rendered, hasher))
+            return True, hasher.hexdigest()
+        content = rendered.encode("utf-8")
+        content_hash = hash_bytes(content)
+        written = not (
+            self.incremental
+            and job.target.is_file()
+            and job.target.stat().st_size == len(content)
+            and hash_file(job.target) == content_hash
         )
+        if written:
+            self.sink.write(job.path, rendered)
+        return written, content_hash
+
+    @staticmethod
+    def _hash_chunks(chunks: Iterable[str], hasher) -> Iterator[str]:
+        """Update the hasher with the chunks while they are being consumed."""
+        for chunk in chunks:
+            hasher.update(to_bytes(chunk))
+            yield chunk
+
+    def _manifest_entry(self, job: WriteJob, content_hash: str) -> ManifestEntry:
+        """Return the manifest entry of a file that has been written to disk."""
+        # Staged files keep their size and modification time when they are moved into place
+        stat = self.sink.local_path(job.path).stat()
+        return ManifestEntry(
+            content_hash=content_hash,
+            template_hash=job.template_hash,
+            config_hash=job.config_hash,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            dependencies=job.dependencies,
+        )
+
+    def _update(self, job: WriteJob, rendered: Rendered, written: bool, content_hash: str):
+        """Keep track of the result of writing a file."""
+        if isinstance(rendered, str):
+            self._rendered[job.path] = rendered
+        self.stats["rendered"] += 1
+        self.stats["written" if written else "skipped"] += 1
+        self.ledger.set_content_hash(job.path, content_hash)
+        if self.incremental:
+            self.manifest.register(job.path, self._manifest_entry(job, content_hash))
+
+    def _stale_files(self) -> List[Tuple[Path, Optional[str]]]:
+        """
+        Return the files generated by the previous run that are not generated anymore.
+
+        The previous outputs are read from the ledger of the previous run, and from its
+        manifest for the files that are missing from the ledger. Only the outputs owned by
+        the commands of the record are considered, see `_owns`.
+
+        Returns:
+            List of tuples containing the path of every stale file and the hash of its
+            content when it was generated, or None if it is not known.
+        """
+        previous: Dict[Path, Optional[str]] = {
+            path: self._previous_ledger.content_hash(path) for path in self._previous_ledger.paths
+        }
+        for key in self._previous_manifest or ():
+            if previous.get(Path(key)) is None:
+                previous[Path(key)] = self._previous_manifest.get(key).content_hash
+        current = {Path(p) for p in self.record.files}
+        current.update(map(Path, (what_mloq_generated.dst, LEDGER_FILE, MANIFEST_FILE)))
+        return [
+            (path, content_hash)
+            for path, content_hash in previous.items()
+            # Never touch files outside of the project, even if the ledger says so
+            if path not in current
+            and not path.is_absolute()
+            and ".." not in path.parts
+            and self._owns(path)
+        ]
+
+    def _prune_action(self, path: Path, content_hash: Optional[str]) -> Tuple[str, str]:
+        """Return if a stale file will be deleted or kept, and the reason."""
+        target = self.path / path
+        if not target.is_file():
+            return "skip", "not generated anymore and already removed"
+        elif content_hash is None:
+            return "keep", "not generated anymore, but its original content is unknown"
+        elif hash_file(target) != content_hash:
+            return "keep", "not generated anymore, but it was modified"
+        return "delete", "not generated anymore"
+
+    def prune_stale_files(self) -> None:
+        """
+        Remove the files generated by the previous run that are not generated anymore.
+
+        Stale files are only removed if their content did not change since they were
+        generated. Modified files are kept, added to `kept`, and stay in the ledger, so
+        they are removed by a later run if their original content is restored. The
+        directories created by previous runs that are not part of the record are removed
+        if they are empty.
+        """
+        for path, content_hash in self._stale_files():
+            action, reason = self._prune_action(path, content_hash)
+            if action == "delete":
+                self.sink.remove(path)
+                self.pruned.append(path)
+                _logger.info(f"Removed {path.as_posix()}: {reason}")
+            elif action == "keep":
+                self.kept.append(path)
+                _logger.warning(f"Not removing {path.as_posix()}: {reason}")
+        current = {Path(d) for d in self.record.directories}
+        stale = [
+            d for d in self._previous_ledger.directories if d not in current and self._owns(d)
+        ]
+        for directory in sorted(stale, key=lambda d: len(d.parts), reverse=True):
+            self.sink.remove_directory(directory)
+
+    def render(self) -> Dict[Path, str]:
+        """
+        Render all the files of the record in memory, without touching the filesystem.
+
+        All the files are registered in the ledger, including the summary of the
+        generated files, and the overwrite and incremental options are ignored.
+
+        Returns:
+            Dictionary containing the rendered files indexed by their path relative
+            to the project root, following the record order.
+        """
+        config = self.record.config
+        files = [(Path(path), file) for path, file in self.record.files.items()]
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                contents = list(pool.map(lambda item: render_template(item[1], config), files))
+        else:
+            contents = [render_template(file, config) for _, file in files]
+        for (path, file), content in zip(files, contents):
+            self._register(file, path)
+            self.ledger.set_content_hash(path, hash_bytes(content.encode("utf-8")))
+            self._rendered[path] = content
+        ledger_config = DictConfig({**config, "generated_files": self.ledger.files})
+        self.ledger.register(what_mloq_generated, description=what_mloq_generated.description)
+        content = render_template(what_mloq_generated, ledger_config)
+        self.ledger.set_content_hash(what_mloq_generated.dst, hash_bytes(content.encode("utf-8")))
+        self._rendered[Path(what_mloq_generated.dst)] = content
+        self.stats["rendered"] += len(files) + 1
+        return dict(self._rendered)
 
     def run(self) -> None:
-        """Generate all files and directories registered inside the record instance."""
-        self.create_directories()
-        self.write_templates()
-        self.dump_ledger()
+        """
+        Generate all files and directories registered inside the record instance.
+
+        In atomic mode the generated files are moved into place once all of them have
+        been written. If any step fails, the files are discarded and the project is
+        left unchanged.
+        """
+        if not self.atomic:
+            self._run()
+            return
+        try:
+            self._run()
+            with span("commit"):
+                self.sink.commit()
+        except BaseException:
+            self.sink.rollback()
+            raise
+
+    def _run(self) -> None:
+        """Write the directories, files, ledgers and manifest to the sink."""
+        with span("Writer.run", workers=self.workers):
+            with span("create_directories"):
+                self.create_directories()
+            with span("write_templates"):
+                self.write_templates()
+            with span("dump_ledger"):
+                self.dump_ledger()
+            if self.prune:
+                with span("prune_stale_files"):
+                    self.prune_stale_files()
+            with span("dump_ledger_file"):
+                self.dump_ledger_file()
+            if self.incremental:
+                with span("dump_manifest"):
+                    self.dump_manifest()
+        _logger.info(
+            "Files rendered: {rendered}, written: {written}, skipped: {skipped}".format(
+                **self.stats,
+            ),
+        )
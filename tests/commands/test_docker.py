@@ -1,9 +1,11 @@
 from pathlib import Path
 
-from omegaconf import DictConfig, OmegaConf
+from omegaconf import DictConfig, MISSING, OmegaConf
 import pytest
 
 from mloq.commands.docker import DOCKER_FILES, DockerCMD
+from mloq.commands.globals import GlobalsCMD
+from mloq.config import prompt
 from mloq.writer import CMDRecord
 from tests.test_command import TestCommand
 
@@ -110,3 +112,30 @@ class TestDockerCMD:
         assert command.base_image is not None
         assert command.record.config.docker.base_image is not None
         assert command.base_image == command.get_base_image()
+
+    def test_shared_record_tracks_other_commands(self):
+        config = DictConfig(docker_conf_with_globals)
+        config.docker.docker_org = "${globals.owner}"
+        record = CMDRecord(config)
+        globals_cmd = GlobalsCMD(record=record)
+        docker = DockerCMD(record=record)
+        assert docker.conf.select("docker_org") == "test_owner"
+        assert docker.conf.resolved["project_name"] == "test project"
+        globals_cmd.owner = "new_owner"
+        globals_cmd.project_name = "new project"
+        assert docker.conf.select("docker_org") == "new_owner"
+        assert docker.conf.resolve()["docker_org"] == "new_owner"
+        assert docker.conf.resolved["project_name"] == "new project"
+        globals_cmd.owner = MISSING
+        assert "docker_org" in docker.conf.missing
+
+    def test_prompt_default_tracks_other_commands(self, monkeypatch):
+        config = DictConfig(docker_conf_with_globals)
+        config.docker.docker_org = "${globals.owner}"
+        record = CMDRecord(config)
+        globals_cmd = GlobalsCMD(record=record)
+        docker = DockerCMD(record=record)
+        monkeypatch.setattr(prompt, "prompt", lambda text, **kwargs: kwargs["default"])
+        globals_cmd.owner = "new_owner"
+        assert docker.prompt("docker_org") == "new_owner"
+        assert docker.prompt("docker_org", default="other_owner") == "other_owner"
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from omegaconf import DictConfig
+import pytest
+
+from mloq.commands.requirements import data_science_req, pytorch_req, requirements, RequirementsCMD
+from mloq.files import read_file
+from mloq.writer import CMDRecord
+from tests import TestCommand  # noqa: F401
+
+
+requirements_conf = {
+    "requirements": dict(disable=False, requirements=["data-science", "torch"]),
+}
+
+empty_conf = {
+    "requirements": dict(disable=False, requirements=["none"]),
+}
+
+fixture_ids = ["requirements-ds-torch", "requirements-none"]
+
+
+@pytest.fixture(
+    params=[(RequirementsCMD, requirements_conf), (RequirementsCMD, empty_conf)],
+    scope="function",
+    ids=fixture_ids,
+)
+def command_and_config(request):
+    command_cls, conf_dict = request.param
+    config = DictConfig(conf_dict)
+    record = CMDRecord(config)
+    command = command_cls(record=record)
+    return command, config
+
+
+@pytest.fixture(params=[(RequirementsCMD, requirements_conf)], scope="function")
+def command_and_example(request):
+    command_cls, conf_dict = request.param
+    config = DictConfig(conf_dict)
+    record = CMDRecord(config)
+    command = command_cls(record=record)
+    return command, None
+
+
+class TestRequirements:
+    def test_name_is_correct(self, command_and_config):
+        command, _ = command_and_config
+        assert command.cmd_name == "requirements"
+
+    def test_compose_requirements(self):
+        composed = RequirementsCMD.compose_requirements(["data-science", "pytorch"])
+        lines = composed.split("\n")
+        assert lines == sorted(set(lines))
+        assert "" not in lines
+        for file in [data_science_req, pytorch_req]:
+            for line in read_file(file).split("\n"):
+                assert not line or line in lines
+
+    def test_compose_requirements_removes_duplicates(self):
+        single = RequirementsCMD.compose_requirements(["pytorch"])
+        assert RequirementsCMD.compose_requirements(["pytorch", "torch"]) == single
+
+    def test_requirements_are_generated_in_memory(self):
+        record = CMDRecord(DictConfig(requirements_conf))
+        RequirementsCMD(record=record).run()
+        reqs_file = record.files[Path(requirements.dst)]
+        assert reqs_file.src == requirements.src
+        assert reqs_file.content == RequirementsCMD.compose_requirements(
+            ["data-science", "torch"],
+        )
+        assert read_file(reqs_file) == reqs_file.content
@@ -1,3 +1,4 @@
+import copy
 from itertools import product
 
 import omegaconf
@@ -5,7 +6,16 @@ from omegaconf import MISSING, OmegaConf
 import param
 import pytest
 
-from mloq.config.configuration import Config, DictConfig, is_interpolation
+from mloq.config.configuration import (
+    Config,
+    ConfigResolver,
+    DictConfig,
+    interpolation_references,
+    is_interpolation,
+    resolve_as_dict,
+    safe_select,
+    to_param_type,
+)
 from tests.config.fixtures import configurable, ConfigurableTest, interpolated, interpolated_params
 
 
@@ -152,6 +162,21 @@ class TestConfig:
             assert isinstance(configurable.integer, int) and isinstance(configurable.number, float)
             assert "integer" in c.interpolations
 
+    @pytest.mark.parametrize(
+        "key, value",
+        [
+            ("string", {"globals.owner": None}),
+            ("string", [0, 1]),
+            ("integer", [0, 1]),
+            ("number", {"hola": 1.0}),
+        ],
+    )
+    def test_container_is_not_cast_to_scalar(self, key, value):
+        config = OmegaConf.create({key: value})
+        assert to_param_type(ConfigurableTest(), config, key) == value
+        with pytest.raises(ValueError):
+            ConfigurableTest(config=config)
+
     def test_sync(self, interpolated):
         interps = interpolated.conf.interpolations
         assert len(interps) > 0, f"conf {interpolated.config} interps: {interps}"
@@ -160,6 +185,24 @@ class TestConfig:
             assert interpolation_is_consistent(interpolated, k)
         assert len(interpolated.conf.interpolations) > 0
 
+    def test_resolved_is_reused_until_modified(self):
+        configurable = ConfigurableTest(number=1.0, integer="${number}")
+        resolved = configurable.conf.resolved
+        assert configurable.conf.resolved is resolved
+        assert resolved["integer"] == 1.0
+        configurable.number = 7.0
+        assert configurable.conf.resolved is not resolved
+        assert configurable.conf.resolved["integer"] == 7.0
+        configurable.conf["number"] = 8.0
+        assert configurable.conf.resolved["integer"] == 8.0
+        configurable.conf.sync()
+        assert configurable.integer == 8
+
+    def test_resolve_as_dict(self, interpolated):
+        config = interpolated.config
+        expected = {k: to_param_type(interpolated, config, k) for k in config}
+        assert resolve_as_dict(interpolated, copy.deepcopy(config)) == expected
+
 
 class TestConfigurable:
     def test_conf(self, configurable):
@@ -176,3 +219,93 @@ class TestConfigurable:
         assert not configurable.param.config.readonly
         assert configurable.param.config.per_instance
         assert configurable.param.config.instantiate
+
+
+@pytest.fixture()
+def composed_config():
+    return OmegaConf.create(
+        {
+            "globals": {"author": "me", "owner": "${globals.author}", "email": MISSING},
+            "docker": {
+                "docker_org": "${globals.owner}",
+                "image": "${.docker_org}/image",
+                "email": "${globals.email}",
+            },
+            "license": {"copyright": "${globals.author}"},
+        },
+    )
+
+
+class TestConfigResolver:
+    def test_interpolation_references(self):
+        assert interpolation_references("${globals.owner}") == {"globals.owner"}
+        assert interpolation_references("${a}/${b.c}") == {"a", "b.c"}
+        assert interpolation_references("${.sibling}", "node.key") == {"node.sibling"}
+        assert interpolation_references("${oc.env:HOME,${a}}") == {"a"}
+        assert interpolation_references(["${a}", {"x": "${b}"}]) == {"a", "b"}
+        assert interpolation_references(7) == set()
+
+    def test_dependencies(self, composed_config):
+        resolver = ConfigResolver(composed_config)
+        assert resolver.dependencies("docker.docker_org") == {"globals.owner"}
+        assert resolver.dependencies("docker.image") == {"docker.docker_org"}
+        assert resolver.dependents("globals.author") == {
+            "globals.owner",
+            "docker.docker_org",
+            "docker.image",
+            "license.copyright",
+        }
+        assert resolver.dependents("globals") >= {"docker.email", "license.copyright"}
+
+    def test_select_matches_safe_select(self, composed_config):
+        resolver = ConfigResolver(composed_config)
+        for key in ["globals.owner", "docker.docker_org", "docker.image", "docker.email"]:
+            assert resolver.select(key) == safe_select(composed_config, key)
+        assert resolver.select("docker.email") == MISSING
+        assert resolver.select("does.not.exist", default=3) == 3
+        assert resolver.as_dict().keys() == composed_config.keys()
+
+    def test_select_is_memoized(self, composed_config):
+        resolver = ConfigResolver(composed_config)
+        assert resolver.select("docker.image") == "me/image"
+        composed_config.globals.author = "you"
+        assert resolver.select("docker.image") == "me/image"
+        resolver.invalidate("globals.author")
+        assert resolver.select("docker.image") == "you/image"
+
+    def test_invalidate_only_dependents(self, composed_config):
+        resolver = ConfigResolver(composed_config)
+        assert resolver.select("docker.email") == MISSING
+        assert resolver.select("license.copyright") == "me"
+        composed_config.globals.email = "me@mail.com"
+        composed_config.globals.author = "you"
+        resolver.invalidate("globals.email")
+        assert resolver.select("docker.email") == "me@mail.com"
+        assert resolver.select("license.copyright") == "me"
+
+    def test_invalidate_parent_and_child_keys(self):
+        config = OmegaConf.create(
+            {"a": {"b": {"c": 1}, "d": 2}, "x": "${a.b.c}", "y": "${a}", "z": "${x}", "w": 3},
+        )
+        resolver = ConfigResolver(config)
+        values = {k: resolver.select(k) for k in ["a.b", "a.d", "x", "y", "z", "w"]}
+        assert values["z"] == 1
+        config.a.b.c = 5
+        resolver.invalidate("a.b.c")
+        assert resolver._cached.related("a") == {"a.d"}
+        assert "w" in resolver._cached
+        assert resolver.select("z") == 5 and resolver.select("y")["b"] == {"c": 5}
+        config.x = "plain"
+        resolver.invalidate("x")
+        assert resolver.dependents("a.b.c") == {"y"}
+        assert resolver.select("z") == "plain"
+
+    def test_invalidate_new_interpolation(self, composed_config):
+        resolver = ConfigResolver(composed_config)
+        assert resolver.select("license.copyright") == "me"
+        composed_config.license.copyright = "${docker.docker_org}"
+        resolver.invalidate("license.copyright")
+        assert resolver.dependencies("license.copyright") == {"docker.docker_org"}
+        composed_config.globals.author = "you"
+        resolver.invalidate("globals.author")
+        assert resolver.select("license.copyright") == "you"
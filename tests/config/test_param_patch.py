@@ -2,7 +2,9 @@ from omegaconf import MISSING
 import param as param_
 import pytest
 
+from mloq.config.configuration import lookup_param_type, PARAM_TO_TYPE
 from mloq.config.param_patch import param
+from mloq.config.prompt import PARAM_TO_PROMPT
 
 
 patched_classes = [getattr(param, p) for p in sorted(param.PATCHED_PARAMETERS)]
@@ -38,3 +40,19 @@ class TestParamPatch:
         )
         assert instance.default is None
         assert instance._interpolation_init
+
+    def test_patched_class_is_cached(self, patched_class):
+        name = patched_class.__name__
+        assert getattr(param, name) is patched_class
+        assert getattr(param, name) is getattr(param, name)
+        assert isinstance(patched_class(), getattr(param, name))
+
+    def test_lookup_param_type(self, patched_class):
+        base = getattr(param_, patched_class.__name__)
+        assert lookup_param_type(PARAM_TO_TYPE, patched_class) is PARAM_TO_TYPE[base]
+        assert lookup_param_type(PARAM_TO_PROMPT, patched_class) is PARAM_TO_PROMPT.get(base)
+
+    def test_lookup_param_type_subclass(self):
+        assert lookup_param_type(PARAM_TO_TYPE, param_.Integer) is int
+        assert lookup_param_type(PARAM_TO_TYPE, param_.Magnitude) is float
+        assert lookup_param_type(PARAM_TO_TYPE, param_.Parameter) is None
@@ -0,0 +1,16 @@
+import pytest
+
+from mloq.cache import CACHE_DIR_ENV, DISABLE_CACHE_ENV, get_cache_dir
+from mloq.templating import jinja_env
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Store the mloq caches and compiled templates in a temporary folder for each test."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    monkeypatch.delenv(DISABLE_CACHE_ENV, raising=False)
+    if jinja_env.bytecode_cache is not None:
+        templates_dir = str(get_cache_dir("templates"))
+        monkeypatch.setattr(jinja_env.bytecode_cache, "directory", templates_dir)
+    return path
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import sys
+import tempfile
+
+from omegaconf import OmegaConf
+import pytest
+
+from mloq._utils import dir_trees_are_equal
+from mloq.api import generate, GenerationResult
+from mloq.commands import CiCMD
+from mloq.files import what_mloq_generated
+from mloq.record import CMDRecord
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+@pytest.fixture(scope="module")
+def example_config():
+    return OmegaConf.load(EXAMPLE_CONFIG)
+
+
+class TestGenerate:
+    def test_generate_in_memory(self, example_config):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cwd = os.getcwd()
+            os.chdir(temp_dir)
+            try:
+                result = generate(example_config, command="setup")
+                assert os.listdir(temp_dir) == []
+            finally:
+                os.chdir(cwd)
+        assert isinstance(result, GenerationResult)
+        assert isinstance(result.record, CMDRecord)
+        assert list(result.files)[:-1] == [Path(p) for p in result.record.files]
+        assert Path(what_mloq_generated.dst) in result.files
+        assert len(result.ledger.files) == len(result.files)
+        assert result.stats["rendered"] == len(result.files)
+
+    def test_generate_matches_written_files(self, example_config):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = generate(example_config, command=CiCMD, path=temp_dir)
+            assert result.files
+            for path, content in result.files.items():
+                assert (Path(temp_dir) / path).read_text() == content
+        assert result.files == generate(example_config, command="ci").files
+
+    def test_generate_does_not_modify_input(self, example_config):
+        config = OmegaConf.to_container(example_config)
+        expected = OmegaConf.to_container(example_config)
+        generate(config, command="setup")
+        assert config == expected
+        generate(EXAMPLE_CONFIG, command="setup")
+
+    def test_generate_concurrently(self, example_config):
+        argv, cwd = list(sys.argv), os.getcwd()
+        serial = generate(example_config, command="setup")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: generate(example_config), range(16)))
+        for result in results:
+            assert result.files == serial.files
+            assert result.ledger.files == serial.ledger.files
+        assert sys.argv == argv
+        assert os.getcwd() == cwd
+
+    def test_generate_concurrently_to_directories(self, example_config):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = [Path(temp_dir) / str(i) for i in range(4)]
+            for path in paths:
+                os.makedirs(path)
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda p: generate(example_config, path=p), paths))
+            for path in paths[1:]:
+                assert dir_trees_are_equal(paths[0], path)
@@ -0,0 +1,57 @@
+from pathlib import Path
+import shutil
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+import pytest
+
+from mloq.batch import batch, find_config_files, run_batch
+from mloq.files import mloq_yml
+
+
+EXAMPLES = Path(__file__).parent / "examples"
+
+
+@pytest.fixture()
+def projects():
+    temp_dir = TemporaryDirectory()
+    root = Path(temp_dir.name)
+    for name in ["test_1", "test_mloq"]:
+        (root / name).mkdir()
+        shutil.copy(EXAMPLES / "ci" / name / mloq_yml.dst, root / name / mloq_yml.dst)
+    (root / "broken").mkdir()
+    (root / "broken" / mloq_yml.dst).write_text("ci: {python_versions: ${missing.key}}\n")
+    yield root
+    temp_dir.cleanup()
+
+
+class TestBatch:
+    def test_find_config_files(self, projects):
+        found = find_config_files([str(projects / "*"), str(projects / "test_1" / mloq_yml.dst)])
+        assert found == sorted(p.resolve() / mloq_yml.dst for p in projects.iterdir())
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_run_batch(self, projects, jobs):
+        config_files = find_config_files([str(projects / "*")])
+        results = run_batch(config_files, command_name="ci", jobs=jobs)
+        assert [r.config_file for r in results] == config_files
+        statuses = {r.config_file.parent.name: r.status for r in results}
+        assert statuses == {"broken": "failed", "test_1": "ok", "test_mloq": "ok"}
+        for result in results:
+            if result.status == "ok":
+                assert result.files_written == 2
+                assert (result.config_file.parent / ".github" / "workflows" / "push.yml").exists()
+            else:
+                assert result.error
+
+    def test_cli(self, projects):
+        result = CliRunner().invoke(batch, ["--command", "ci", str(projects / "test_*")])
+        assert result.exit_code == 0, result.output
+        assert "2 projects succeeded, 0 failed." in result.output
+        result = CliRunner().invoke(batch, ["--command", "ci", str(projects / "*")])
+        assert result.exit_code == 1
+        assert "2 projects succeeded, 1 failed." in result.output
+
+    def test_cli_no_projects(self, projects):
+        result = CliRunner().invoke(batch, [str(projects / "does_not_exist")])
+        assert result.exit_code != 0
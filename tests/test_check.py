@@ -0,0 +1,113 @@
+from pathlib import Path
+import shutil
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+import pytest
+
+from mloq import check
+from mloq.check import check_project, compare_file, encode_rendered, format_drift
+from mloq.cli import cli
+from mloq.commands import get_command_class
+from mloq.manifest import Manifest, MANIFEST_FILE
+from mloq.record import CMDRecord
+from mloq.runner import load_config, write_record
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+def generate_project(path: Path, incremental: bool = False) -> Path:
+    config_file = path / "mloq.yaml"
+    shutil.copyfile(EXAMPLE_CONFIG, config_file)
+    record = get_command_class("ci")(record=CMDRecord(config=load_config(config_file))).run()
+    write_record(record=record, path=path, incremental=incremental)
+    return config_file
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "incremental"])
+def project(request):
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir)
+        yield generate_project(path, incremental=request.param), path
+
+
+class TestCheckProject:
+    def test_up_to_date(self, project):
+        config_file, path = project
+        assert check_project(config_file, path, command_name="ci") == []
+        assert check_project(config_file, path, command_name="ci", workers=1) == []
+
+    def test_drift(self, project):
+        config_file, path = project
+        push = Path(".github") / "workflows" / "push.yml"
+        (path / push).write_text((path / push).read_text().replace("fragile-bot", "other-bot"))
+        (path / "WHAT_MLOQ_GENERATED.md").unlink()
+        drifts = check_project(config_file, path, command_name="ci")
+        assert [(d.path, d.status) for d in drifts] == [
+            (push, "modified"),
+            (Path("WHAT_MLOQ_GENERATED.md"), "missing"),
+        ]
+        assert drifts[0].detail.startswith("+")
+        summary = format_drift(drifts)
+        assert "modified  .github/workflows/push.yml" in summary
+        assert summary.endswith("2 files are out of date.")
+        excluded = check_project(config_file, path, command_name="ci", exclude=["*.md"])
+        assert [d.path for d in excluded] == [push]
+
+    def test_config_change(self, project):
+        config_file, path = project
+        text = config_file.read_text().replace("bot_name: fragile-bot", "bot_name: new-bot")
+        config_file.write_text(text)
+        drifts = check_project(config_file, path, command_name="ci")
+        assert [d.path.name for d in drifts] == ["push.yml"]
+
+
+class TestCompareFile:
+    def test_same_size_different_content(self):
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "file.txt").write_bytes(encode_rendered("abc\n"))
+            assert compare_file(root, Path("file.txt"), "abc\n") is None
+            drift = compare_file(root, Path("file.txt"), "abd\n")
+            assert drift.status == "modified"
+            assert drift.detail == "+1 -1 lines"
+
+    def test_manifest_short_circuit(self, monkeypatch):
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            generate_project(root, incremental=True)
+            manifest = Manifest.load(root / MANIFEST_FILE)
+            path = Path(".github") / "workflows" / "push.yml"
+            expected = (root / path).read_text()
+
+            def fail(*args, **kwargs):
+                raise AssertionError("The file should not be read")
+
+            # The manifest proves the file is up to date, so it is not read
+            monkeypatch.setattr(check, "open", fail, raising=False)
+            assert compare_file(root, path, expected, manifest) is None
+            with pytest.raises(AssertionError):
+                compare_file(root, path, expected + "\n", manifest)
+
+
+class TestCheckCLI:
+    def test_exit_codes(self):
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)
+            config_file = generate_project(path)
+            args = ["check", "--command", "ci", "-f", str(config_file), temp_dir]
+            result = CliRunner().invoke(cli, args)
+            assert result.exit_code == 0, result.output
+            assert "All files are up to date" in result.output
+            (path / "WHAT_MLOQ_GENERATED.md").write_text("changed\n")
+            result = CliRunner().invoke(cli, args + ["--diff"])
+            assert result.exit_code == 1
+            assert "+++ WHAT_MLOQ_GENERATED.md" in result.output
+            assert "1 file is out of date." in result.output
+
+    def test_missing_config(self):
+        with TemporaryDirectory() as temp_dir:
+            result = CliRunner().invoke(cli, ["check", "-f", temp_dir, temp_dir])
+        assert result.exit_code != 0
+        assert "does not exist" in result.output
@@ -0,0 +1,65 @@
+import re
+import subprocess
+import sys
+
+from click.testing import CliRunner
+import pytest
+
+from mloq.cli import cli, CLI_COMMANDS, MloqCLI
+from mloq.commands import COMMANDS, get_command_class
+
+
+# Upper bound for the cumulative import time (in microseconds) of the modules imported
+# when displaying the help of the CLI. It is deliberately loose to avoid flaky failures
+# on slow CI runners; the assertions on the imported modules catch the real regressions.
+IMPORT_TIME_CAP_US = 1_000_000
+# Modules that should only be imported when a command is actually executed.
+LAZY_MODULES = ["hydra", "jinja2", "mloq.command", "mloq.templating", "mloq.writer"]
+IMPORT_TIME_REGEX = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "mloq", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_TIME_REGEX.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, module = match.groups()
+        times[module] = (int(cumulative), len(indent) == 0)
+    return times
+
+
+@pytest.fixture(params=[("--help",), ("lint", "--help")], ids=["mloq", "mloq-lint"])
+def help_args(request):
+    return request.param
+
+
+class TestMloqCLI:
+    def test_list_commands(self):
+        assert MloqCLI().list_commands(None) == sorted(list(COMMANDS) + list(CLI_COMMANDS))
+
+    def test_get_command_unknown(self):
+        assert MloqCLI().get_command(None, "this_command_does_not_exist") is None
+
+    def test_get_command_class(self):
+        for name in COMMANDS:
+            assert get_command_class(name).cmd_name == name
+
+    def test_help(self):
+        result = CliRunner().invoke(cli, ["--help"])
+        assert result.exit_code == 0
+        for name in list(COMMANDS) + list(CLI_COMMANDS):
+            assert name in result.output
+
+    def test_help_import_time(self, help_args):
+        times = import_times(*help_args)
+        for module in LAZY_MODULES:
+            assert module not in times, f"{module} imported running mloq {' '.join(help_args)}"
+        total = sum(cumulative for cumulative, top_level in times.values() if top_level)
+        assert total < IMPORT_TIME_CAP_US
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+from omegaconf import OmegaConf
+import pytest
+
+from mloq.cli import cli
+from mloq.commands import SetupCMD
+from mloq.deps import command_dependencies, format_dependencies, manifest_dependencies
+from mloq.record import CMDRecord
+from mloq.writer import Writer
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+class TestDeps:
+    def test_command_dependencies(self):
+        dependencies = command_dependencies("docker")
+        assert "docker.base_image" in dependencies["Dockerfile"]
+        assert "docker.ubuntu_version" not in dependencies["Dockerfile"]
+        assert dependencies["WHAT_MLOQ_GENERATED.md"] == ("generated_files",)
+
+    def test_license_templates_are_merged(self):
+        dependencies = command_dependencies("license")
+        assert "license.copyright_holder" in dependencies["LICENSE"]
+        assert dependencies["DCO.md"] == ()
+
+    def test_manifest_dependencies(self):
+        record = SetupCMD(record=CMDRecord(OmegaConf.load(EXAMPLE_CONFIG))).run()
+        with TemporaryDirectory() as target:
+            with pytest.raises(Exception):
+                manifest_dependencies(Path(target))
+            Writer(record=record, path=target, incremental=True).run()
+            dependencies = manifest_dependencies(Path(target))
+        assert dependencies["README.md"] == command_dependencies("setup")["README.md"]
+
+    @pytest.mark.parametrize("fmt", ["text", "json"])
+    def test_cli(self, fmt):
+        result = CliRunner().invoke(cli, ["deps", "ci", "--format", fmt])
+        assert result.exit_code == 0, result.output
+        if fmt == "json":
+            assert json.loads(result.output) == {
+                k: list(v) for k, v in command_dependencies("ci").items()
+            }
+        else:
+            assert result.output.strip() == format_dependencies(command_dependencies("ci"))
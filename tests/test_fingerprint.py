@@ -0,0 +1,124 @@
+import os
+from pathlib import Path
+import shutil
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+from omegaconf import OmegaConf
+import pytest
+
+from mloq import fingerprint, runner
+from mloq.cache import DISABLE_CACHE_ENV
+from mloq.cli import cli
+from mloq.commands import CiCMD
+from mloq.fingerprint import config_fingerprint, load_cached_record, save_cached_record
+from mloq.runner import build_record
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+@pytest.fixture()
+def config_file():
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "mloq.yaml"
+        shutil.copyfile(EXAMPLE_CONFIG, path)
+        yield path
+
+
+class TestConfigFingerprint:
+    def test_canonical(self, config_file):
+        reference = config_fingerprint(config_file, "ci")
+        text = config_file.read_text()
+        quoted = text.replace("bot_name: fragile-bot", "bot_name: 'fragile-bot'")
+        config_file.write_text("# A comment\n" + quoted)
+        assert config_fingerprint(config_file, "ci") == reference
+        config_file.write_text(text.replace("bot_name: fragile-bot", "bot_name: other-bot"))
+        assert config_fingerprint(config_file, "ci") != reference
+
+    def test_inputs(self, config_file):
+        reference = config_fingerprint(config_file, "ci")
+        assert len(reference) == 64
+        assert config_fingerprint(config_file, "docs") != reference
+        assert config_fingerprint(config_file, "ci", ["globals.owner=me"]) != reference
+        assert config_fingerprint(config_file, "ci", side_effects=False) != reference
+
+    @pytest.mark.parametrize("line", ["defaults:\n  - base\n", "home: ${oc.env:HOME}\n"])
+    def test_not_fingerprinted(self, config_file, line):
+        config_file.write_text(line + config_file.read_text())
+        assert config_fingerprint(config_file, "ci") is None
+
+    def test_invalid_file(self, config_file):
+        config_file.write_text("globals: [")
+        assert config_fingerprint(config_file, "ci") is None
+        assert config_fingerprint(config_file.parent / "missing.yaml", "ci") is None
+
+
+class TestRecordCache:
+    def test_cache_hit(self, config_file, cache_dir, monkeypatch):
+        record = build_record("ci", config_file)
+        assert len(list(cache_dir.rglob("*.pkl"))) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("The configuration should not be loaded")
+
+        monkeypatch.setattr(runner, "load_config", fail)
+        cached = build_record("ci", config_file)
+        assert cached.files == record.files
+        assert cached.directories == record.directories
+        assert OmegaConf.to_container(cached.config) == OmegaConf.to_container(record.config)
+        assert OmegaConf.is_struct(cached.config)
+        with pytest.raises(AssertionError):
+            build_record("ci", config_file, use_cache=False)
+        with pytest.raises(AssertionError):
+            build_record("ci", config_file, interactive=True)
+        monkeypatch.setenv(DISABLE_CACHE_ENV, "1")
+        with pytest.raises(AssertionError):
+            build_record("ci", config_file)
+
+    def test_not_cacheable(self, config_file, cache_dir):
+        class NotCacheableCMD(CiCMD):
+            cacheable = False
+
+        build_record(NotCacheableCMD, config_file)
+        assert list(cache_dir.rglob("*.pkl")) == []
+
+    def test_invalid_entry(self, config_file, cache_dir):
+        key = config_fingerprint(config_file, "ci")
+        build_record("ci", config_file)
+        (entry,) = cache_dir.rglob("*.pkl")
+        entry.write_bytes(b"not a pickle")
+        assert load_cached_record(key) is None
+        assert build_record("ci", config_file).files
+
+    def test_unwritable_cache_dir(self, config_file, cache_dir, monkeypatch):
+        missing_dir = cache_dir / "missing"
+        monkeypatch.setattr(fingerprint, "_record_path", lambda key: missing_dir / f"{key}.pkl")
+        assert build_record("ci", config_file).files
+        assert not missing_dir.exists()
+        assert list(cache_dir.rglob("*.tmp")) == []
+
+    def test_eviction(self, config_file, cache_dir):
+        record = build_record("ci", config_file)
+        for i, key in enumerate(("a", "b", "c")):
+            save_cached_record(key, record)
+            entry = next(cache_dir.rglob(f"{key}.pkl"))
+            os.utime(entry, ns=(i, i))
+        fingerprint._evict(entry.parent, max_records=2)
+        assert len(list(cache_dir.rglob("*.pkl"))) == 2
+        assert load_cached_record("a") is None
+        assert load_cached_record("c") is not None
+
+
+class TestCachedCLI:
+    def test_same_output(self, config_file, cache_dir):
+        outputs = []
+        for _ in range(2):
+            with TemporaryDirectory() as target:
+                args = ["ci", "-f", str(config_file), target]
+                result = CliRunner().invoke(cli, args)
+                assert result.exit_code == 0, result.output
+                files = [p for p in Path(target).rglob("*") if p.is_file()]
+                outputs.append({p.relative_to(target): p.read_bytes() for p in files})
+        assert outputs[0] == outputs[1]
+        assert len(list(cache_dir.rglob("*.pkl"))) == 1
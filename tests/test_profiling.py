@@ -0,0 +1,158 @@
+import json
+from pathlib import Path
+import pstats
+import sys
+from tempfile import TemporaryDirectory
+import threading
+
+from click.testing import CliRunner
+import pytest
+
+from mloq.cli import cli
+from mloq.profiling import (
+    is_profiling,
+    parse_profile_spec,
+    PROFILE_ENV,
+    profile_session,
+    Profiler,
+    span,
+    timed,
+)
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+class TestSpans:
+    def test_disabled_by_default(self):
+        assert not is_profiling()
+        assert span("phase") is span("other", file="x")
+        assert span("phase").__enter__() is None
+
+    def test_timed(self):
+        @timed("double")
+        def double(x):
+            return 2 * x
+
+        assert double(2) == 4
+        messages = []
+        with profile_session("table", echo=messages.append) as profiler:
+            assert double(3) == 6
+        assert [e.name for e in profiler.events] == ["double", "mloq"]
+        assert double.__name__ == "double"
+
+    def test_nested_spans(self):
+        messages = []
+        with profile_session("table", name="session", echo=messages.append) as profiler:
+            assert is_profiling()
+            with span("outer"):
+                for i in range(3):
+                    with span("inner", index=i):
+                        pass
+        assert not is_profiling()
+        summary = {phase["name"]: phase for phase in profiler.summary()}
+        assert summary["session"]["depth"] == 0
+        assert summary["outer"]["depth"] == 1
+        assert summary["inner"]["depth"] == 2
+        assert summary["inner"]["calls"] == 3
+        assert summary["outer"]["total"] >= summary["inner"]["total"]
+        table = messages[0].splitlines()
+        assert table[0].startswith("phase")
+        assert [line.split()[0] for line in table[1:]] == ["session", "outer", "inner"]
+
+    def test_threads(self):
+        profiler = Profiler()
+
+        def run():
+            with profiler.span("thread", {}):
+                pass
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(profiler.events) == 4
+        assert all(e.depth == 0 for e in profiler.events)
+
+    def test_session_disabled(self):
+        with profile_session(None) as profiler:
+            assert profiler is None
+            assert not is_profiling()
+        with profile_session("") as profiler:
+            assert profiler is None
+
+
+class TestProfileSpec:
+    def test_parse(self):
+        assert parse_profile_spec("table") == {"table": None}
+        assert parse_profile_spec("table, trace:out.json,cprofile") == {
+            "table": None,
+            "trace": Path("out.json"),
+            "cprofile": Path("mloq.prof"),
+        }
+        assert parse_profile_spec("") == {}
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_profile_spec("table,flamegraph")
+
+
+class TestProfileOutputs:
+    def test_trace_and_cprofile(self):
+        with TemporaryDirectory() as temp_dir:
+            trace, stats = Path(temp_dir) / "trace.json", Path(temp_dir) / "stats.prof"
+            messages = []
+            with profile_session(f"trace:{trace},cprofile:{stats}", echo=messages.append):
+                with span("phase", file="README.md"):
+                    sum(range(1000))
+            data = json.loads(trace.read_text())
+            events = {e["name"]: e for e in data["traceEvents"]}
+            assert events["phase"]["ph"] == "X"
+            assert events["phase"]["args"] == {"file": "README.md"}
+            assert events["phase"]["dur"] <= events["mloq"]["dur"]
+            assert pstats.Stats(str(stats)).total_calls > 0
+            assert len(messages) == 2
+
+    def test_pyinstrument_missing(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "pyinstrument", None)
+        with pytest.raises(ImportError):
+            with profile_session("pyinstrument"):
+                pass
+        assert not is_profiling()
+
+
+class TestProfileCLI:
+    @pytest.mark.parametrize("use_env", [False, True])
+    def test_profile_table(self, use_env):
+        with TemporaryDirectory() as temp_dir:
+            args = ["ci", "-f", str(EXAMPLE_CONFIG), temp_dir]
+            env = {PROFILE_ENV: "table"} if use_env else {}
+            if not use_env:
+                args.append("--profile=table")
+            result = CliRunner(mix_stderr=False).invoke(cli, args, env=env)
+            assert result.exit_code == 0, result.output
+            assert (Path(temp_dir) / ".github" / "workflows" / "push.yml").exists()
+        phases = [line.split()[0] for line in result.stderr.splitlines()[1:]]
+        for phase in [
+            "mloq",
+            "load_config",
+            "Command.__init__",
+            "configure",
+            "record_directories",
+            "record_files",
+            "run_side_effects",
+            "Writer.run",
+            "write_templates",
+            "render",
+            "write",
+            "dump_ledger",
+        ]:
+            assert phase in phases
+
+    def test_invalid_profile(self):
+        with TemporaryDirectory() as temp_dir:
+            args = ["ci", "-f", str(EXAMPLE_CONFIG), temp_dir, "--profile", "flamegraph"]
+            result = CliRunner().invoke(cli, args)
+        assert result.exit_code != 0
+        assert "Invalid profile format" in result.output
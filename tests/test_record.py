@@ -1,4 +1,5 @@
 from pathlib import Path
+import tempfile
 
 from omegaconf import DictConfig
 import pytest
@@ -60,24 +61,83 @@ class TestLedger:
     def test_register_no_description(self, ledger, file):
         ledger.register(file)
         assert (str(Path(file.dst)), file.description) in ledger.files
-        assert (Path(file.dst), file.description) == ledger._files[0]
+        assert ledger.paths == [Path(file.dst)]
 
     def test_register_description_str(self, ledger):
         file, description = f"example/{mloq_yml.dst}", "test_description"
         ledger.register(file, description=description)
         assert (str(Path(file)), description) in ledger.files
-        assert (Path(file), description) == ledger._files[0]
+        assert ledger.paths == [Path(file)]
 
     def test_register_description_file(self, ledger, file):
         description = f"example/{mloq_yml.dst}", "test_description"
         ledger.register(file, description=description)
         assert (str(Path(file.dst)), description) in ledger.files
-        assert (Path(file.dst), description) == ledger._files[0]
+        assert ledger.paths == [Path(file.dst)]
 
     def test_no_description_fails(self, ledger):
         with pytest.raises(ValueError):
             ledger.register("error_file.txt")
 
+    def test_register_twice(self, ledger, files):
+        for _ in range(2):
+            for file in files:
+                ledger.register(file)
+        assert ledger.paths == [Path(file.dst) for file in files]
+        assert len(ledger.files) == len(files)
+
+    def test_same_name_different_paths(self, ledger):
+        ledger.register(setup_py, path="setup.py")
+        ledger.register(setup_py, path=Path("docs") / "setup.py")
+        assert ledger.paths == [Path("setup.py"), Path("docs") / "setup.py"]
+        assert ledger.files == [(str(setup_py.dst), setup_py.description)] * 2
+
+    def test_files_are_sorted(self, ledger, files):
+        for file in reversed(files):
+            ledger.register(file)
+        assert ledger.files == sorted((str(f.dst), f.description) for f in files)
+        ledger.register("a_file.txt", description="first file")
+        assert ledger.files[0] == ("a_file.txt", "first file")
+
+    def test_save_and_load(self, ledger, files):
+        for file in files:
+            ledger.register(file, path=Path("project") / file.dst)
+        ledger.set_content_hash(Path("project") / files[0].dst, "hash")
+        ledger.register(files[1], path=Path("project") / files[1].dst, command="docs")
+        ledger.register_directory(Path("project"))
+        ledger.register_directory("project", command="docs")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "ledger.json"
+            ledger.save(path)
+            loaded = Ledger.load(path)
+        assert loaded.to_dict() == ledger.to_dict()
+        assert loaded.files == ledger.files
+        assert loaded.directories == [Path("project")]
+        assert loaded.content_hash(Path("project") / files[0].dst) == "hash"
+        assert loaded.content_hash(Path("project") / files[1].dst) is None
+        assert loaded.command(Path("project") / files[1].dst) == "docs"
+        assert loaded.command(Path("project") / files[0].dst) is None
+        assert loaded.command("project") == "docs"
+
+    def test_load_missing_or_invalid(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert Ledger.load(Path(temp_dir) / "missing.json").paths == []
+            invalid = Path(temp_dir) / "invalid.json"
+            invalid.write_text("{")
+            assert Ledger.load(invalid).paths == []
+
+    def test_update(self, ledger):
+        other = Ledger()
+        other.register("a", description="new a", path="a.txt")
+        other.set_content_hash("a.txt", "hash_a")
+        other.register("b", description="b", path="b.txt")
+        ledger.register("a", description="a", path="a.txt")
+        ledger.update(other, paths=["a.txt"])
+        assert ledger.files == [("a", "a")]
+        ledger.update(other)
+        assert ledger.paths == [Path("a.txt"), Path("b.txt")]
+        assert ledger.content_hash("a.txt") is None
+
 
 class TestCMDRecord:
     def test_attribute_types(self, record, files, directories):
@@ -135,6 +195,19 @@ class TestCMDRecord:
         for directory, _ in zip(record.directories, directories):
             assert directory == Path(directory)
 
+    def test_owned_by(self, record, files):
+        record.register_directory("unowned")
+        with record.owned_by("setup"):
+            with record.owned_by("docs"):
+                record.register_file(files[0], path=Path("docs"))
+                record.register_directory("docs")
+            record.register_file(files[1], path=Path())
+        assert record.commands == ["setup", "docs"]
+        assert record.owner(Path("docs") / files[0].dst) == "docs"
+        assert record.owner("docs") == "docs"
+        assert record.owner(files[1].dst) == "setup"
+        assert record.owner("unowned") is None
+
     def test_update_config(self, record, config):
         record.update_config(config)
         # TODO: Find a nice way to test this
@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from mloq.cache import CACHE_DIR_ENV, DISABLE_CACHE_ENV
+from mloq.failure import RequirementConflict
+import mloq.requirements
+from mloq.requirements import (
+    merge_requirements,
+    normalize_name,
+    parse_requirement,
+    parse_requirements,
+    requirements_index,
+    REQUIREMENTS_PATH,
+)
+
+
+@pytest.fixture()
+def requirements_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir)
+        (path / "a.txt").write_text("numpy==1.21.4\n# comment\n\nPyYAML>=5.0  # inline\n")
+        (path / "b.txt").write_text("numpy==1.21.4\nscipy==1.7.2\n")
+        yield path
+
+
+@pytest.fixture()
+def cache_dir(monkeypatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setenv(CACHE_DIR_ENV, temp_dir)
+        monkeypatch.delenv(DISABLE_CACHE_ENV, raising=False)
+        mloq.requirements._build_index.cache_clear()
+        yield Path(temp_dir)
+        mloq.requirements._build_index.cache_clear()
+
+
+class TestParseRequirements:
+    def test_normalize_name(self):
+        assert normalize_name("Typing_Extensions") == "typing-extensions"
+        assert normalize_name("zope.interface") == "zope-interface"
+
+    def test_parse_requirement(self):
+        req = parse_requirement('Django[argon2] >= 3.2 ; python_version >= "3.8"')
+        assert req.name == "django"
+        assert req.extras == "[argon2]"
+        assert req.specifier == ">=3.2"
+        assert req.markers == 'python_version >= "3.8"'
+
+    def test_parse_invalid_requirement(self):
+        with pytest.raises(ValueError):
+            parse_requirement("==1.0")
+
+    def test_parse_requirements_ignores_comments(self, requirements_dir):
+        reqs = parse_requirements((requirements_dir / "a.txt").read_text())
+        assert [r.line for r in reqs] == ["numpy==1.21.4", "PyYAML>=5.0"]
+
+
+class TestMergeRequirements:
+    def test_merge_removes_duplicates(self):
+        merged = merge_requirements(
+            [
+                ("a", parse_requirements("scipy==1.7.2\nnumpy==1.21.4")),
+                ("b", parse_requirements("Numpy==1.21.4\nnumpy")),
+            ],
+        )
+        assert [r.line for r in merged] == ["numpy==1.21.4", "scipy==1.7.2"]
+
+    def test_merge_keeps_pinned_version(self):
+        merged = merge_requirements(
+            [("a", parse_requirements("numpy")), ("b", parse_requirements("numpy==1.21.4"))],
+        )
+        assert [r.line for r in merged] == ["numpy==1.21.4"]
+
+    def test_merge_extras(self):
+        merged = merge_requirements(
+            [("a", parse_requirements("dask[array]==1.0")), ("b", parse_requirements("dask"))],
+        )
+        assert [r.line for r in merged] == ["dask[array]==1.0"]
+        merged = merge_requirements(
+            [("a", parse_requirements("dask[df]==1")), ("b", parse_requirements("dask[array]"))],
+        )
+        assert [r.line for r in merged] == ["dask[array,df]==1"]
+
+    def test_merge_conflict(self):
+        groups = [
+            ("a.txt", parse_requirements("numpy==1.21.4")),
+            ("b.txt", parse_requirements("numpy==1.20")),
+        ]
+        with pytest.raises(RequirementConflict, match="a.txt"):
+            merge_requirements(groups)
+
+
+class TestRequirementsIndex:
+    def test_index_contains_all_files(self, cache_dir):
+        index = requirements_index()
+        assert set(index) == {f for f in os.listdir(REQUIREMENTS_PATH) if f.endswith(".txt")}
+        assert index["pytorch.txt"][0].name == "torch"
+
+    def test_index_is_cached_on_disk(self, requirements_dir, cache_dir, monkeypatch):
+        index = requirements_index(requirements_dir)
+        assert len(list(cache_dir.rglob("*requirements-index.json"))) == 1
+        mloq.requirements._build_index.cache_clear()
+
+        def fail(text):
+            raise AssertionError("The requirement files should not be parsed again")
+
+        monkeypatch.setattr(mloq.requirements, "parse_requirements", fail)
+        assert requirements_index(requirements_dir) == index
+
+    def test_index_is_rebuilt_when_files_change(self, requirements_dir, cache_dir):
+        requirements_index(requirements_dir)
+        (requirements_dir / "b.txt").write_text("pandas==1.3.4\n")
+        index = requirements_index(requirements_dir)
+        assert [r.name for r in index["b.txt"]] == ["pandas"]
+
+    def test_index_is_built_when_cache_dir_is_missing(
+        self,
+        requirements_dir,
+        cache_dir,
+        monkeypatch,
+    ):
+        missing_dir = cache_dir / "missing"
+        monkeypatch.setattr(mloq.requirements, "get_cache_dir", lambda *parts: missing_dir)
+        index = requirements_index(requirements_dir)
+        assert [r.name for r in index["b.txt"]] == ["numpy", "scipy"]
+        assert not missing_dir.exists()
@@ -1,15 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
 import filecmp
+import json
 import os
 import os.path
 from pathlib import Path
 import shutil
+import sys
 import tempfile
 
+from click.testing import CliRunner
 from omegaconf import DictConfig, OmegaConf
 import pytest
 
+from mloq._utils import get_generated_files
+from mloq.cli import cli
 from mloq.commands import CiCMD, DockerCMD, DocsCMD, LicenseCMD, LintCMD, ProjectCMD, SetupCMD
 from mloq.files import mloq_yml, read_file
+from mloq.manifest import hash_bytes
+from mloq.record import Ledger, LEDGER_FILE
 from mloq.runner import load_config, run_command
 
 
@@ -99,6 +107,40 @@ class TestLoadConfig:
         assert config == example
         temp_dir.cleanup()
 
+    def test_load_config_overrides(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        config = load_config(config_file, ["globals.owner=another_owner"])
+        assert config.globals.owner == "another_owner"
+        assert load_config(config_file, []).globals.owner != "another_owner"
+
+    def test_load_config_returns_copies(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        config = load_config(config_file, [])
+        owner = config.globals.owner
+        config.globals.owner = "modified"
+        assert load_config(config_file, []).globals.owner == owner
+
+    def test_load_config_reloads_modified_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / mloq_yml.dst
+            path.write_text("globals:\n  owner: first\n")
+            assert load_config(path, []).globals.owner == "first"
+            path.write_text("globals:\n  owner: second\n")
+            os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+            assert load_config(path, []).globals.owner == "second"
+
+    def test_load_config_is_reentrant(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        argv, cwd = list(sys.argv), os.getcwd()
+        overrides = [[], ["globals.owner=a"], ["globals.owner=b"]] * 4
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            configs = list(pool.map(lambda o: load_config(config_file, o), overrides))
+        for config, override in zip(configs, overrides):
+            if override:
+                assert config.globals.owner == override[0].split("=")[1]
+        assert sys.argv == argv
+        assert os.getcwd() == cwd
+
 
 class TestRunCommand:
     def test_run_command(self, command_example):
@@ -130,3 +172,75 @@ class TestRunCommand:
             set(os.listdir(target_path)) - set(os.listdir(target_example_path)),
         )
         temp_dir.cleanup()
+
+    @pytest.mark.parametrize("plan_format", ["text", "json"])
+    def test_plan_does_not_write(self, plan_format):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        with tempfile.TemporaryDirectory() as target:
+            args = ["ci", "-f", str(config_file), "--plan", "--plan-format", plan_format, target]
+            result = CliRunner().invoke(cli, args)
+            assert result.exit_code == 0, result.output
+            assert os.listdir(target) == []
+            if plan_format == "json":
+                plan = json.loads(result.output[result.output.index("{") :])
+                assert plan["files"]
+                assert plan["summary"] == {"create": len(plan["files"])}
+            else:
+                assert "create" in result.output
+
+    def test_prune(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        with tempfile.TemporaryDirectory() as target:
+            args = ["ci", "-f", str(config_file), target]
+            assert CliRunner().invoke(cli, args).exit_code == 0
+            ledger = Ledger.load(Path(target) / LEDGER_FILE)
+            ledger.register("old.yml", description="Old workflow", path="old.yml", command="ci")
+            ledger.set_content_hash("old.yml", hash_bytes(b"old"))
+            ledger.save(Path(target) / LEDGER_FILE)
+            (Path(target) / "old.yml").write_bytes(b"old")
+            result = CliRunner().invoke(cli, args + ["--plan", "--prune"])
+            assert "delete    old.yml" in result.output
+            assert CliRunner().invoke(cli, args).exit_code == 0
+            assert (Path(target) / "old.yml").exists()
+            assert CliRunner().invoke(cli, args + ["--prune"]).exit_code == 0
+            assert not (Path(target) / "old.yml").exists()
+            assert Path("old.yml") not in Ledger.load(Path(target) / LEDGER_FILE).paths
+
+    def test_prune_only_files_of_the_command(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        with tempfile.TemporaryDirectory() as target:
+            setup = ["setup", "-f", str(config_file), target]
+            assert CliRunner().invoke(cli, setup).exit_code == 0
+            generated = get_generated_files(target)
+            ci = ["ci", "-f", str(config_file), "--prune", target]
+            result = CliRunner().invoke(cli, ci)
+            assert result.exit_code == 0, result.output
+            assert all((Path(target) / path).exists() for path in generated)
+            assert sorted(get_generated_files(target)) == sorted(generated)
+            ledger = Ledger.load(Path(target) / LEDGER_FILE)
+            assert ledger.command("Dockerfile") == "docker"
+            # Setup prunes the files of its sub commands
+            ledger.register("old.yml", description="Old file", path="old.yml", command="ci")
+            ledger.set_content_hash("old.yml", hash_bytes(b"old"))
+            ledger.save(Path(target) / LEDGER_FILE)
+            (Path(target) / "old.yml").write_bytes(b"old")
+            assert CliRunner().invoke(cli, setup + ["--prune"]).exit_code == 0
+            assert not (Path(target) / "old.yml").exists()
+
+    def test_atomic(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        with tempfile.TemporaryDirectory() as target:
+            args = ["ci", "-f", str(config_file), "--atomic", target]
+            result = CliRunner().invoke(cli, args)
+            assert result.exit_code == 0, result.output
+            assert sorted(os.listdir(target)) == [".github", LEDGER_FILE, "WHAT_MLOQ_GENERATED.md"]
+
+    def test_link_mode_symlink(self):
+        config_file = Path(__file__).parent / "examples" / mloq_yml.dst
+        with tempfile.TemporaryDirectory() as target:
+            args = ["setup", "-f", str(config_file), "--link-mode", "symlink", target]
+            result = CliRunner().invoke(cli, args)
+            assert result.exit_code == 0, result.output
+            links = [f for f in os.listdir(target) if os.path.islink(os.path.join(target, f))]
+            assert ".gitignore" in links
+            assert "README.md" not in links
@@ -0,0 +1,379 @@
+import io
+import os
+from pathlib import Path
+import tarfile
+from tempfile import TemporaryDirectory
+import zipfile
+
+from omegaconf import OmegaConf
+import pytest
+
+from mloq import sinks
+from mloq.api import generate
+from mloq.commands import SetupCMD
+from mloq.files import what_mloq_generated
+from mloq.record import CMDRecord, Ledger
+from mloq.sinks import archive_sink, DirectorySink, MemorySink, TarSink, TransactionalSink, ZipSink
+from mloq.templating import is_verbatim, write_template
+from mloq.writer import Writer
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+@pytest.fixture(scope="module")
+def setup_record():
+    record = CMDRecord(OmegaConf.load(EXAMPLE_CONFIG))
+    return SetupCMD(record=record).run()
+
+
+@pytest.fixture(scope="module")
+def directory_files(setup_record):
+    with TemporaryDirectory() as temp_dir:
+        writer = Writer(record=setup_record, path=temp_dir)
+        writer.run()
+        files = {}
+        for root, _, names in os.walk(temp_dir):
+            for name in names:
+                path = Path(root) / name
+                files[path.relative_to(temp_dir)] = path.read_bytes()
+        return files, writer.ledger.files
+
+
+def read_zip(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {
+            Path(info.filename): archive.read(info)
+            for info in archive.infolist()
+            if not info.is_dir()
+        }
+
+
+def read_tar(data):
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        return {
+            Path(member.name): archive.extractfile(member).read()
+            for member in archive.getmembers()
+            if member.isfile()
+        }
+
+
+class NonSeekableBuffer(io.RawIOBase):
+    """Write-only stream that cannot seek, like a socket or a pipe."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data.extend(b)
+        return len(b)
+
+
+class TestMemorySink:
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_same_files_as_directory(self, setup_record, directory_files, workers):
+        files, ledger_files = directory_files
+        sink = MemorySink()
+        writer = Writer(record=setup_record, path="unused", sink=sink, workers=workers)
+        writer.run()
+        assert not Path("unused").exists()
+        assert sink.files == files
+        assert writer.ledger.files == ledger_files
+        assert set(Path(d) for d in setup_record.directories) <= sink.directories
+
+    def test_overwrite_disabled(self, setup_record):
+        sink = MemorySink()
+        Writer(record=setup_record, path=".", sink=sink).run()
+        writer = Writer(record=setup_record, path=".", sink=sink)
+        writer.run()
+        assert writer.ledger.files == []
+        assert writer.stats["written"] == 0
+
+    def test_incremental_not_supported(self, setup_record):
+        with pytest.raises(ValueError):
+            Writer(record=setup_record, path=".", sink=MemorySink(), incremental=True)
+
+    def test_write_template(self):
+        sink, ledger = MemorySink(), Ledger()
+        config = OmegaConf.create({"generated_files": []})
+        write_template(what_mloq_generated, config, "summary.md", ledger, sink=sink)
+        assert list(sink.files) == [Path("summary.md")]
+        assert ledger.files == [(what_mloq_generated.dst, what_mloq_generated.description)]
+        write_template(what_mloq_generated, config, "summary.md", Ledger(), sink=sink)
+        assert len(ledger.files) == 1
+
+
+class TestArchiveSinks:
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_zip(self, setup_record, directory_files, workers):
+        files, ledger_files = directory_files
+        buffer = io.BytesIO()
+        with ZipSink(buffer) as sink:
+            writer = Writer(record=setup_record, path=".", sink=sink, workers=workers)
+            writer.run()
+        assert read_zip(buffer.getvalue()) == files
+        assert writer.ledger.files == ledger_files
+
+    @pytest.mark.parametrize("compression", ["", "gz", "xz"])
+    def test_tar(self, setup_record, directory_files, compression):
+        files, ledger_files = directory_files
+        buffer = io.BytesIO()
+        with TarSink(buffer, compression=compression) as sink:
+            writer = Writer(record=setup_record, path=".", sink=sink, workers=2)
+            writer.run()
+        assert read_tar(buffer.getvalue()) == files
+        assert writer.ledger.files == ledger_files
+
+    def test_non_seekable_streams(self, setup_record, directory_files):
+        files, _ = directory_files
+        zip_stream, tar_stream = NonSeekableBuffer(), NonSeekableBuffer()
+        with ZipSink(zip_stream) as zip_sink, TarSink(tar_stream, compression="gz") as tar_sink:
+            Writer(record=setup_record, path=".", sink=zip_sink).run()
+            Writer(record=setup_record, path=".", sink=tar_sink).run()
+        assert read_zip(bytes(zip_stream.data)) == files
+        assert read_tar(bytes(tar_stream.data)) == files
+
+    @pytest.mark.parametrize("sink_class", [ZipSink, TarSink])
+    def test_streamed_files(self, setup_record, directory_files, sink_class):
+        files, _ = directory_files
+        buffer = io.BytesIO()
+        with sink_class(buffer) as sink:
+            Writer(record=setup_record, path=".", sink=sink, stream_threshold=0).run()
+        reader = read_zip if sink_class is ZipSink else read_tar
+        assert reader(buffer.getvalue()) == files
+
+    def test_prefix_and_directories(self):
+        buffer = io.BytesIO()
+        with ZipSink(buffer, prefix="project") as sink:
+            sink.makedirs(Path("a") / "b")
+            sink.makedirs("a")
+            sink.write(Path("a") / "b" / "file.txt", "content")
+            assert sink.exists(Path("a") / "b" / "file.txt")
+            assert not sink.exists("file.txt")
+        with zipfile.ZipFile(buffer) as archive:
+            names = archive.namelist()
+        assert names == ["project/a/", "project/a/b/", "project/a/b/file.txt"]
+
+    def test_archive_to_path(self, setup_record, directory_files):
+        files, _ = directory_files
+        with TemporaryDirectory() as temp_dir:
+            for name, reader in [("project.zip", read_zip), ("project.tar.gz", read_tar)]:
+                path = Path(temp_dir) / name
+                with archive_sink(path) as sink:
+                    generate(OmegaConf.load(EXAMPLE_CONFIG), command="setup", sink=sink)
+                assert reader(path.read_bytes()) == files
+
+    def test_archive_sink_invalid_format(self):
+        with pytest.raises(ValueError):
+            archive_sink(io.BytesIO(), fmt="rar")
+        with pytest.raises(ValueError):
+            archive_sink("project.rar")
+
+
+@pytest.fixture()
+def static_src():
+    with TemporaryDirectory() as temp_dir:
+        src = Path(temp_dir) / "asset.txt"
+        src.write_bytes(b"static content\n")
+        yield src
+
+
+class TestDirectorySink:
+    def test_uses_sink_path(self, setup_record, directory_files):
+        files, _ = directory_files
+        with TemporaryDirectory() as temp_dir:
+            writer = Writer(record=setup_record, path="unused", sink=DirectorySink(temp_dir))
+            writer.run()
+            assert writer.path == Path(temp_dir)
+            for path, content in files.items():
+                assert (Path(temp_dir) / path).read_bytes() == content
+
+    def test_copy_skips_identical_files(self, static_src):
+        with TemporaryDirectory() as temp_dir:
+            sink = DirectorySink(temp_dir)
+            assert sink.copy("asset.txt", static_src)
+            assert not sink.copy("asset.txt", static_src)
+            (Path(temp_dir) / "asset.txt").write_bytes(b"static CONTENT\n")
+            assert sink.copy("asset.txt", static_src)
+            assert (Path(temp_dir) / "asset.txt").read_bytes() == static_src.read_bytes()
+
+    @pytest.mark.parametrize("link_mode", ["hardlink", "symlink"])
+    def test_links(self, static_src, link_mode):
+        with TemporaryDirectory() as temp_dir:
+            sink = DirectorySink(temp_dir, link_mode=link_mode)
+            target = Path(temp_dir) / "asset.txt"
+            target.write_bytes(b"old content")
+            assert sink.copy("asset.txt", static_src)
+            assert not sink.copy("asset.txt", static_src)
+            assert target.samefile(static_src)
+            assert target.is_symlink() == (link_mode == "symlink")
+            # Writing over a link does not modify the linked asset
+            DirectorySink(temp_dir).write("asset.txt", "new content")
+            assert static_src.read_bytes() == b"static content\n"
+
+    def test_invalid_link_mode(self):
+        with pytest.raises(ValueError):
+            DirectorySink(".", link_mode="reflink")
+
+    @pytest.mark.parametrize("link_mode", ["copy", "hardlink", "symlink"])
+    def test_writer_link_modes(self, setup_record, directory_files, link_mode):
+        files, ledger_files = directory_files
+        with TemporaryDirectory() as temp_dir:
+            writer = Writer(record=setup_record, path=temp_dir, link_mode=link_mode)
+            writer.run()
+            assert writer.ledger.files == ledger_files
+            for path, content in files.items():
+                assert (Path(temp_dir) / path).read_bytes() == content
+            writer = Writer(
+                record=setup_record,
+                path=temp_dir,
+                overwrite=True,
+                link_mode=link_mode,
+            )
+            writer.run()
+            n_static = sum(is_verbatim(f) for f in setup_record.files.values())
+            assert n_static > 0
+            assert writer.stats["skipped"] == n_static
+
+    def test_copy_to_archive(self, static_src):
+        buffer = io.BytesIO()
+        with ZipSink(buffer) as sink:
+            assert sink.copy("asset.txt", static_src)
+        assert read_zip(buffer.getvalue()) == {Path("asset.txt"): b"static content\n"}
+
+
+def read_tree(path):
+    files = {}
+    for root, _, names in os.walk(path):
+        for name in names:
+            file = Path(root) / name
+            files[file.relative_to(path)] = file.read_bytes()
+    return files
+
+
+class TestTransactionalSink:
+    def test_commit(self, static_src):
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "old.txt").write_text("old")
+            (root / "removed.txt").write_text("removed")
+            sink = TransactionalSink(temp_dir)
+            sink.makedirs("docs/source")
+            sink.write("docs/source/index.md", "index")
+            sink.write("old.txt", iter(["new ", "content"]))
+            assert sink.copy("asset.txt", static_src)
+            sink.remove("removed.txt")
+            assert sink.exists("docs/source/index.md") and not sink.exists("removed.txt")
+            # Nothing is written to the project before committing
+            assert (root / "old.txt").read_text() == "old"
+            assert not (root / "docs").exists() and (root / "removed.txt").exists()
+            staged = sink.local_path("old.txt")
+            assert staged.read_text() == "new content"
+            stat = staged.stat()
+            sink.commit()
+            assert read_tree(root) == {
+                Path("docs/source/index.md"): b"index",
+                Path("old.txt"): b"new content",
+                Path("asset.txt"): b"static content\n",
+            }
+            assert (root / "old.txt").stat().st_mtime_ns == stat.st_mtime_ns
+            assert not sink.pending
+            assert sorted(os.listdir(root)) == ["asset.txt", "docs", "old.txt"]
+
+    def test_commit_flushes_files_and_directories(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(sinks, "_fsync_file", calls.append)
+        monkeypatch.setattr(sinks, "_fsync_directories", lambda paths: calls.append(sorted(paths)))
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "removed.txt").write_text("removed")
+            (root / "same.txt").write_text("same")
+            with TransactionalSink(temp_dir) as sink:
+                sink.write("docs/index.md", "index")
+                sink.copy("new.txt", root / "removed.txt")
+                assert not sink.copy("same.txt", root / "same.txt")
+                sink.remove("removed.txt")
+                staged = [sink.local_path("docs/index.md"), sink.local_path("new.txt")]
+                assert calls == staged
+        assert calls == [*staged, [root, root / "docs"]]
+
+    def test_rollback(self):
+        with TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "old.txt").write_text("old")
+            with pytest.raises(RuntimeError):
+                with TransactionalSink(temp_dir) as sink:
+                    sink.makedirs("docs")
+                    sink.write("old.txt", "new")
+                    sink.remove("old.txt")
+                    raise RuntimeError("Interrupted")
+            assert os.listdir(temp_dir) == ["old.txt"]
+            assert (Path(temp_dir) / "old.txt").read_text() == "old"
+
+    def test_failed_commit_restores_files(self, monkeypatch):
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "a.txt").write_text("old a")
+            sink = TransactionalSink(temp_dir)
+            sink.makedirs("new_dir")
+            for name in ("a.txt", "new_dir/b.txt", "c.txt"):
+                sink.write(name, f"new {name}")
+            replace = os.replace
+
+            def fail_on_last(src, dst):
+                if Path(dst).name == "c.txt":
+                    raise OSError("Disk full")
+                replace(src, dst)
+
+            monkeypatch.setattr(os, "replace", fail_on_last)
+            with pytest.raises(OSError):
+                sink.commit()
+            monkeypatch.undo()
+            assert read_tree(root) == {Path("a.txt"): b"old a"}
+            assert os.listdir(root) == ["a.txt"]
+
+    def test_writer_atomic(self, setup_record, directory_files):
+        files, ledger_files = directory_files
+        with TemporaryDirectory() as temp_dir:
+            writer = Writer(record=setup_record, path=temp_dir, atomic=True, workers=4)
+            writer.run()
+            assert writer.ledger.files == ledger_files
+            for path, content in files.items():
+                assert (Path(temp_dir) / path).read_bytes() == content
+            assert not any(name.startswith(".mloq-staging") for name in os.listdir(temp_dir))
+
+    def test_writer_atomic_incremental(self, setup_record):
+        with TemporaryDirectory() as temp_dir:
+            Writer(record=setup_record, path=temp_dir, atomic=True, incremental=True).run()
+            writer = Writer(record=setup_record, path=temp_dir, atomic=True, incremental=True)
+            writer.run()
+            # The manifest of the staged files is valid once they are moved into place
+            assert writer.stats["written"] == 0
+
+    def test_writer_failure_leaves_project_unchanged(self, setup_record, monkeypatch):
+        with TemporaryDirectory() as temp_dir:
+            Writer(record=setup_record, path=temp_dir).run()
+            before = read_tree(temp_dir)
+            render = Writer._render
+            calls = []
+
+            def fail_after_some_files(self, file, config):
+                calls.append(file)
+                if len(calls) > 5:
+                    raise KeyboardInterrupt()
+                return render(self, file, config)
+
+            monkeypatch.setattr(Writer, "_render", fail_after_some_files)
+            modified = setup_record.config.copy()
+            modified.globals.project_name = "renamed_project"
+            record = CMDRecord(config=modified, files=dict(setup_record.files))
+            with pytest.raises(KeyboardInterrupt):
+                Writer(record=record, path=temp_dir, overwrite=True, atomic=True).run()
+            assert read_tree(temp_dir) == before
+            assert not any(name.startswith(".mloq-staging") for name in os.listdir(temp_dir))
+
+    def test_atomic_requires_own_sink(self, setup_record):
+        with pytest.raises(ValueError):
+            Writer(record=setup_record, path=".", sink=MemorySink(), atomic=True)
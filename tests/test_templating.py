@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+import tempfile
+
+from omegaconf import OmegaConf
+import pytest
+
+from mloq.commands.ci import push_python_wkf
+from mloq.commands.docs import conf_py
+from mloq.commands.license import gpl_license
+from mloq.files import mloq_yml
+from mloq.record import Ledger
+from mloq.templating import (
+    create_jinja_env,
+    precompile_templates,
+    render_template,
+    render_template_stream,
+    should_stream,
+    write_template,
+)
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+@pytest.fixture()
+def cache_dir():
+    temp_dir = tempfile.TemporaryDirectory()
+    yield temp_dir.name
+    temp_dir.cleanup()
+
+
+class TestTemplateBytecodeCache:
+    def test_precompile_populates_cache(self, cache_dir):
+        env = create_jinja_env(cache_dir=cache_dir)
+        n_compiled = precompile_templates(env)
+        assert n_compiled > 0
+        cached = [f for f in os.listdir(cache_dir) if f.endswith(".cache")]
+        assert len(cached) == n_compiled
+
+    def test_warm_env_renders_same_output(self, cache_dir):
+        config = OmegaConf.load(EXAMPLE_CONFIG)
+        cold = create_jinja_env(cache_dir=cache_dir).get_template(conf_py.name)
+        warm = create_jinja_env(cache_dir=cache_dir).get_template(conf_py.name)
+        assert cold.render(**config) == warm.render(**config)
+
+    def test_corrupted_entry_is_ignored(self, cache_dir):
+        create_jinja_env(cache_dir=cache_dir).get_template(push_python_wkf.name)
+        for name in os.listdir(cache_dir):
+            with open(os.path.join(cache_dir, name), "wb") as f:
+                f.write(b"corrupted")
+        template = create_jinja_env(cache_dir=cache_dir).get_template(push_python_wkf.name)
+        assert template is not None
+
+    @pytest.mark.parametrize("broken", ["missing", "file"])
+    def test_unwritable_cache_dir(self, cache_dir, broken):
+        cache_dir = os.path.join(cache_dir, "templates")
+        if broken == "file":  # mkstemp cannot create files inside a regular file
+            Path(cache_dir).touch()
+        env = create_jinja_env(cache_dir=cache_dir)
+        template = env.get_template(conf_py.name)
+        assert template.render(**OmegaConf.load(EXAMPLE_CONFIG))
+
+    def test_now_is_a_global(self):
+        env = create_jinja_env(cache_dir=None)
+        assert callable(env.globals["now"])
+
+    def test_render_static_file(self):
+        assert render_template(mloq_yml, {}) == open(mloq_yml.src).read()
+
+
+class TestStreamingRender:
+    @pytest.mark.parametrize("file", [push_python_wkf, conf_py, gpl_license, mloq_yml])
+    @pytest.mark.parametrize("chunk_size", [1, 64, 1 << 16])
+    def test_chunks_match_render(self, file, chunk_size):
+        config = OmegaConf.load(EXAMPLE_CONFIG)
+        chunks = list(render_template_stream(file, config, chunk_size=chunk_size))
+        assert "".join(chunks) == render_template(file, config)
+        if chunk_size == 1:
+            assert len(chunks) > 1
+
+    def test_in_memory_content(self):
+        static = mloq_yml._replace(content="a" * 100)
+        assert list(render_template_stream(static, {}, chunk_size=40)) == ["a" * 40] * 2 + [
+            "a" * 20,
+        ]
+
+    def test_should_stream(self):
+        assert not should_stream(conf_py)
+        assert should_stream(conf_py._replace(stream=True))
+        assert should_stream(gpl_license, threshold=1024)
+        assert not should_stream(gpl_license, threshold=None)
+
+    def test_write_template_streamed(self):
+        config = OmegaConf.load(EXAMPLE_CONFIG)
+        file = push_python_wkf._replace(stream=True)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "push.yml"
+            write_template(file, config, path, Ledger())
+            assert path.read_text() == render_template(push_python_wkf, config)
@@ -0,0 +1,157 @@
+from pathlib import Path
+import shutil
+from tempfile import TemporaryDirectory
+import threading
+import time
+
+from click.testing import CliRunner
+import pytest
+
+import mloq
+from mloq.cli import cli
+from mloq.watch import (
+    create_watcher,
+    diff_snapshots,
+    PollingWatcher,
+    scan,
+    wait_for_changes,
+    watch_project,
+)
+
+
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
+@pytest.fixture()
+def project():
+    with TemporaryDirectory() as temp_dir:
+        config_file = Path(temp_dir) / "mloq.yaml"
+        shutil.copyfile(EXAMPLE_CONFIG, config_file)
+        output = Path(temp_dir) / "output"
+        output.mkdir()
+        yield config_file, output
+
+
+class TestWatchers:
+    def test_scan_and_diff(self, project):
+        config_file, output = project
+        old = scan([config_file.parent])
+        assert str(config_file) in old
+        (output / "new.txt").write_text("new")
+        config_file.write_text(config_file.read_text() + "\n")
+        assert diff_snapshots(old, scan([config_file.parent])) == {
+            str(config_file),
+            str(output / "new.txt"),
+        }
+
+    def test_polling_watcher(self, project):
+        config_file, output = project
+        watcher = PollingWatcher([config_file], interval=0.01)
+        assert watcher.poll(timeout=0.05) == set()
+        (output / "ignored.txt").write_text("not watched")
+        config_file.write_text(config_file.read_text() + "\n")
+        assert watcher.poll(timeout=1) == {str(config_file)}
+
+    def test_debounce_groups_changes(self, project):
+        config_file, output = project
+        watcher = PollingWatcher([config_file.parent], interval=0.01)
+
+        def write_files():
+            for i in range(3):
+                (output / f"file_{i}.txt").write_text(str(i))
+                time.sleep(0.02)
+
+        thread = threading.Thread(target=write_files)
+        thread.start()
+        changed = wait_for_changes(watcher, debounce=0.2, timeout=1)
+        thread.join()
+        assert changed == {str(output / f"file_{i}.txt") for i in range(3)}
+
+    def test_create_watcher_polling(self, project):
+        config_file, _ = project
+        watcher = create_watcher([config_file], polling=True)
+        assert isinstance(watcher, PollingWatcher)
+        watcher.close()
+
+
+class TestWatchProject:
+    def test_rebuild_on_config_change(self, project):
+        config_file, output = project
+        messages = []
+
+        def edit_config():
+            while not any(m.startswith("Watching") for m in messages):
+                time.sleep(0.01)
+            text = config_file.read_text().replace("bot_name: fragile-bot", "bot_name: new-bot")
+            config_file.write_text(text)
+
+        thread = threading.Thread(target=edit_config)
+        thread.start()
+        rebuilds = watch_project(
+            config_file=config_file,
+            output_directory=output,
+            command_name="ci",
+            debounce=0.05,
+            polling=True,
+            interval=0.01,
+            echo=messages.append,
+            max_rebuilds=1,
+        )
+        thread.join()
+        assert rebuilds == 1
+        assert "Initial build in" in messages[0]
+        assert "Rebuilt after 1 change in" in messages[-1]
+        assert "written: 1," in messages[-1]
+        assert "new-bot" in (output / ".github" / "workflows" / "push.yml").read_text()
+
+    def test_rebuild_on_asset_change(self, project):
+        config_file, output = project
+        asset = Path(mloq.__file__).parent / "assets" / "requirements" / "dogfood.txt"
+        original = asset.read_bytes()
+        messages = []
+
+        def edit_asset():
+            while not any(m.startswith("Watching") for m in messages):
+                time.sleep(0.01)
+            asset.write_bytes(original + b"\nnew-requirement==1.0.0")
+
+        thread = threading.Thread(target=edit_asset)
+        thread.start()
+        try:
+            rebuilds = watch_project(
+                config_file=config_file,
+                output_directory=output,
+                command_name="requirements",
+                debounce=0.05,
+                polling=True,
+                interval=0.01,
+                echo=messages.append,
+                max_rebuilds=1,
+            )
+            thread.join()
+        finally:
+            asset.write_bytes(original)
+        assert rebuilds == 1
+        assert "new-requirement==1.0.0" in (output / "requirements.txt").read_text()
+
+    def test_stop_event(self, project):
+        config_file, output = project
+        stop = threading.Event()
+        stop.set()
+        messages = []
+        rebuilds = watch_project(
+            config_file=config_file,
+            output_directory=output,
+            command_name="ci",
+            polling=True,
+            echo=messages.append,
+            stop=stop,
+        )
+        assert rebuilds == 0
+        assert "Initial build in" in messages[0]
+
+    def test_missing_config(self):
+        with TemporaryDirectory() as temp_dir:
+            result = CliRunner().invoke(cli, ["watch", "-f", temp_dir, temp_dir])
+        assert result.exit_code != 0
+        assert "does not exist" in result.output
@@ -1,12 +1,22 @@
+from pathlib import Path
 from tempfile import TemporaryDirectory
 
+from omegaconf import OmegaConf
 import pytest
 
-from mloq.record import CMDRecord
-from mloq.writer import Writer
+from mloq._utils import dir_trees_are_equal, get_generated_directories, get_generated_files
+from mloq.commands import SetupCMD
+from mloq.files import what_mloq_generated
+from mloq.manifest import config_hash, hash_file, Manifest, MANIFEST_FILE, ManifestEntry
+from mloq.record import CMDRecord, Ledger, LEDGER_FILE
+from mloq.sinks import MemorySink
+from mloq.writer import PlanEntry, Writer
 from tests.test_record import config_examples
 
 
+EXAMPLE_CONFIG = Path(__file__).parent / "examples" / "mloq.yaml"
+
+
 @pytest.fixture(params=config_examples, scope="function")
 def writer(request):
     temp_dir = TemporaryDirectory()
@@ -15,6 +25,295 @@ def writer(request):
     temp_dir.cleanup()
 
 
+@pytest.fixture(scope="module")
+def setup_record():
+    record = CMDRecord(OmegaConf.load(EXAMPLE_CONFIG))
+    return SetupCMD(record=record).run()
+
+
 class TestWriter:
     def test_init(self, writer):
         pass
+
+    @pytest.mark.parametrize("workers", [2, 8])
+    def test_concurrent_writes_are_identical(self, setup_record, workers):
+        with TemporaryDirectory() as serial_dir, TemporaryDirectory() as concurrent_dir:
+            serial = Writer(record=setup_record, path=serial_dir)
+            serial.run()
+            concurrent = Writer(record=setup_record, path=concurrent_dir, workers=workers)
+            concurrent.run()
+            assert serial.ledger.files == concurrent.ledger.files
+            assert dir_trees_are_equal(serial_dir, concurrent_dir)
+            assert (Path(concurrent_dir) / what_mloq_generated.dst).exists()
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_streamed_writes_are_identical(self, setup_record, workers):
+        with TemporaryDirectory() as default_dir, TemporaryDirectory() as streamed_dir:
+            Writer(record=setup_record, path=default_dir).run()
+            streamed = Writer(
+                record=setup_record,
+                path=streamed_dir,
+                workers=workers,
+                stream_threshold=0,
+            )
+            streamed.run()
+            assert dir_trees_are_equal(default_dir, streamed_dir)
+            assert streamed.rendered == {}
+            assert streamed.stats["written"] == len(setup_record.files) + 1
+
+    def test_concurrent_writes_do_not_overwrite(self, setup_record):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target).run()
+            writer = Writer(record=setup_record, path=target, workers=4)
+            writer.run()
+            assert writer.ledger.files == []
+
+
+class TestLedgerFile:
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_ledger_file(self, setup_record, workers):
+        with TemporaryDirectory() as target:
+            writer = Writer(record=setup_record, path=target, workers=workers, stream_threshold=0)
+            writer.run()
+            ledger = Ledger.load(Path(target) / LEDGER_FILE)
+            expected = [Path(p) for p in setup_record.files] + [Path(what_mloq_generated.dst)]
+            assert ledger.paths == expected
+            assert ledger.files == writer.ledger.files
+            assert set(ledger.directories) == {Path(d) for d in setup_record.directories}
+            for path in ledger.paths:
+                assert ledger.content_hash(path) == hash_file(Path(target) / path)
+            assert get_generated_files(Path(target) / what_mloq_generated.dst) == expected
+            assert get_generated_files(target) == expected
+            assert get_generated_directories(target) == ledger.directories
+
+    def test_ledger_file_incremental(self, setup_record):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target, incremental=True).run()
+            ledger_path = Path(target) / LEDGER_FILE
+            mtime = ledger_path.stat().st_mtime_ns
+            Writer(record=setup_record, path=target, incremental=True).run()
+            assert ledger_path.stat().st_mtime_ns == mtime
+            ledger = Ledger.load(ledger_path)
+            for path in ledger.paths:
+                assert ledger.content_hash(path) == hash_file(Path(target) / path)
+
+
+def without_files(record, paths):
+    files = {path: file for path, file in record.files.items() if Path(path) not in paths}
+    return CMDRecord(config=record.config, files=files, directories=list(record.directories))
+
+
+class TestPrune:
+    @pytest.mark.parametrize("incremental", [False, True])
+    @pytest.mark.parametrize("atomic", [False, True])
+    def test_prune_unmodified_files(self, setup_record, incremental, atomic):
+        stale, modified = [Path(p) for p in list(setup_record.files)[:2]]
+        record = without_files(setup_record, {stale, modified})
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target, incremental=incremental).run()
+            with open(Path(target) / modified, "a") as f:
+                f.write("local changes")
+            plan = Writer(record=record, path=target, prune=True).plan()
+            assert plan[-2:] == [
+                PlanEntry(stale, "delete", "not generated anymore"),
+                PlanEntry(modified, "keep", "not generated anymore, but it was modified"),
+            ]
+            writer = Writer(
+                record=record,
+                path=target,
+                prune=True,
+                incremental=incremental,
+                atomic=atomic,
+            )
+            writer.run()
+            assert writer.pruned == [stale]
+            assert writer.kept == [modified]
+            assert not (Path(target) / stale).exists()
+            assert (Path(target) / modified).read_text().endswith("local changes")
+            # Modified files stay in the ledger until they can be removed
+            expected = [*record.files, Path(what_mloq_generated.dst), modified]
+            assert sorted(get_generated_files(target)) == sorted(expected)
+            assert hash_file(Path(target) / what_mloq_generated.dst)
+
+    def test_no_prune_keeps_files(self, setup_record):
+        stale = Path(next(iter(setup_record.files)))
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target).run()
+            writer = Writer(record=without_files(setup_record, {stale}), path=target)
+            writer.run()
+            assert (Path(target) / stale).exists()
+            assert stale in get_generated_files(target)
+            assert writer.plan()[-1].path == Path(what_mloq_generated.dst)
+
+    def test_prune_directories(self):
+        file = what_mloq_generated._replace(dst="summary.md")
+        record = CMDRecord(
+            config=OmegaConf.create({"generated_files": []}),
+            files={Path("a") / "b" / "summary.md": file},
+            directories=[Path("a") / "b"],
+        )
+        with TemporaryDirectory() as target:
+            Writer(record=record, path=target).run()
+            (Path(target) / "a" / "user_file.txt").write_text("not generated by mloq")
+            writer = Writer(record=CMDRecord(config=record.config), path=target, prune=True)
+            writer.run()
+            assert writer.pruned == [Path("a") / "b" / "summary.md"]
+            assert not (Path(target) / "a" / "b").exists()
+            assert (Path(target) / "a" / "user_file.txt").exists()
+
+    def test_paths_outside_project_are_ignored(self, setup_record):
+        with TemporaryDirectory() as target:
+            outside = Path(target) / "outside.txt"
+            outside.write_text("content")
+            project = Path(target) / "project"
+            project.mkdir()
+            ledger = Ledger()
+            ledger.register("outside.txt", description="outside", path=Path("..") / "outside.txt")
+            ledger.set_content_hash(Path("..") / "outside.txt", hash_file(outside))
+            ledger.save(project / LEDGER_FILE)
+            writer = Writer(record=setup_record, path=project, prune=True)
+            writer.run()
+            assert outside.exists()
+            assert writer.pruned == []
+
+    def test_prune_requires_directory(self, setup_record):
+        with pytest.raises(ValueError):
+            Writer(record=setup_record, path=".", sink=MemorySink(), prune=True)
+
+
+class TestIncrementalWriter:
+    def test_first_run_writes_everything(self, setup_record):
+        with TemporaryDirectory() as target:
+            writer = Writer(record=setup_record, path=target, incremental=True)
+            writer.run()
+            n_files = len(setup_record.files) + 1  # WHAT_MLOQ_GENERATED.md
+            assert writer.stats == {"rendered": n_files, "written": n_files, "skipped": 0}
+            manifest = Manifest.load(Path(target) / MANIFEST_FILE)
+            assert len(manifest) == n_files
+            for path in setup_record.files:
+                assert manifest.get(path).content_hash == hash_file(Path(target) / path)
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_second_run_skips_everything(self, setup_record, workers):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target, incremental=True).run()
+            mtimes = {p: (Path(target) / p).stat().st_mtime_ns for p in setup_record.files}
+            writer = Writer(record=setup_record, path=target, incremental=True, workers=workers)
+            writer.run()
+            assert writer.stats["rendered"] == 0
+            assert writer.stats["written"] == 0
+            assert writer.stats["skipped"] == len(setup_record.files) + 1
+            for path, mtime in mtimes.items():
+                assert (Path(target) / path).stat().st_mtime_ns == mtime
+            assert len(writer.ledger.files) == len(setup_record.files) + 1
+
+    def test_modified_file_is_restored(self, setup_record):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target, incremental=True).run()
+            path = next(p for p, f in setup_record.files.items() if not f.is_static)
+            original = (Path(target) / path).read_text()
+            (Path(target) / path).write_text("modified")
+            writer = Writer(record=setup_record, path=target, incremental=True)
+            writer.run()
+            assert writer.stats["written"] == 1
+            assert (Path(target) / path).read_text() == original
+
+    def test_identical_content_is_not_written(self, setup_record):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target).run()
+            writer = Writer(record=setup_record, path=target, incremental=True)
+            writer.run()
+            # Without a manifest every template is rendered, but nothing changed on disk
+            assert writer.stats["rendered"] == len(setup_record.files) + 1
+            assert writer.stats["written"] == 0
+
+    def test_streamed_files_manifest(self, setup_record):
+        with TemporaryDirectory() as default_dir, TemporaryDirectory() as streamed_dir:
+            default = Writer(record=setup_record, path=default_dir, incremental=True)
+            default.run()
+            streamed = Writer(
+                record=setup_record,
+                path=streamed_dir,
+                incremental=True,
+                stream_threshold=0,
+            )
+            streamed.run()
+            for path, entry in default.manifest.entries.items():
+                assert streamed.manifest.get(path).content_hash == entry.content_hash
+            writer = Writer(record=setup_record, path=streamed_dir, incremental=True)
+            writer.run()
+            assert writer.stats["written"] == 0
+
+
+class TestWriterPlan:
+    def test_plan_empty_directory(self, setup_record):
+        with TemporaryDirectory() as target:
+            plan = Writer(record=setup_record, path=target).plan()
+            files = [entry for entry in plan if not entry.is_dir]
+            assert [e.path for e in files] == [Path(p) for p in setup_record.files] + [
+                Path(what_mloq_generated.dst),
+            ]
+            assert all(entry.action == "create" for entry in plan)
+            assert list(Path(target).iterdir()) == []
+
+    @pytest.mark.parametrize("overwrite", [False, True])
+    def test_plan_existing_files(self, setup_record, overwrite):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target).run()
+            plan = Writer(record=setup_record, path=target, overwrite=overwrite).plan()
+            expected = "overwrite" if overwrite else "skip"
+            assert all(entry.action == expected for entry in plan if not entry.is_dir)
+            assert all(entry.action == "skip" for entry in plan if entry.is_dir)
+
+    def test_plan_incremental(self, setup_record):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target, incremental=True).run()
+            modified = next(iter(setup_record.files))
+            with open(Path(target) / modified, "a") as f:
+                f.write("modified")
+            plan = Writer(record=setup_record, path=target, incremental=True).plan()
+            actions = {entry.path: entry.action for entry in plan if not entry.is_dir}
+            assert actions.pop(Path(modified)) == "render"
+            assert set(actions.values()) == {"skip"}
+
+
+class TestManifest:
+    def test_save_and_load(self):
+        entry = ManifestEntry("content", "template", "config", 10, 20)
+        manifest = Manifest()
+        manifest.register(Path("docs") / "conf.py", entry)
+        with TemporaryDirectory() as target:
+            manifest.save(Path(target) / MANIFEST_FILE)
+            loaded = Manifest.load(Path(target) / MANIFEST_FILE)
+        assert "docs/conf.py" in loaded
+        assert loaded.get(Path("docs") / "conf.py") == entry
+
+    def test_load_invalid(self):
+        with TemporaryDirectory() as target:
+            path = Path(target) / MANIFEST_FILE
+            assert len(Manifest.load(path)) == 0
+            path.write_text("{not json")
+            assert len(Manifest.load(path)) == 0
+
+    def test_config_hash_only_depends_on_used_keys(self, setup_record):
+        config = setup_record.config
+        template = setup_record.files[Path("Dockerfile")]
+        changed = OmegaConf.merge(config, {"ci": {"bot_name": "another_bot"}})
+        assert config_hash(template, config) == config_hash(template, changed)
+        # The Dockerfile only reads some of the values of the docker node
+        changed = OmegaConf.merge(config, {"docker": {"ubuntu_version": "22.04"}})
+        assert config_hash(template, config) == config_hash(template, changed)
+        changed = OmegaConf.merge(config, {"docker": {"base_image": "ubuntu:22.04"}})
+        assert config_hash(template, config) != config_hash(template, changed)
+
+    def test_dependencies_are_persisted(self, setup_record):
+        with TemporaryDirectory() as target:
+            Writer(record=setup_record, path=target, incremental=True).run()
+            manifest = Manifest.load(Path(target) / MANIFEST_FILE)
+            assert "project.project_name" in manifest.get("README.md").dependencies
+            assert manifest.get(".gitignore").dependencies == ()
+            config = OmegaConf.merge(setup_record.config, {"ci": {"bot_name": "another_bot"}})
+            record = CMDRecord(config=config, files=setup_record.files)
+            writer = Writer(record=record, path=target, incremental=True)
+            writer.run()
+            assert writer.stats["rendered"] == 1  # Only push.yml reads ci.bot_name